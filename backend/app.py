@@ -1,55 +1,123 @@
 #importats y configuracion
+#
+# Importar este módulo no toca la base de datos: create_app() solo registra
+# configuración y blueprints, el engine se crea con la primera consulta y el
+# esquema se maneja únicamente con Alembic (flask db upgrade).
+from importlib import import_module
+
+import click
 from flask import Flask
 from flask_cors import CORS  #cors para que se comunique el back con el front
-from flask_migrate import Migrate
 from config import config
 import os #para usar variables de entorno
 
 # Configurar base de datos
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
 from models import Base
+import database
+
+from utils import serializers
+from utils.compression import compression
+from utils.hasher import hasher
+from utils.auth import tokens
+from utils.cache import cache
+from utils.metrics import metrics
+from utils.ratelimit import ratelimit
+from utils.profiler import profiler
+from utils.reportes import reportes
+from utils.trabajos import trabajos
+from utils.eventos import eventos
+
+# Blueprints como "modulo:objeto"; cada módulo de rutas se importa al crear la app
+BLUEPRINTS = (
+    'routes.health:health_bp',
+    'routes.metrics:metrics_bp',
+    'routes.admin:admin_bp',
+    'routes.auth:auth_bp',
+    'routes.usuarios:alumnos_bp',
+    'routes.profesores:profesores_bp',
+    'routes.instituciones:instituciones_bp',
+    'routes.stats:stats_bp',
+    'routes.reportes:reportes_bp',
+    'routes.importacion:importacion_bp',
+    'routes.trabajos:trabajos_bp',
+    'routes.eventos:eventos_bp',
+)
+
+
+def _init_migrate(app):
+    """Registrar Flask-Migrate (comandos flask db) solo cuando la app se crea desde el CLI
+
+    Flask-Migrate importa alembic, que es la mitad del tiempo de arranque;
+    gunicorn y los scripts no lo necesitan.
+    """
+    if click.get_current_context(silent=True) is None:
+        return
+    from flask_migrate import Migrate
+    Migrate(app, Base)
+
+
+def create_app(config_name=None):
+    """Crear y configurar la aplicación (la usan gunicorn, flask y los scripts)"""
+    # Crear la aplicación Flask
+    app = Flask(__name__)
+
+    # Configurar la aplicación
+    config_name = config_name or os.environ.get('FLASK_ENV', 'development')
+    app.config.from_object(config[config_name])
+
+    # Configurar CORS (solo para despliegues donde el frontend no pasa por el proxy /api/
+    # de nginx); max_age deja que el navegador reutilice el preflight
+    CORS(app, origins=app.config['CORS_ORIGINS'], max_age=app.config['CORS_MAX_AGE'],
+         expose_headers=['ETag', 'Retry-After', 'Server-Timing'])
+
+    # Codificador JSON rápido (orjson) si está disponible
+    serializers.init_app(app)
+
+    # Compresión según Accept-Encoding (se registra primero para que su after_request corra al final)
+    compression.init_app(app)
+
+    # Engine único de SQLAlchemy (se crea al primer uso) y sesión por petición
+    database.init_app(app)
+
+    # Pool de procesos para hashear contraseñas fuera del hilo de la petición
+    hasher.init_app(app)
 
-# Crear la aplicación Flask
-app = Flask(__name__)   
+    # Llaves JWT resueltas una vez al iniciar
+    tokens.init_app(app)
 
-# Configurar la aplicación
-config_name = os.environ.get('FLASK_ENV', 'development')
-app.config.from_object(config[config_name])
+    # Caché de respuestas de lectura
+    cache.init_app(app)
 
-# Configurar CORS
-CORS(app)
+    # Latencias, sentencias SQL y espera del pool por petición (/metrics)
+    metrics.init_app(app)
 
+    # Límite de peticiones por IP y usuario (después de métricas para que cuenten los 429)
+    ratelimit.init_app(app)
 
-# Crear engine de SQLAlchemy
-engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+    # Perfilado opcional de peticiones y planes de consultas lentas (/admin/perfiles)
+    profiler.init_app(app)
 
-# Crear sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Actualización periódica de las vistas materializadas de /reportes
+    reportes.init_app(app)
 
-#configuracion de flask-migrate
-migrate = Migrate(app, Base)  
+    # Cola de trabajos en Postgres (se consume con "flask worker")
+    trabajos.init_app(app)
 
-#importar y register blueprints
-from routes.auth import auth_bp
-from routes.usuarios import alumnos_bp
-from routes.profesores import profesores_bp
-from routes.instituciones import instituciones_bp
+    # Feed de cambios (pg_notify) y Server-Sent Events en /events
+    eventos.init_app(app)
 
-app.register_blueprint(auth_bp)
-app.register_blueprint(alumnos_bp)
-app.register_blueprint(profesores_bp)
-app.register_blueprint(instituciones_bp)
+    #configuracion de flask-migrate
+    _init_migrate(app)
 
+    #importar y register blueprints
+    for path in BLUEPRINTS:
+        module, _, name = path.partition(':')
+        app.register_blueprint(getattr(import_module(module), name))
 
-# Crear tablas si no existen
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+    return app
 
-# Crear tablas al iniciar
-create_tables()
 
-# EJECUTAR LA APLICACIÓN
+# EJECUTAR LA APLICACIÓN (servidor de desarrollo; en producción se usa gunicorn.conf.py)
 if __name__ == '__main__':
     puerto = int(os.getenv('BACKEND_PORT', 5000))
-    app.run(host='0.0.0.0', port=puerto, debug=True)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=puerto, debug=True)
@@ -0,0 +1,72 @@
+# Aplicación en modo async (ASGI)
+#
+# Sirve las rutas de alumnos, profesores, instituciones y auth con Starlette,
+# AsyncSession y asyncpg, sobre los mismos modelos, configuración, paginación,
+# serializadores, hasher y tokens que la app de Flask (app.py). Pensada para
+# muchas conexiones concurrentes que pasan la mayor parte del tiempo esperando
+# a la base de datos. Las demás rutas (stats, importación, exportación, bulk)
+# siguen solo en la app de Flask.
+#
+#   uvicorn --factory asgi:create_async_app --port 5000
+#   gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker 'asgi:create_async_app()'
+from contextlib import asynccontextmanager
+from importlib import import_module
+import os
+
+from flask import Config
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+
+from config import config
+import database
+import database_async
+from routes_async import ROUTE_MODULES
+from utils import serializers
+from utils.hasher import hasher
+from utils.auth import tokens
+from utils.cache import cache
+from utils.eventos import eventos
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if eventos.cache_local:
+        # Las escrituras de otros procesos invalidan la caché de este (ver utils/eventos.py)
+        eventos.ensure_listener()
+    yield
+    await database_async.dispose()
+
+
+def create_async_app(config_name=None):
+    """Crear la aplicación ASGI con la misma configuración que create_app()"""
+    config_name = config_name or os.environ.get('FLASK_ENV', 'development')
+    app_config = Config(os.path.dirname(os.path.abspath(__file__)))
+    app_config.from_object(config[config_name])
+
+    routes = []
+    for module in ROUTE_MODULES:
+        routes.extend(import_module(module).routes)
+
+    app = Starlette(
+        routes=routes,
+        middleware=[Middleware(CORSMiddleware, allow_origins=app_config['CORS_ORIGINS'], allow_methods=['*'],
+                               allow_headers=['*'], expose_headers=['ETag', 'Retry-After'],
+                               max_age=app_config['CORS_MAX_AGE'])],
+        lifespan=lifespan,
+    )
+    app.config = app_config
+
+    # orjson (si está instalado) codifica las fechas de forma nativa, igual que jsonify
+    serializers.init_async(app_config)
+
+    database_async.init_app(app)
+    # Engine síncrono solo para la conexión con LISTEN del hilo de eventos
+    database.init_engine(app_config)
+    hasher.init_app(app)
+    tokens.init_app(app)
+    cache.init_app(app)
+    # El feed /events lo sirve la app de Flask; aquí se publica y, con la caché
+    # en memoria, se escucha para invalidarla
+    eventos.init_app(app)
+    return app
@@ -0,0 +1 @@
+# Benchmarks y pruebas de carga (se ejecutan contra un Postgres local)
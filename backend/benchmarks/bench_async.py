@@ -0,0 +1,142 @@
+# Prueba de carga con muchos clientes concurrentes: gunicorn (sync) contra ASGI (async)
+#
+# Levanta cada servidor con bench_servidor.iniciar() y abre N conexiones
+# keep-alive desde un solo loop de asyncio (un hilo por cliente no escala a
+# miles). Cada conexión pide listado o detalle de alumnos durante D segundos.
+# Reporta peticiones por segundo, latencias (p50/p95/p99), errores y
+# reconexiones (conexiones keep-alive que cerró el servidor) por servidor y endpoint.
+#
+# Uso (desde backend/, con la base de datos disponible):
+#   python -m benchmarks.bench_async --clientes 1000 --duracion 20
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import resource
+import time
+
+from benchmarks.bench_servidor import iniciar, detener, _percentil
+
+
+async def _peticion(reader, writer, ruta):
+    writer.write(f'GET {ruta} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode('ascii'))
+    await writer.drain()
+    primera = await reader.readline()
+    if not primera:
+        # El servidor cerró la conexión keep-alive (p. ej. al reciclar un worker)
+        raise ConnectionResetError('conexión cerrada por el servidor')
+    estado = int(primera.split()[1])
+    largo, cerrar = 0, False
+    while True:
+        linea = await reader.readline()
+        if linea in (b'\r\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        nombre = nombre.lower()
+        if nombre == 'content-length':
+            largo = int(valor)
+        elif nombre == 'connection' and valor.strip().lower() == 'close':
+            cerrar = True
+    await reader.readexactly(largo)
+    return estado, cerrar
+
+
+async def carga(puerto, rutas, clientes, duracion):
+    """N clientes keep-alive; la ruta de cada petición rota sobre `rutas`"""
+    fin = time.monotonic() + duracion
+    latencias, errores, reconexiones = [], [0], [0]
+
+    async def cliente(n):
+        conexion = None
+        i = n
+        while time.monotonic() < fin:
+            ruta = rutas[i % len(rutas)]
+            i += 1
+            inicio = time.perf_counter()
+            reutilizada = conexion is not None
+            try:
+                if conexion is None:
+                    conexion = await asyncio.open_connection('127.0.0.1', puerto)
+                estado, cerrar = await asyncio.wait_for(_peticion(*conexion, ruta), 60)
+                if estado != 200:
+                    errores[0] += 1
+                else:
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                # Como en bench_servidor: si el servidor cerró una conexión keep-alive
+                # se reconecta sin contarlo como error
+                if reutilizada:
+                    reconexiones[0] += 1
+                else:
+                    errores[0] += 1
+                cerrar = True
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                errores[0] += 1
+                cerrar = True
+            if cerrar and conexion is not None:
+                conexion[1].close()
+                conexion = None
+        if conexion is not None:
+            conexion[1].close()
+
+    await asyncio.gather(*(cliente(n) for n in range(clientes)))
+    return latencias, errores[0], reconexiones[0]
+
+
+def _ids_detalle(puerto, cantidad):
+    conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+    conn.request('GET', f'/alumnos?limit={cantidad}&fields=id')
+    items = json.loads(conn.getresponse().read())['items']
+    if not items:
+        raise SystemExit('No hay alumnos; cargue datos antes de medir')
+    return [item['id'] for item in items]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Muchos clientes concurrentes: gunicorn sync vs ASGI async')
+    parser.add_argument('--clientes', type=int, default=1000)
+    parser.add_argument('--duracion', type=float, default=20)
+    parser.add_argument('--puerto', type=int, default=5200)
+    parser.add_argument('--servidores', default='gunicorn,async')
+    parser.add_argument('--limit', type=int, default=50, help='Tamaño de página del listado')
+    args = parser.parse_args()
+
+    # Una conexión por cliente: subir el límite de descriptores si hace falta
+    suave, duro = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if suave < args.clientes + 100:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(duro, args.clientes + 1024), duro))
+
+    # Reciclar workers cada max_requests corta de golpe cientos de conexiones en
+    # los workers de uvicorn; se desactiva para medir los servidores, no el reciclaje
+    os.environ.setdefault('GUNICORN_MAX_REQUESTS', '0')
+
+    resultados = []
+    for i, nombre in enumerate(args.servidores.split(',')):
+        puerto = args.puerto + i
+        print(f'Levantando {nombre} en :{puerto}...')
+        proceso = iniciar(nombre, puerto)
+        try:
+            endpoints = {
+                'listado': [f'/alumnos?limit={args.limit}'],
+                'detalle': [f'/alumnos/{id_}' for id_ in _ids_detalle(puerto, 500)],
+            }
+            for endpoint, rutas in endpoints.items():
+                asyncio.run(carga(puerto, rutas, min(args.clientes, 50), 2))  # calentamiento
+                resultados.append((nombre, endpoint,
+                                   *asyncio.run(carga(puerto, rutas, args.clientes, args.duracion))))
+        finally:
+            detener(proceso)
+
+    print()
+    print(f'{args.clientes} clientes concurrentes, {args.duracion:.0f}s por endpoint')
+    print(f'{"servidor":<10} {"endpoint":<9} {"req/s":>9} {"p50":>9} {"p95":>9} {"p99":>9} '
+          f'{"errores":>8} {"reconex.":>9}')
+    for nombre, endpoint, latencias, errores, reconexiones in resultados:
+        print(f'{nombre:<10} {endpoint:<9} {len(latencias) / args.duracion:>9.1f} '
+              f'{_percentil(latencias, 50):>7.1f}ms {_percentil(latencias, 95):>7.1f}ms '
+              f'{_percentil(latencias, 99):>7.1f}ms {errores:>8} {reconexiones:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Benchmark de compresión: bytes enviados y CPU por respuesta
+#
+# Pide a la app (test_client, sin servidor) listados reales de alumnos de
+# varios tamaños y, para cada codificación disponible (identity, gzip y, si
+# están instalados, br y zstd) y cada nivel, reporta los bytes que viajarían
+# por la red, la proporción contra el JSON sin comprimir y el tiempo de CPU
+# de comprimir cada respuesta. También mide la petición completa repetida
+# (caché de respuestas + LRU de cuerpos comprimidos) con y sin Accept-Encoding.
+#
+# Uso (desde backend/, con datos en la base):
+#   python -m benchmarks.bench_compresion --tamanos 20,100,500 --repeticiones 20
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import compression as modulo
+
+NIVELES = {
+    'gzip': (1, 6, 9),
+    'br': (1, 4, 6),
+    'zstd': (1, 3, 9),
+}
+CODIFICADORES = {'gzip': modulo._Gzip, 'br': modulo._Brotli, 'zstd': modulo._Zstd}
+
+
+def disponibles():
+    nombres = ['gzip']
+    if modulo.brotli is not None:
+        nombres.append('br')
+    if modulo.zstandard is not None:
+        nombres.append('zstd')
+    return nombres
+
+
+def cpu_us(funcion, repeticiones):
+    """Mediana de microsegundos de CPU del proceso por llamada"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        funcion()
+        tiempos.append((time.process_time() - inicio) * 1e6)
+    return statistics.median(tiempos)
+
+
+def peticion_ms(cliente, url, headers, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        respuesta = cliente.get(url, headers=headers)
+        respuesta.get_data()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), len(respuesta.get_data()), respuesta.headers.get('Content-Encoding', 'identity')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bytes en la red y CPU de la compresión de respuestas')
+    parser.add_argument('--tamanos', default='20,100,500', help='Valores de ?limit= para los listados (máximo PAGE_SIZE_MAX)')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    # Sin límite de peticiones: un solo cliente hace todas
+    os.environ.setdefault('RATELIMIT_ENABLED', 'false')
+    from app import create_app
+    app = create_app()
+    cliente = app.test_client()
+    tamanos = [int(t) for t in args.tamanos.split(',')]
+
+    print(f'codificaciones disponibles: {", ".join(disponibles())}')
+    print()
+    print(f'{"filas":>6} {"codificación":<10} {"nivel":>5} {"bytes":>10} {"proporción":>10} {"CPU µs":>9}')
+    for limite in tamanos:
+        cuerpo = cliente.get(f'/alumnos?limit={limite}').get_data()
+        print(f'{limite:>6} {"identity":<10} {"-":>5} {len(cuerpo):>10,} {1:>10.3f} {0:>9.0f}')
+        for nombre in disponibles():
+            for nivel in NIVELES[nombre]:
+                codificador = CODIFICADORES[nombre](nivel)
+                comprimido = codificador.compress(cuerpo)
+                us = cpu_us(lambda: codificador.compress(cuerpo), args.repeticiones)
+                print(f'{"":>6} {nombre:<10} {nivel:>5} {len(comprimido):>10,} '
+                      f'{len(comprimido) / len(cuerpo):>10.3f} {us:>9.0f}')
+
+    print()
+    print('Petición completa repetida (niveles de la configuración):')
+    print(f'{"filas":>6} {"Accept-Encoding":<22} {"enviada":<10} {"bytes":>10} {"ms":>8}')
+    for limite in tamanos:
+        url = f'/alumnos?limit={limite}'
+        for aceptadas in ('', 'gzip', 'gzip, br, zstd'):
+            headers = {'Accept-Encoding': aceptadas} if aceptadas else {}
+            ms, size, enviada = peticion_ms(cliente, url, headers, args.repeticiones)
+            print(f'{limite:>6} {aceptadas or "(ninguna)":<22} {enviada:<10} {size:>10,} {ms:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Benchmark de exportación en streaming con memoria acotada
+#
+# Inserta N alumnos sintéticos (por defecto 1M) con generate_series, descarga
+# GET /alumnos/export con el cliente de pruebas de Flask consumiendo la
+# respuesta por bloques y verifica que el RSS del proceso no crezca con el
+# tamaño de la tabla. Al terminar borra las filas insertadas.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.bench_exportacion --filas 1000000 --formato ndjson --max-rss-mb 150
+import argparse
+import os
+import resource
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+import database
+
+
+def rss_actual_mb():
+    """RSS actual del proceso (Linux, /proc/self/statm)"""
+    with open('/proc/self/statm') as f:
+        paginas = int(f.read().split()[1])
+    return paginas * resource.getpagesize() / (1024 * 1024)
+
+
+def poblar(engine, filas, prefijo):
+    with engine.begin() as conn:
+        conn.execute(text('SET LOCAL statement_timeout = 0'))
+        conn.execute(text("""
+            INSERT INTO alumnos (nombre, apellido, email, password_hash, carrera,
+                                 semestre, periodo, fecha_creacion)
+            SELECT 'Nombre' || g, 'Apellido' || g, :prefijo || '-' || g || '@bench.edu', 'x',
+                   'Medicina', 1 + g % 10, 'Enero-Mayo 2025', now()
+            FROM generate_series(1, :filas) AS g
+        """), {'filas': filas, 'prefijo': prefijo})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memoria y velocidad de GET /alumnos/export')
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--formato', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--max-rss-mb', type=float, default=None,
+                        help='Falla (exit 1) si el RSS crece más que esto durante la exportación')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()  # registra la configuración del engine compartido
+    engine = database.get_engine()
+    prefijo = f'bench-{uuid.uuid4().hex[:8]}'
+
+    print(f'Insertando {args.filas:,} alumnos...')
+    poblar(engine, args.filas, prefijo)
+
+    try:
+        client = app.test_client()
+        url = f'/alumnos/export?format={args.formato}' + ('&gzip=1' if args.gzip else '')
+        rss_inicial = rss_actual_mb()
+        rss_max = rss_inicial
+        total_bytes = 0
+        bloques = 0
+
+        inicio = time.perf_counter()
+        response = client.get(url, buffered=False)
+        for bloque in response.response:
+            total_bytes += len(bloque)
+            bloques += 1
+            if bloques % 50 == 0:
+                rss_max = max(rss_max, rss_actual_mb())
+        response.close()
+        duracion = time.perf_counter() - inicio
+        rss_max = max(rss_max, rss_actual_mb())
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text('SET LOCAL statement_timeout = 0'))
+            conn.execute(text('DELETE FROM alumnos WHERE email LIKE :p'), {'p': f'{prefijo}-%'})
+
+    crecimiento = rss_max - rss_inicial
+    print(f'Bytes enviados:    {total_bytes / (1024 * 1024):.1f} MB en {bloques:,} bloques')
+    print(f'Duración:          {duracion:.2f}s ({args.filas / duracion:,.0f} filas/s)')
+    print(f'RSS:               {rss_inicial:.1f} MB -> máx {rss_max:.1f} MB (+{crecimiento:.1f} MB)')
+
+    if args.max_rss_mb is not None and crecimiento > args.max_rss_mb:
+        print(f'ERROR: el RSS creció más de {args.max_rss_mb} MB')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# Benchmark de filtros del listado de alumnos con y sin índices
+#
+# Crea una tabla temporal bench_alumnos con la misma estructura que alumnos,
+# la llena con N filas sintéticas (por defecto 1M) y mide la latencia de las
+# consultas que genera GET /alumnos con filtros, antes y después de crear los
+# índices de la migración 0002. No toca la tabla real.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.bench_filtros --filas 1000000 --repeticiones 5
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+import database
+
+TABLA = 'bench_alumnos'
+
+# Consultas equivalentes a las que arma utils/filters.py + utils/pagination.py
+CONSULTAS = [
+    ('carrera + semestre + periodo',
+     "SELECT id, nombre, apellido, email FROM bench_alumnos "
+     "WHERE carrera = 'Medicina' AND semestre = 4 AND periodo = 'Enero-Mayo 2025' "
+     "ORDER BY id LIMIT 51"),
+    ('carrera + semestre + periodo (página profunda)',
+     "SELECT id, nombre, apellido, email FROM bench_alumnos "
+     "WHERE carrera = 'Medicina' AND semestre = 4 AND periodo = 'Enero-Mayo 2025' "
+     "AND id > :mitad ORDER BY id LIMIT 51"),
+    ('periodo + semestre',
+     "SELECT id, nombre FROM bench_alumnos "
+     "WHERE periodo = 'Agosto-Diciembre 2024' AND semestre = 9 ORDER BY id LIMIT 51"),
+    ('prefijo nombre (?nombre=)',
+     "SELECT id, nombre FROM bench_alumnos "
+     "WHERE nombre ILIKE 'nombre12345%' ORDER BY id LIMIT 51"),
+    ('subcadena (?q=)',
+     "SELECT id, nombre FROM bench_alumnos "
+     "WHERE nombre ILIKE '%98765%' OR apellido ILIKE '%98765%' OR email ILIKE '%98765%' "
+     "ORDER BY id LIMIT 51"),
+]
+
+INDICES_BTREE = [
+    'CREATE INDEX ON bench_alumnos (carrera, semestre, periodo, id)',
+    'CREATE INDEX ON bench_alumnos (periodo, semestre, id)',
+]
+
+INDICES_TRGM = [
+    'CREATE INDEX ON bench_alumnos USING gin (nombre gin_trgm_ops)',
+    'CREATE INDEX ON bench_alumnos USING gin (apellido gin_trgm_ops)',
+    'CREATE INDEX ON bench_alumnos USING gin (email gin_trgm_ops)',
+]
+
+
+def poblar(conn, filas):
+    """Llenar la tabla de prueba con generate_series (del lado del servidor)"""
+    conn.execute(text(f'DROP TABLE IF EXISTS {TABLA}'))
+    conn.execute(text(f'CREATE TABLE {TABLA} (LIKE alumnos INCLUDING DEFAULTS)'))
+    conn.execute(text(f'ALTER TABLE {TABLA} ADD PRIMARY KEY (id)'))
+    conn.execute(text(f"""
+        INSERT INTO {TABLA} (id, nombre, apellido, email, password_hash, carrera,
+                             semestre, periodo, fecha_creacion)
+        SELECT g,
+               'Nombre' || g,
+               'Apellido' || (g * 7919 % 1000003),
+               'alumno' || g || '@escuela.edu',
+               'x',
+               (ARRAY['Ingeniería en Sistemas', 'Administración', 'Contabilidad',
+                      'Psicología', 'Medicina'])[1 + g % 5],
+               1 + g % 10,
+               (ARRAY['Enero-Mayo 2025', 'Agosto-Diciembre 2024',
+                      'Enero-Mayo 2024'])[1 + g % 3],
+               now() - (g % 1000) * interval '1 hour'
+        FROM generate_series(1, :filas) AS g
+    """), {'filas': filas})
+    conn.execute(text(f'ANALYZE {TABLA}'))
+
+
+def medir(conn, sql, params, repeticiones):
+    """Mediana de latencia en milisegundos (una ejecución de calentamiento)"""
+    conn.execute(text(sql), params).fetchall()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def correr(conn, filas, repeticiones):
+    params = {'mitad': filas // 2}
+    return {nombre: medir(conn, sql, params, repeticiones) for nombre, sql in CONSULTAS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia de filtros de /alumnos con y sin índices')
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--conservar', action='store_true', help='No borrar la tabla al terminar')
+    args = parser.parse_args()
+
+    # Crear la app registra la configuración del engine compartido
+    from app import create_app
+    create_app()
+    engine = database.get_engine()
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        conn.execute(text('SET statement_timeout = 0'))
+
+        print(f'Poblando {TABLA} con {args.filas:,} filas...')
+        inicio = time.perf_counter()
+        poblar(conn, args.filas)
+        print(f'  listo en {time.perf_counter() - inicio:.1f}s')
+
+        sin_indices = correr(conn, args.filas, args.repeticiones)
+
+        print('Creando índices...')
+        for sql in INDICES_BTREE:
+            conn.execute(text(sql))
+        try:
+            conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            for sql in INDICES_TRGM:
+                conn.execute(text(sql))
+        except Exception as e:
+            print(f'  pg_trgm no disponible, se omiten índices trigram ({e.__class__.__name__})')
+        conn.execute(text(f'ANALYZE {TABLA}'))
+
+        con_indices = correr(conn, args.filas, args.repeticiones)
+
+        if not args.conservar:
+            conn.execute(text(f'DROP TABLE {TABLA}'))
+
+    print()
+    print(f'{"consulta":<48} {"sin índices":>12} {"con índices":>12} {"mejora":>8}')
+    for nombre, _ in CONSULTAS:
+        antes, despues = sin_indices[nombre], con_indices[nombre]
+        print(f'{nombre:<48} {antes:>10.2f}ms {despues:>10.2f}ms {antes / max(despues, 1e-6):>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Benchmark de importación en streaming (COPY + merge)
+#
+# Genera un archivo CSV o NDJSON sintético de alumnos en disco, lo importa con
+# utils.importer.Importer y reporta filas/segundo y memoria pico (RSS) del
+# proceso. Al terminar borra los alumnos importados.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.bench_importacion --filas 500000 --formato csv
+import argparse
+import csv
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+import database
+from utils.importer import Importer
+
+CARRERAS = ['Ingeniería en Sistemas', 'Administración', 'Contabilidad', 'Psicología', 'Medicina']
+
+
+def generar_archivo(ruta, filas, formato, prefijo):
+    """Escribir el archivo fila por fila (no se arma en memoria)"""
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        if formato == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(['nombre', 'apellido', 'email', 'semestre', 'carrera', 'periodo'])
+        for i in range(filas):
+            fila = {
+                'nombre': f'Nombre{i}',
+                'apellido': f'Apellido{i % 997}',
+                'email': f'{prefijo}-{i}@bench.edu',
+                'semestre': 1 + i % 10,
+                'carrera': CARRERAS[i % len(CARRERAS)],
+                'periodo': 'Enero-Mayo 2025',
+            }
+            if formato == 'csv':
+                writer.writerow(fila.values())
+            else:
+                f.write(json.dumps(fila) + '\n')
+
+
+def rss_pico_mb():
+    # En Linux ru_maxrss viene en KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput y memoria de la importación en streaming')
+    parser.add_argument('--filas', type=int, default=500_000)
+    parser.add_argument('--formato', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--lote', type=int, default=5000)
+    args = parser.parse_args()
+
+    from app import create_app
+    create_app()  # registra la configuración del engine compartido
+    engine = database.get_engine()
+    prefijo = f'bench-{uuid.uuid4().hex[:8]}'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, f'alumnos.{args.formato}')
+        print(f'Generando {args.filas:,} filas en {args.formato}...')
+        generar_archivo(ruta, args.filas, args.formato, prefijo)
+        tamano_mb = os.path.getsize(ruta) / (1024 * 1024)
+        rss_inicial = rss_pico_mb()
+
+        importer = Importer(engine, 'alumnos', args.lote)
+        inicio = time.perf_counter()
+        with open(ruta, 'rb') as f:
+            report = importer.run(f, args.formato)
+        duracion = time.perf_counter() - inicio
+
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM alumnos WHERE email LIKE :p'), {'p': f'{prefijo}-%'})
+
+    print(f'Archivo:           {tamano_mb:.1f} MB')
+    print(f'Insertadas:        {report["insertadas"]:,} (rechazadas {report["rechazadas"]:,})')
+    print(f'Duración:          {duracion:.2f}s')
+    print(f'Throughput:        {report["procesadas"] / duracion:,.0f} filas/s')
+    print(f'RSS pico:          {rss_pico_mb():.1f} MB (antes de importar: {rss_inicial:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
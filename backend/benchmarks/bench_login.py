@@ -0,0 +1,112 @@
+# Benchmark de logins concurrentes contra lecturas de listados
+#
+# Contra un servidor en marcha, lanza N hilos que hacen POST /login en bucle
+# (la tormenta de inicio de semestre) mientras otros M hilos leen GET /alumnos.
+# Reporta la latencia de las lecturas (p50/p95/p99), los logins completados y
+# cuántos se rechazaron con 429 por el control de admisión del hasher.
+#
+# Uso (desde backend/, con el servidor en marcha):
+#   python -m benchmarks.bench_login --url http://localhost:5000 --logins 32 --lectores 8
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+
+def _request(url, data=None):
+    """(código, segundos) de una petición; los errores HTTP cuentan como respuesta"""
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            codigo = resp.status
+    except urllib.error.HTTPError as e:
+        codigo = e.code
+    return codigo, time.perf_counter() - inicio
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def registrar_usuario(base):
+    email = f'bench-{uuid.uuid4().hex[:12]}@escuela.edu'
+    password = 'bench-password'
+    codigo, _ = _request(f'{base}/register', {
+        'nombre': 'Bench', 'apellido': 'Login', 'email': email, 'password': password,
+        'semestre': 1, 'carrera': 'Medicina', 'periodo': 'Enero-Mayo 2025',
+    })
+    if codigo not in (201, 429):
+        raise SystemExit(f'No se pudo registrar el usuario de prueba (HTTP {codigo})')
+    return email, password
+
+
+def correr(base, logins, lectores, duracion, credenciales):
+    fin = time.monotonic() + duracion
+    lecturas = []
+    codigos_login = {}
+    lock = threading.Lock()
+
+    def login():
+        while time.monotonic() < fin:
+            codigo, _ = _request(f'{base}/login', {'email': credenciales[0], 'password': credenciales[1]})
+            with lock:
+                codigos_login[codigo] = codigos_login.get(codigo, 0) + 1
+
+    def leer():
+        while time.monotonic() < fin:
+            codigo, segundos = _request(f'{base}/alumnos?limit=50')
+            if codigo == 200:
+                with lock:
+                    lecturas.append(segundos * 1000)
+
+    hilos = [threading.Thread(target=login) for _ in range(logins)]
+    hilos += [threading.Thread(target=leer) for _ in range(lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return lecturas, codigos_login
+
+
+def resumen(nombre, lecturas, codigos_login, duracion):
+    print(f'{nombre}:')
+    print(f'  lecturas: {len(lecturas)} ({len(lecturas) / duracion:.1f}/s)  '
+          f'p50={statistics.median(lecturas) if lecturas else 0:.1f}ms  '
+          f'p95={_percentil(lecturas, 95):.1f}ms  p99={_percentil(lecturas, 99):.1f}ms')
+    if codigos_login:
+        total = sum(codigos_login.values())
+        print(f'  logins: {total} ({total / duracion:.1f}/s)  '
+              f'200={codigos_login.get(200, 0)}  429={codigos_login.get(429, 0)}  '
+              f'otros={total - codigos_login.get(200, 0) - codigos_login.get(429, 0)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Logins concurrentes contra lecturas de /alumnos')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--logins', type=int, default=32, help='Hilos haciendo login')
+    parser.add_argument('--lectores', type=int, default=8, help='Hilos leyendo /alumnos')
+    parser.add_argument('--duracion', type=float, default=20, help='Segundos por fase')
+    args = parser.parse_args()
+
+    base = args.url.rstrip('/')
+    credenciales = registrar_usuario(base)
+
+    # Línea base: solo lecturas; luego lecturas durante la tormenta de logins
+    lecturas, _ = correr(base, 0, args.lectores, args.duracion, credenciales)
+    resumen('Solo lecturas', lecturas, {}, args.duracion)
+    lecturas, codigos = correr(base, args.logins, args.lectores, args.duracion, credenciales)
+    resumen(f'Lecturas con {args.logins} hilos de login', lecturas, codigos, args.duracion)
+
+
+if __name__ == '__main__':
+    main()
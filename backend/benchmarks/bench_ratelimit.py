@@ -0,0 +1,95 @@
+# Benchmark del límite de peticiones: costo por petición en microsegundos
+#
+# Mide take() de cada backend de cubetas (memoria del proceso y el sustituto
+# local:// del script de Redis) con uno y varios hilos, y el costo completo
+# del middleware (resolver la política, IP, token y cubetas) dentro de un
+# contexto de petición, sin base de datos. Con --presupuesto-us termina con
+# código 1 si el middleware supera ese costo por petición.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.bench_ratelimit --iteraciones 200000 --presupuesto-us 50
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ratelimit import MemoryBuckets, RedisBuckets, ratelimit
+
+
+def medir_take(backend, iteraciones, hilos, llaves):
+    """Microsegundos por take() repartiendo las iteraciones entre hilos y llaves"""
+    por_hilo = iteraciones // hilos
+
+    def trabajar(n):
+        nombres = [f'ip:10.{n}.{i // 256}.{i % 256}' for i in range(llaves)]
+        for i in range(por_hilo):
+            backend.take(nombres[i % llaves], 1, 1e9, 1e9)
+
+    trabajadores = [threading.Thread(target=trabajar, args=(n,)) for n in range(hilos)]
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    return (time.perf_counter() - inicio) * 1e6 / (por_hilo * hilos)
+
+
+def medir_middleware(app, iteraciones, con_token):
+    """Microsegundos del before_request/after_request del límite en GET /alumnos/1"""
+    from types import SimpleNamespace
+    from utils.auth import tokens
+    headers = {}
+    if con_token:
+        alumno = SimpleNamespace(id=1, email='bench@example.com')
+        headers['Authorization'] = f"Bearer {tokens.issue(alumno)['token']}"
+
+    with app.test_request_context('/alumnos/1', headers=headers):
+        # Resolver y memorizar la política; con las cubetas de main() nunca hay 429
+        if ratelimit._before_request() is not None:
+            raise SystemExit('El middleware rechazó la petición de prueba')
+        response = app.response_class()
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            ratelimit._before_request()
+            ratelimit._after_request(response)
+        return (time.perf_counter() - inicio) * 1e6 / iteraciones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Costo del límite de peticiones por petición')
+    parser.add_argument('--iteraciones', type=int, default=200000)
+    parser.add_argument('--hilos', type=int, default=8)
+    parser.add_argument('--llaves', type=int, default=1000, help='IPs distintas entre las que se reparten las peticiones')
+    parser.add_argument('--presupuesto-us', type=float, default=0, help='Máximo de µs por petición (0 = no comprobar)')
+    args = parser.parse_args()
+
+    print(f'{"backend":<12} {"hilos":>5} {"µs/take":>9}')
+    for nombre, crear in (('memoria', MemoryBuckets), ('local://', lambda: RedisBuckets.from_url('local://'))):
+        for hilos in (1, args.hilos):
+            us = medir_take(crear(), args.iteraciones, hilos, args.llaves)
+            print(f'{nombre:<12} {hilos:>5} {us:>9.2f}')
+
+    # Cubetas enormes para que ninguna petición reciba 429 durante la medición
+    os.environ.update(RATELIMIT_ENABLED='true', RATELIMIT_IP_RATE='1e9', RATELIMIT_IP_BURST='1e9',
+                      RATELIMIT_USER_RATE='1e9', RATELIMIT_USER_BURST='1e9')
+    from app import create_app
+    app = create_app()
+
+    print()
+    print(f'{"middleware":<22} {"µs/petición":>12}')
+    peor = 0.0
+    for nombre, con_token in (('anónima (IP)', False), ('con token (IP+usuario)', True)):
+        us = medir_middleware(app, args.iteraciones // 10, con_token)
+        peor = max(peor, us)
+        print(f'{nombre:<22} {us:>12.2f}')
+
+    if args.presupuesto_us and peor > args.presupuesto_us:
+        print(f'\nEl límite de peticiones cuesta {peor:.1f}µs por petición (presupuesto {args.presupuesto_us:.0f}µs)')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# Benchmark de reportes: GROUP BY sobre alumnos contra la vista materializada
+#
+# Con los datos que haya en la base (ver benchmarks/generar_datos.py), mide
+# cada consulta de reporte directamente sobre alumnos y sobre reporte_alumnos
+# (mediana de N corridas), el tiempo de REFRESH MATERIALIZED VIEW CONCURRENTLY
+# y la latencia de escrituras sueltas en alumnos mientras corre el refresh,
+# para comprobar que no quedan bloqueadas.
+#
+# Uso (desde backend/, con las migraciones aplicadas):
+#   python -m benchmarks.generar_datos --escala 1m --limpiar
+#   python -m benchmarks.bench_reportes --repeticiones 5
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+import database
+
+# (nombre, dimensiones, filtro) de cada reporte
+CONSULTAS = [
+    ('por carrera', 'carrera', ''),
+    ('por institución', 'institucion_id', ''),
+    ('periodo x semestre', 'periodo, semestre', ''),
+    ('año x carrera (Medicina)', 'anio, carrera', "WHERE carrera = 'Medicina'"),
+    ('total de una institución', 'institucion_id', 'WHERE institucion_id = 7'),
+]
+
+DIRECTA = ('SELECT {dims}, count(*) FROM (SELECT *, extract(year FROM fecha_creacion)::integer AS anio '
+           'FROM alumnos) a {filtro} GROUP BY {dims}')
+VISTA = 'SELECT {dims}, sum(total) FROM reporte_alumnos {filtro} GROUP BY {dims}'
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def medir(conn, sql, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute(text(sql)).all()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def escrituras_durante(engine, vista):
+    """Latencias de UPDATE sueltos en alumnos mientras corre REFRESH CONCURRENTLY"""
+    latencias = []
+    listo = threading.Event()
+
+    def escribir():
+        with engine.connect() as conn:
+            ids = [i for (i,) in conn.execute(text('SELECT id FROM alumnos ORDER BY id LIMIT 100'))]
+            while not listo.is_set():
+                for alumno_id in ids:
+                    inicio = time.perf_counter()
+                    conn.execute(text('UPDATE alumnos SET semestre = semestre WHERE id = :id'), {'id': alumno_id})
+                    conn.commit()
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                    if listo.is_set():
+                        break
+
+    hilo = threading.Thread(target=escribir)
+    hilo.start()
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        conn.execute(text('SET statement_timeout = 0'))
+        inicio = time.perf_counter()
+        conn.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {vista}'))
+        refresh_ms = (time.perf_counter() - inicio) * 1000
+    listo.set()
+    hilo.join()
+    return refresh_ms, latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia de reportes: tabla alumnos vs vista materializada')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    from app import create_app
+    create_app()
+    engine = database.get_engine()
+
+    with engine.connect() as conn:
+        conn.execute(text('SET statement_timeout = 0'))
+        alumnos = conn.execute(text('SELECT count(*) FROM alumnos')).scalar()
+        filas_vista = conn.execute(text('SELECT count(*) FROM reporte_alumnos')).scalar()
+        print(f'alumnos: {alumnos:,}  filas en reporte_alumnos: {filas_vista:,}')
+        print()
+        print(f'{"reporte":<28} {"alumnos":>10} {"vista":>10} {"mejora":>8}')
+        for nombre, dims, filtro in CONSULTAS:
+            directa = medir(conn, DIRECTA.format(dims=dims, filtro=filtro), args.repeticiones)
+            vista = medir(conn, VISTA.format(dims=dims, filtro=filtro), args.repeticiones)
+            print(f'{nombre:<28} {directa:>8.1f}ms {vista:>8.1f}ms {directa / max(vista, 1e-6):>7.0f}x')
+        conn.rollback()
+
+    refresh_ms, latencias = escrituras_durante(engine, 'reporte_alumnos')
+    print()
+    print(f'REFRESH MATERIALIZED VIEW CONCURRENTLY: {refresh_ms:.0f}ms')
+    print(f'UPDATE en alumnos durante el refresh: {len(latencias)} escrituras, '
+          f'p50 {_percentil(latencias, 50):.1f}ms, p99 {_percentil(latencias, 99):.1f}ms, '
+          f'máx {max(latencias, default=0):.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
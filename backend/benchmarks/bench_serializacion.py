@@ -0,0 +1,99 @@
+# Micro-benchmark de serialización de alumnos
+#
+# Compara, sobre N filas sintéticas en memoria (por defecto 100k, sin base de
+# datos), cómo se armaba la respuesta antes (objetos del ORM + diccionario
+# escrito a mano + .isoformat() por fila + json de la biblioteca estándar)
+# contra el serializador declarativo de utils/serializers.py a partir de
+# tuplas de columnas, con json estándar y con orjson si está instalado.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.bench_serializacion --filas 100000 --repeticiones 5
+import argparse
+from datetime import datetime, timedelta
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Alumno
+from utils import serializers
+from utils.serializers import serializer_for
+
+
+def generar_filas(n):
+    inicio = datetime(2025, 1, 1)
+    carreras = ('Ingeniería en Sistemas', 'Administración', 'Contabilidad', 'Psicología', 'Medicina')
+    return [
+        (i, f'Nombre{i}', f'Apellido{i * 7919 % 1000003}', f'alumno{i}@escuela.edu',
+         1 + i % 10, carreras[i % 5], 'Enero-Mayo 2025', inicio + timedelta(minutes=i))
+        for i in range(1, n + 1)
+    ]
+
+
+def antes(filas):
+    """Como los handlers originales: objeto del ORM y diccionario campo por campo"""
+    alumnos = [Alumno(id=f[0], nombre=f[1], apellido=f[2], email=f[3], semestre=f[4],
+                      carrera=f[5], periodo=f[6], fecha_creacion=f[7]) for f in filas]
+    items = [{
+        'id': alumno.id,
+        'nombre': alumno.nombre,
+        'apellido': alumno.apellido,
+        'email': alumno.email,
+        'semestre': alumno.semestre,
+        'carrera': alumno.carrera,
+        'periodo': alumno.periodo,
+        'fecha_creacion': alumno.fecha_creacion.isoformat(),
+    } for alumno in alumnos]
+    # Mismas opciones que el proveedor JSON por defecto de Flask
+    return json.dumps({'items': items}, sort_keys=True).encode('utf-8')
+
+
+def con_json(filas):
+    serializers._native_dates = False
+    items = serializer_for(Alumno).rows(filas)
+    return json.dumps({'items': items}, ensure_ascii=False).encode('utf-8')
+
+
+def con_orjson(filas):
+    serializers._native_dates = True
+    items = serializer_for(Alumno).rows(filas)
+    return serializers.orjson.dumps({'items': items})
+
+
+def medir(fn, filas, repeticiones):
+    fn(filas)  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn(filas)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serialización de alumnos: antes y después')
+    parser.add_argument('--filas', type=int, default=100_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    filas = generar_filas(args.filas)
+    casos = [('antes (ORM + dict a mano + json)', antes),
+             ('serializador + json', con_json)]
+    if serializers.orjson is not None:
+        casos.append(('serializador + orjson', con_orjson))
+    else:
+        print('orjson no está instalado; se omite ese caso')
+
+    base = None
+    print(f'{"caso":<36} {"mediana":>10} {"mejora":>8}')
+    for nombre, fn in casos:
+        ms = medir(fn, filas, args.repeticiones)
+        base = base or ms
+        print(f'{nombre:<36} {ms:>8.1f}ms {base / ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
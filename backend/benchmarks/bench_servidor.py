@@ -0,0 +1,137 @@
+# Prueba de carga: servidor de desarrollo contra gunicorn
+#
+# Levanta cada servidor en un puerto propio, espera a /health, lanza C hilos
+# que piden una ruta durante D segundos y reporta peticiones por segundo y
+# latencias (p50/p95/p99). Los servidores se detienen al terminar cada fase.
+#
+# Uso (desde backend/, con la base de datos disponible):
+#   python -m benchmarks.bench_servidor --concurrencia 32 --duracion 20 --ruta "/alumnos?limit=50"
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVIDORES = {
+    'desarrollo': [sys.executable, 'app.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:create_app()'],
+    # Misma configuración de gunicorn con la app ASGI (asgi.py) en workers de uvicorn
+    'async': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+              '-k', 'uvicorn.workers.UvicornWorker', 'asgi:create_async_app()'],
+}
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def iniciar(nombre, puerto):
+    env = dict(os.environ, BACKEND_PORT=str(puerto), GUNICORN_ACCESSLOG='')
+    # Un solo cliente genera toda la carga: sin límite por IP salvo que se pida
+    env.setdefault('RATELIMIT_ENABLED', 'false')
+    proceso = subprocess.Popen(SERVIDORES[nombre], cwd=BACKEND, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return proceso
+        except OSError:
+            time.sleep(0.5)
+    detener(proceso)
+    raise SystemExit(f'El servidor {nombre} no respondió en /health')
+
+
+def detener(proceso):
+    # El reloader del servidor de desarrollo y los workers de gunicorn son procesos hijos
+    try:
+        os.killpg(proceso.pid, signal.SIGTERM)
+        proceso.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(proceso.pid, signal.SIGKILL)
+
+
+def carga(puerto, ruta, concurrencia, duracion):
+    fin = time.monotonic() + duracion
+    latencias = []
+    errores = [0]
+    lock = threading.Lock()
+
+    def cliente():
+        conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+        propias = []
+        fallidas = 0
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            try:
+                conn.request('GET', ruta)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    fallidas += 1
+                elif resp.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                propias.append((time.perf_counter() - inicio) * 1000)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # El servidor cerró la conexión keep-alive (p. ej. al reciclar un worker)
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+            except (OSError, http.client.HTTPException):
+                fallidas += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+        with lock:
+            latencias.extend(propias)
+            errores[0] += fallidas
+
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, errores[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peticiones por segundo: servidor de desarrollo vs gunicorn')
+    parser.add_argument('--ruta', default='/alumnos?limit=50')
+    parser.add_argument('--concurrencia', type=int, default=32)
+    parser.add_argument('--duracion', type=float, default=20)
+    parser.add_argument('--puerto', type=int, default=5100)
+    parser.add_argument('--servidores', default='desarrollo,gunicorn')
+    args = parser.parse_args()
+
+    # Ambos servidores corren la misma app con la misma configuración (incluida la caché)
+    resultados = []
+    for i, nombre in enumerate(args.servidores.split(',')):
+        puerto = args.puerto + i
+        print(f'Levantando {nombre} en :{puerto}...')
+        proceso = iniciar(nombre, puerto)
+        try:
+            carga(puerto, args.ruta, args.concurrencia, 2)  # calentamiento
+            latencias, errores = carga(puerto, args.ruta, args.concurrencia, args.duracion)
+        finally:
+            detener(proceso)
+        resultados.append((nombre, latencias, errores))
+
+    print()
+    print(f'{"servidor":<12} {"req/s":>9} {"p50":>9} {"p95":>9} {"p99":>9} {"errores":>8}')
+    for nombre, latencias, errores in resultados:
+        print(f'{nombre:<12} {len(latencias) / args.duracion:>9.1f} '
+              f'{_percentil(latencias, 50):>7.1f}ms {_percentil(latencias, 95):>7.1f}ms '
+              f'{_percentil(latencias, 99):>7.1f}ms {errores:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+# Prueba de carga de la API por escenarios, con reportes comparables entre commits
+#
+# Cada escenario (listado, detalle, crear, actualizar, login, dashboard) corre
+# por separado: C hilos con conexiones keep-alive durante D segundos contra un
+# servidor en marcha (--url) o uno que se levanta aquí (--servidor). Reporta
+# peticiones por segundo, latencias p50/p95/p99 y errores, y guarda el
+# resultado en JSON con el commit actual para compararlo después (--comparar).
+# Los datos se generan antes con benchmarks.generar_datos; todo corre local.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.generar_datos --escala 100k --limpiar
+#   python -m benchmarks.carga --servidor gunicorn --concurrencia 16 --duracion 15
+#   python -m benchmarks.carga --url http://localhost:5000 --comparar benchmarks/resultados/carga-abc1234.json
+import argparse
+from datetime import datetime
+import http.client
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.bench_servidor import iniciar, detener, _percentil
+from benchmarks.generar_datos import PASSWORD
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTADOS = os.path.join(BACKEND, 'benchmarks', 'resultados')
+
+
+class Contexto:
+    """Datos compartidos por los escenarios (ids y credenciales existentes)"""
+
+    def __init__(self, ids, emails, corrida):
+        self.ids = ids
+        self.emails = emails
+        self.corrida = corrida
+        self.secuencia = itertools.count()  # emails únicos también entre calentamiento y medición
+        self.creados = []
+        self.lock = threading.Lock()
+
+
+# Cada escenario devuelve (método, ruta, cuerpo) para la i-ésima petición del hilo h
+def _listado(ctx, h, i):
+    return 'GET', '/alumnos?limit=50', None
+
+
+def _detalle(ctx, h, i):
+    return 'GET', f'/alumnos/{ctx.ids[(h * 7919 + i) % len(ctx.ids)]}', None
+
+
+def _crear(ctx, h, i):
+    return 'POST', '/alumnos', {
+        'nombre': 'Carga', 'apellido': f'Hilo{h}', 'email': f'carga-{ctx.corrida}-{next(ctx.secuencia)}@bench.local',
+        'semestre': 1 + i % 10, 'carrera': 'Medicina', 'periodo': 'Enero-Mayo 2025',
+    }
+
+
+def _actualizar(ctx, h, i):
+    return 'PUT', f'/alumnos/{ctx.ids[(h * 7919 + i) % len(ctx.ids)]}', {'semestre': 1 + i % 10}
+
+
+def _login(ctx, h, i):
+    return 'POST', '/login', {'email': ctx.emails[(h * 31 + i) % len(ctx.emails)], 'password': PASSWORD}
+
+
+def _dashboard(ctx, h, i):
+    return 'GET', '/stats', None
+
+
+ESCENARIOS = {
+    'listado': _listado,
+    'detalle': _detalle,
+    'crear': _crear,
+    'actualizar': _actualizar,
+    'login': _login,
+    'dashboard': _dashboard,
+}
+
+
+def _conectar(host, puerto):
+    return http.client.HTTPConnection(host, puerto, timeout=60)
+
+
+def _pedir(conn, metodo, ruta, cuerpo=None):
+    body = json.dumps(cuerpo).encode('utf-8') if cuerpo is not None else None
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(metodo, ruta, body=body, headers=headers)
+    resp = conn.getresponse()
+    return resp, resp.read()
+
+
+def preparar(host, puerto, corrida):
+    """Ids de alumnos y emails de los generados por generar_datos (contraseña conocida)"""
+    conn = _conectar(host, puerto)
+    _, body = _pedir(conn, 'GET', '/alumnos?limit=500&fields=id')
+    ids = [item['id'] for item in json.loads(body)['items']]
+    _, body = _pedir(conn, 'GET', '/alumnos?limit=200&fields=id,email&email=alumno')
+    emails = [item['email'] for item in json.loads(body)['items'] if item['email'].endswith('@bench.local')]
+    conn.close()
+    if not ids:
+        raise SystemExit('No hay alumnos; genere datos con python -m benchmarks.generar_datos')
+    return Contexto(ids, emails, corrida)
+
+
+def correr(host, puerto, escenario, ctx, concurrencia, duracion):
+    """Latencias (ms) y códigos de respuesta de un escenario"""
+    fin = time.monotonic() + duracion
+    latencias, codigos = [], {}
+    lock = threading.Lock()
+
+    def cliente(h):
+        conn = _conectar(host, puerto)
+        propias, propios = [], {}
+        i = 0
+        while time.monotonic() < fin:
+            metodo, ruta, cuerpo = ESCENARIOS[escenario](ctx, h, i)
+            i += 1
+            inicio = time.perf_counter()
+            try:
+                resp, body = _pedir(conn, metodo, ruta, cuerpo)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # El servidor cerró la conexión keep-alive (p. ej. al reciclar un worker)
+                conn.close()
+                conn = _conectar(host, puerto)
+                continue
+            except (OSError, http.client.HTTPException):
+                propios['error'] = propios.get('error', 0) + 1
+                conn.close()
+                conn = _conectar(host, puerto)
+                continue
+            propias.append((time.perf_counter() - inicio) * 1000)
+            propios[resp.status] = propios.get(resp.status, 0) + 1
+            if escenario == 'crear' and resp.status == 201:
+                with ctx.lock:
+                    ctx.creados.append(json.loads(body)['id'])
+            if resp.getheader('Connection', '').lower() == 'close':
+                conn.close()
+        conn.close()
+        with lock:
+            latencias.extend(propias)
+            for codigo, n in propios.items():
+                codigos[codigo] = codigos.get(codigo, 0) + n
+
+    hilos = [threading.Thread(target=cliente, args=(h,)) for h in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, codigos
+
+
+def limpiar(host, puerto, ctx):
+    """Borrar los alumnos creados por el escenario crear"""
+    conn = _conectar(host, puerto)
+    for i in range(0, len(ctx.creados), 5000):
+        _pedir(conn, 'DELETE', '/alumnos/bulk', {'ids': ctx.creados[i:i + 5000]})
+    conn.close()
+
+
+def resumen(latencias, codigos, duracion):
+    exitosas = sum(n for codigo, n in codigos.items() if codigo != 'error' and codigo < 400)
+    return {
+        'peticiones': len(latencias),
+        'req_s': round(len(latencias) / duracion, 1),
+        'p50_ms': round(_percentil(latencias, 50), 2),
+        'p95_ms': round(_percentil(latencias, 95), 2),
+        'p99_ms': round(_percentil(latencias, 99), 2),
+        'errores': sum(codigos.values()) - exitosas,
+        'codigos': {str(codigo): n for codigo, n in sorted(codigos.items(), key=str)},
+    }
+
+
+def _commit():
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND,
+                                capture_output=True, text=True, check=True)
+        sucio = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BACKEND,
+                               capture_output=True, text=True).stdout.strip()
+        return salida.stdout.strip() + ('-sucio' if sucio else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconocido'
+
+
+def imprimir(reporte, anterior=None):
+    print()
+    print(f'commit {reporte["commit"]}, {reporte["parametros"]["concurrencia"]} hilos, '
+          f'{reporte["parametros"]["duracion"]:.0f}s por escenario')
+    encabezado = f'{"escenario":<11} {"req/s":>9} {"p50":>10} {"p95":>10} {"p99":>10} {"errores":>8}'
+    if anterior:
+        encabezado += f'   vs {anterior["commit"]}: {"req/s":>7} {"p95":>7}'
+    print(encabezado)
+    for nombre, r in reporte['escenarios'].items():
+        linea = (f'{nombre:<11} {r["req_s"]:>9.1f} {r["p50_ms"]:>8.1f}ms {r["p95_ms"]:>8.1f}ms '
+                 f'{r["p99_ms"]:>8.1f}ms {r["errores"]:>8}')
+        previo = (anterior or {}).get('escenarios', {}).get(nombre)
+        if previo:
+            cambio_rps = (r['req_s'] / previo['req_s'] - 1) * 100 if previo['req_s'] else 0.0
+            cambio_p95 = (r['p95_ms'] / previo['p95_ms'] - 1) * 100 if previo['p95_ms'] else 0.0
+            linea += f'   {"":>{len(anterior["commit"]) + 4}} {cambio_rps:>+6.1f}% {cambio_p95:>+6.1f}%'
+        print(linea)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga por escenarios con reporte comparable')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Servidor en marcha')
+    parser.add_argument('--servidor', choices=('desarrollo', 'gunicorn', 'async'),
+                        help='Levantar este servidor en --puerto en lugar de usar --url')
+    parser.add_argument('--puerto', type=int, default=5400)
+    parser.add_argument('--escenarios', default=','.join(ESCENARIOS))
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--duracion', type=float, default=15)
+    parser.add_argument('--calentamiento', type=float, default=2)
+    parser.add_argument('--salida', help='JSON del reporte (por defecto benchmarks/resultados/carga-<commit>.json)')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior')
+    args = parser.parse_args()
+
+    escenarios = [e.strip() for e in args.escenarios.split(',') if e.strip()]
+    desconocidos = [e for e in escenarios if e not in ESCENARIOS]
+    if desconocidos:
+        parser.error(f'Escenarios no válidos: {", ".join(desconocidos)}')
+
+    proceso = None
+    if args.servidor:
+        host, puerto = '127.0.0.1', args.puerto
+        print(f'Levantando {args.servidor} en :{puerto}...')
+        proceso = iniciar(args.servidor, puerto)
+    else:
+        partes = urlsplit(args.url)
+        host, puerto = partes.hostname, partes.port or 80
+
+    reporte = {
+        'commit': _commit(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {'concurrencia': args.concurrencia, 'duracion': args.duracion,
+                       'servidor': args.servidor or args.url},
+        'escenarios': {},
+    }
+    try:
+        ctx = preparar(host, puerto, int(time.time()))
+        if 'login' in escenarios and not ctx.emails:
+            print('Sin alumnos de generar_datos: se omite el escenario login')
+            escenarios.remove('login')
+        for escenario in escenarios:
+            print(f'Escenario {escenario}...')
+            if args.calentamiento:
+                correr(host, puerto, escenario, ctx, args.concurrencia, args.calentamiento)
+            latencias, codigos = correr(host, puerto, escenario, ctx, args.concurrencia, args.duracion)
+            reporte['escenarios'][escenario] = resumen(latencias, codigos, args.duracion)
+        limpiar(host, puerto, ctx)
+    finally:
+        if proceso is not None:
+            detener(proceso)
+
+    salida = args.salida or os.path.join(RESULTADOS, f'carga-{reporte["commit"]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+    imprimir(reporte, anterior)
+    print(f'\nReporte guardado en {salida}')
+
+
+if __name__ == '__main__':
+    main()
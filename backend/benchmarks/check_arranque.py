@@ -0,0 +1,86 @@
+# Verificación del tiempo de arranque en frío (python -X importtime)
+#
+# Importa app y ejecuta create_app() en un intérprete nuevo, apuntando la
+# base de datos a un puerto sin servidor: si algo intenta conectarse o crear
+# el esquema al arrancar, el proceso falla. Con la salida de -X importtime
+# suma el tiempo de importación, muestra los módulos más costosos y termina
+# con exit 1 si se pasa del presupuesto o si se importa algo prohibido.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.check_arranque --presupuesto-ms 600
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Solo los comandos `flask db` necesitan alembic
+PROHIBIDOS = ('alembic', 'flask_migrate')
+
+CODIGO = '''
+import sys, time
+inicio = time.perf_counter()
+from app import create_app
+create_app()
+print(f'{(time.perf_counter() - inicio) * 1000:.1f}')
+print(','.join(m for m in sys.modules if m.split('.')[0] in PROHIBIDOS))
+'''
+
+
+def medir():
+    env = dict(os.environ, POSTGRES_HOST='127.0.0.1', POSTGRES_PORT='1')
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CODIGO.replace('PROHIBIDOS', repr(PROHIBIDOS))],
+        cwd=BACKEND, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if proceso.returncode != 0:
+        ultimas = '\n'.join(l for l in proceso.stderr.splitlines() if not l.startswith('import time:'))
+        raise SystemExit(f'create_app() falló sin base de datos (¿conecta al importar?):\n{ultimas}')
+
+    modulos = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        # Solo los módulos de primer nivel (los demás ya están en su acumulado)
+        if nombre.startswith(' ') and not nombre.startswith('  '):
+            modulos.append((int(acumulado) / 1000, nombre.strip()))
+
+    total_ms, importados = proceso.stdout.split('\n')[:2]
+    return float(total_ms), modulos, [m for m in importados.split(',') if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Presupuesto de arranque en frío de la app')
+    parser.add_argument('--presupuesto-ms', type=float,
+                        default=float(os.environ.get('ARRANQUE_PRESUPUESTO_MS', 600)),
+                        help='Máximo para import app + create_app() (mediana)')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    corridas = [medir() for _ in range(args.repeticiones)]
+    mediana = statistics.median(total for total, _, _ in corridas)
+    _, modulos, importados = corridas[-1]
+
+    print('Módulos de primer nivel más costosos (importtime, última corrida):')
+    for ms, nombre in sorted(modulos, reverse=True)[:args.top]:
+        print(f'  {ms:>8.1f}ms  {nombre}')
+    print(f'Importación total (importtime): {sum(ms for ms, _ in modulos):.1f}ms')
+    print(f'import app + create_app(): {mediana:.1f}ms (mediana de {args.repeticiones}), '
+          f'presupuesto {args.presupuesto_ms:.0f}ms')
+
+    fallas = []
+    if importados:
+        fallas.append(f'se importaron módulos que solo usa el CLI: {", ".join(sorted(importados)[:5])}')
+    if mediana > args.presupuesto_ms:
+        fallas.append(f'el arranque excede el presupuesto por {mediana - args.presupuesto_ms:.1f}ms')
+    for falla in fallas:
+        print(f'FALLA: {falla}')
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# Generador de datos sintéticos para benchmarks y pruebas de carga
+#
+# Llena alumnos, profesores e instituciones directamente en Postgres con
+# INSERT ... SELECT generate_series (del lado del servidor, sin pasar por la
+# API): 1M de alumnos tarda segundos. Los datos son deterministas: la misma
+# escala produce las mismas filas, así que los resultados de benchmarks/carga
+# se pueden comparar entre commits. Todos los alumnos comparten la contraseña
+# PASSWORD (un solo hash con el método configurado) para el escenario de login.
+# Alumnos y profesores se reparten entre las instituciones existentes.
+#
+# Uso (desde backend/, con las migraciones aplicadas):
+#   python -m benchmarks.generar_datos --escala 100k --limpiar
+#   python -m benchmarks.generar_datos --alumnos 250000 --profesores 5000 --instituciones 500
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+import database
+
+PASSWORD = 'password123'
+
+# Alumnos por escala; profesores e instituciones en proporción (10:1 y 100:1)
+ESCALAS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+CARRERAS = ['Ingeniería en Sistemas', 'Administración', 'Contabilidad', 'Psicología', 'Medicina',
+            'Derecho', 'Arquitectura', 'Biología']
+PERIODOS = ['Enero-Mayo 2025', 'Agosto-Diciembre 2024', 'Enero-Mayo 2024', 'Agosto-Diciembre 2023']
+NOMBRES = ['María', 'Juan', 'Ana', 'Carlos', 'Laura', 'José', 'Sofía', 'Luis', 'Valeria', 'Diego',
+           'Fernanda', 'Miguel', 'Camila', 'Jorge', 'Daniela', 'Pedro']
+APELLIDOS = ['González', 'Rodríguez', 'López', 'Méndez', 'Martínez', 'Hernández', 'García', 'Pérez',
+             'Sánchez', 'Ramírez', 'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Cruz']
+DEPARTAMENTOS = ['Ciencias Aplicadas', 'Ingeniería en Sistemas', 'Administración', 'Humanidades',
+                 'Ciencias de la Salud']
+ESPECIALIDADES = ['Matemáticas', 'Programación', 'Contabilidad', 'Física', 'Química', 'Estadística',
+                  'Redes', 'Anatomía', 'Derecho Civil', 'Psicología Clínica']
+
+# El id sale de la secuencia de la tabla y también arma el email: se pueden agregar datos
+# sin chocar con los existentes, y con --limpiar los ids empiezan en 1
+INSERTS = {
+    'alumnos': """
+        INSERT INTO alumnos (id, nombre, apellido, email, password_hash, carrera, semestre, periodo,
+                             institucion_id, fecha_creacion)
+        SELECT n, (:nombres)[1 + n % cardinality(:nombres)],
+               (:apellidos)[1 + (n * 7) % cardinality(:apellidos)] || ' ' || (:apellidos)[1 + (n / 16) % cardinality(:apellidos)],
+               'alumno' || n || '@bench.local',
+               :password_hash,
+               (:carreras)[1 + n % cardinality(:carreras)],
+               1 + (n * 31) % 10,
+               (:periodos)[1 + (n / 7) % cardinality(:periodos)],
+               (CAST(:instituciones AS integer[]))
+                   [1 + n % nullif(cardinality(CAST(:instituciones AS integer[])), 0)],
+               now() - ((n * 7919) % (365 * 24)) * interval '1 hour'
+        FROM (SELECT nextval(pg_get_serial_sequence('alumnos', 'id')) AS n
+              FROM generate_series(1, :filas)) AS s
+    """,
+    'profesores': """
+        INSERT INTO profesores (id, nombre, apellido, email, especialidad, departamento, telefono,
+                                institucion_id, fecha_creacion)
+        SELECT n, (:nombres)[1 + n % cardinality(:nombres)],
+               (:apellidos)[1 + (n * 5) % cardinality(:apellidos)],
+               'profesor' || n || '@bench.local',
+               (:especialidades)[1 + n % cardinality(:especialidades)],
+               (:departamentos)[1 + (n / 3) % cardinality(:departamentos)],
+               '+52 55 ' || lpad((n % 100000000)::text, 8, '0'),
+               (CAST(:instituciones AS integer[]))
+                   [1 + n % nullif(cardinality(CAST(:instituciones AS integer[])), 0)],
+               now() - ((n * 7919) % (365 * 24)) * interval '1 hour'
+        FROM (SELECT nextval(pg_get_serial_sequence('profesores', 'id')) AS n
+              FROM generate_series(1, :filas)) AS s
+    """,
+    'instituciones': """
+        INSERT INTO instituciones (id, nombre, direccion, telefono, email, fecha_creacion)
+        SELECT n, 'Institución ' || n,
+               'Av. Principal ' || n || ', Ciudad de México',
+               '+52 55 ' || lpad((n % 100000000)::text, 8, '0'),
+               'contacto' || n || '@bench.local',
+               now() - ((n * 7919) % (365 * 24)) * interval '1 hour'
+        FROM (SELECT nextval(pg_get_serial_sequence('instituciones', 'id')) AS n
+              FROM generate_series(1, :filas)) AS s
+    """,
+}
+
+PARAMETROS = {
+    'nombres': NOMBRES, 'apellidos': APELLIDOS, 'carreras': CARRERAS, 'periodos': PERIODOS,
+    'departamentos': DEPARTAMENTOS, 'especialidades': ESPECIALIDADES,
+}
+
+# Filas por INSERT: lotes acotados para no llenar el WAL de una sola transacción
+LOTE = 200_000
+
+
+def poblar(conn, tabla, filas, password_hash):
+    """Insertar `filas` registros sintéticos en la tabla, en lotes"""
+    # Las instituciones se generan primero; los demás registros se reparten entre ellas
+    instituciones = list(conn.execute(text('SELECT id FROM instituciones ORDER BY id')).scalars())
+    params = dict(PARAMETROS, password_hash=password_hash, instituciones=instituciones)
+    restantes = filas
+    while restantes > 0:
+        lote = min(LOTE, restantes)
+        conn.execute(text(INSERTS[tabla]), dict(params, filas=lote))
+        restantes -= lote
+    conn.execute(text(f'ANALYZE {tabla}'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Datos sintéticos en alumnos, profesores e instituciones')
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='10k',
+                        help='Alumnos a generar (profesores = 1/10, instituciones = 1/100)')
+    parser.add_argument('--alumnos', type=int)
+    parser.add_argument('--profesores', type=int)
+    parser.add_argument('--instituciones', type=int)
+    parser.add_argument('--limpiar', action='store_true', help='Vaciar las tablas antes de generar')
+    args = parser.parse_args()
+
+    alumnos = args.alumnos if args.alumnos is not None else ESCALAS[args.escala]
+    filas = {
+        'instituciones': args.instituciones if args.instituciones is not None else max(1, alumnos // 100),
+        'profesores': args.profesores if args.profesores is not None else max(1, alumnos // 10),
+        'alumnos': alumnos,
+    }
+
+    # Crear la app registra la configuración del engine y del hasher
+    from app import create_app
+    from werkzeug.security import generate_password_hash
+    app = create_app()
+    password_hash = generate_password_hash(PASSWORD, method=app.config['PASSWORD_HASH_METHOD'],
+                                           salt_length=app.config['PASSWORD_SALT_LENGTH'])
+
+    with database.get_engine().connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        conn.execute(text('SET statement_timeout = 0'))
+        if args.limpiar:
+            print('Vaciando tablas...')
+            conn.execute(text('TRUNCATE alumnos, profesores, instituciones RESTART IDENTITY CASCADE'))
+
+        for tabla, cantidad in filas.items():
+            inicio = time.perf_counter()
+            poblar(conn, tabla, cantidad, password_hash)
+            segundos = time.perf_counter() - inicio
+            print(f'{tabla:<14} {cantidad:>10,} filas en {segundos:6.1f}s '
+                  f'({cantidad / max(segundos, 1e-6):,.0f} filas/s)')
+
+    # Las respuestas en caché ya no corresponden a los datos nuevos
+    from utils.cache import cache
+    for recurso in filas:
+        cache.invalidate(recurso)
+    print(f'Contraseña de todos los alumnos generados: {PASSWORD}')
+
+
+if __name__ == '__main__':
+    main()
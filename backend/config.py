@@ -19,9 +19,126 @@ class Config:
     # URL de conexión a la base de datos
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
+
+    # Pool de conexiones (un solo engine por proceso, ver database.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # segundos antes de reciclar una conexión
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))  # 0 = sin límite
+
+    # Respuestas JSON: usar orjson en jsonify si está instalado
+    JSON_FAST_ENCODER = os.environ.get('JSON_FAST_ENCODER', 'true').lower() == 'true'
+
+    # Paginación de listados
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 500))  # límite duro del servidor
+
+    # Relaciones embebidas con ?include= (máximo de hijos por registro en uno-a-muchos)
+    INCLUDE_MAX_RELATED = int(os.environ.get('INCLUDE_MAX_RELATED', 50))
+
+    # Operaciones masivas (/<recurso>/bulk)
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 10000))
+
+    # Importación de archivos CSV/NDJSON (filas por lote de COPY)
+    IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+
+    # Exportación en streaming (filas por lectura del cursor y nivel de gzip)
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 2000))
+    EXPORT_GZIP_LEVEL = int(os.environ.get('EXPORT_GZIP_LEVEL', 6))
+
+    # CORS: orígenes permitidos (coma) y segundos que el navegador guarda el preflight
+    CORS_ORIGINS = [o.strip() for o in os.environ.get('ORIGEN_FRONT', '*').split(',') if o.strip()]
+    CORS_MAX_AGE = int(os.environ.get('CORS_MAX_AGE', 7200))  # Chrome no guarda más de 2 horas
+
+    # Compresión de respuestas según Accept-Encoding (zstd y br solo si su paquete está instalado)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_ALGORITHMS = os.environ.get('COMPRESS_ALGORITHMS', 'zstd,br,gzip')  # orden de preferencia
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))  # bytes; las respuestas en streaming siempre
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL', 3))
+    COMPRESS_CACHE_ENTRIES = int(os.environ.get('COMPRESS_CACHE_ENTRIES', 256))  # cuerpos comprimidos por ETag
+
+    # Caché de respuestas (listados): memory = LRU por proceso (invalidada en todos con el feed de
+    # cambios, utils/eventos.py), redis = compartida
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://redis:6379/0')  # local:// = sustituto en memoria
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))  # segundos
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 10000))
+    CACHE_SHARED_MAX_AGE = int(os.environ.get('CACHE_SHARED_MAX_AGE', 5))  # s-maxage para el proxy_cache de nginx; 0 = no-cache
+
+    # Estadísticas del dashboard (/stats)
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 30))  # segundos en caché por proceso
+    STATS_ACTIVITY_DAYS = int(os.environ.get('STATS_ACTIVITY_DAYS', 30))
+
+    # Reportes (/reportes): segundos entre REFRESH CONCURRENTLY de las vistas; 0 = solo manual o cron
+    REPORTES_REFRESH_SECONDS = int(os.environ.get('REPORTES_REFRESH_SECONDS', 300))
+
+    # Límite de peticiones: cubetas de fichas por IP y por usuario (ver utils/ratelimit.py)
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')  # memory = por proceso, redis = compartido
+    RATELIMIT_REDIS_URL = os.environ.get('RATELIMIT_REDIS_URL', CACHE_REDIS_URL)  # local:// = sustituto en memoria
+    RATELIMIT_IP_RATE = float(os.environ.get('RATELIMIT_IP_RATE', 20))  # fichas por segundo
+    RATELIMIT_IP_BURST = float(os.environ.get('RATELIMIT_IP_BURST', 200))  # tamaño de la cubeta
+    RATELIMIT_USER_RATE = float(os.environ.get('RATELIMIT_USER_RATE', 10))
+    RATELIMIT_USER_BURST = float(os.environ.get('RATELIMIT_USER_BURST', 100))
+    # Proxies delante del backend: 1 detrás del nginx del frontend (compose.yaml lo define), 0 si
+    # los clientes llegan directo; con 0 detrás de nginx todos comparten la cubeta de su IP
+    RATELIMIT_TRUSTED_PROXIES = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 0))
+    # IPs o redes (separadas por comas) desde las que se acepta X-Forwarded-For; las demás
+    # conexiones se cuentan por su propia IP aunque traigan el encabezado
+    RATELIMIT_PROXY_IPS = os.environ.get('RATELIMIT_PROXY_IPS', '127.0.0.1,::1')
+    RATELIMIT_MAX_KEYS = int(os.environ.get('RATELIMIT_MAX_KEYS', 100000))  # cubetas en memoria por proceso
+
+    # Trabajos en segundo plano (flask worker): reintentos con espera exponencial y latido
+    TRABAJOS_CONCURRENCIA = int(os.environ.get('TRABAJOS_CONCURRENCIA', 2))  # hilos por worker
+    TRABAJOS_MAX_INTENTOS = int(os.environ.get('TRABAJOS_MAX_INTENTOS', 3))
+    TRABAJOS_BACKOFF_SEGUNDOS = int(os.environ.get('TRABAJOS_BACKOFF_SEGUNDOS', 10))  # espera tras el 1er fallo
+    TRABAJOS_BACKOFF_MAX = int(os.environ.get('TRABAJOS_BACKOFF_MAX', 600))
+    TRABAJOS_POLL_SECONDS = int(os.environ.get('TRABAJOS_POLL_SECONDS', 5))  # además de pg_notify
+    TRABAJOS_LATIDO_SEGUNDOS = int(os.environ.get('TRABAJOS_LATIDO_SEGUNDOS', 15))
+    TRABAJOS_ABANDONO_SEGUNDOS = int(os.environ.get('TRABAJOS_ABANDONO_SEGUNDOS', 120))  # sin latido = worker caído
+    TRABAJOS_RETENCION_DIAS = int(os.environ.get('TRABAJOS_RETENCION_DIAS', 7))  # terminados y sus archivos
+
+    # Feed de cambios en /events (Server-Sent Events): un LISTEN por worker y un búfer para Last-Event-ID
+    EVENTOS_ENABLED = os.environ.get('EVENTOS_ENABLED', 'true').lower() == 'true'
+    EVENTOS_BUFFER = int(os.environ.get('EVENTOS_BUFFER', 1000))  # eventos recientes por proceso
+    EVENTOS_KEEPALIVE_SECONDS = int(os.environ.get('EVENTOS_KEEPALIVE_SECONDS', 15))
+    EVENTOS_MAX_CLIENTES = int(os.environ.get('EVENTOS_MAX_CLIENTES', 2))  # por proceso; cada uno ocupa un hilo
+    EVENTOS_RETRY_MS = int(os.environ.get('EVENTOS_RETRY_MS', 3000))  # espera de EventSource al reconectarse
+
+    # Hash de contraseñas (método de werkzeug; al cambiarlo se rehashea en el siguiente login)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+    HASHER_WORKERS = int(os.environ.get('HASHER_WORKERS', 0))  # procesos del pool; 0 = núcleos / GUNICORN_WORKERS
+    HASHER_MAX_PENDING = int(os.environ.get('HASHER_MAX_PENDING', 0))  # hashes en curso antes de 429; 0 = 4 por proceso
+    HASHER_TIMEOUT = int(os.environ.get('HASHER_TIMEOUT', 30))  # segundos esperando un resultado
+
+    # Métricas (/metrics, Server-Timing y registro de peticiones lentas)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'true').lower() == 'true'
+    METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 500))  # 0 = no registrar
+
+    # Administración: X-Admin-Token debe coincidir (vacío = rutas /admin deshabilitadas)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+    # Perfilado por petición (X-Profile: 1 con X-Admin-Token, o muestreo) y EXPLAIN de consultas lentas
+    PROFILER_DIR = os.environ.get('PROFILER_DIR', 'profiles')  # relativo a backend/
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))  # 0.01 = 1% de las peticiones
+    PROFILER_MAX_FILES = int(os.environ.get('PROFILER_MAX_FILES', 200))
+    PROFILER_MAX_MB = int(os.environ.get('PROFILER_MAX_MB', 200))
+    EXPLAIN_SLOW_QUERY_MS = int(os.environ.get('EXPLAIN_SLOW_QUERY_MS', 1000))  # 0 = no capturar planes
+    EXPLAIN_MAX_PER_MINUTE = int(os.environ.get('EXPLAIN_MAX_PER_MINUTE', 10))  # por proceso
+
     # JWT
-    JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hora
+    JWT_ALGORITHM = 'HS256'
+    JWT_KEY_ID = os.environ.get('JWT_KID', 'principal')  # kid de la llave activa (JWT_SECRETO)
+    JWT_KEYS = os.environ.get('JWT_LLAVES', '')  # llaves anteriores que solo verifican: "kid:secreto,..."
+    JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600))  # 1 hora
+    JWT_REFRESH_TOKEN_EXPIRES = int(os.environ.get('JWT_REFRESH_TOKEN_EXPIRES', 30 * 24 * 3600))  # 30 días
+    JWT_CACHE_SIZE = int(os.environ.get('JWT_CACHE_SIZE', 10000))  # tokens verificados en memoria
 
 class DevelopmentConfig(Config):
     """Configuración para desarrollo"""
@@ -0,0 +1,79 @@
+# Conexión única a la base de datos
+# Un solo engine (con su pool de conexiones) por proceso, compartido por
+# todos los blueprints, y una sesión por petición que se abre al primer uso.
+# El engine se crea la primera vez que se necesita, no al crear la app.
+import threading
+
+from flask import g
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Fábrica de sesiones; se enlaza al engine en init_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+engine = None
+
+# Configuración registrada por init_app para crear el engine al primer uso
+_app_config = None
+_engine_lock = threading.Lock()
+
+
+def init_engine(app_config):
+    """Crear el engine compartido a partir de la configuración"""
+    global engine
+    if engine is not None:
+        return engine
+
+    connect_args = {}
+    timeout_ms = app_config.get('DB_STATEMENT_TIMEOUT_MS')
+    if timeout_ms:
+        # Cortar en Postgres las consultas que excedan el límite
+        connect_args['options'] = f'-c statement_timeout={int(timeout_ms)}'
+
+    engine = create_engine(
+        app_config['SQLALCHEMY_DATABASE_URI'],
+        pool_size=app_config.get('DB_POOL_SIZE', 5),
+        max_overflow=app_config.get('DB_MAX_OVERFLOW', 10),
+        pool_timeout=app_config.get('DB_POOL_TIMEOUT', 30),
+        pool_recycle=app_config.get('DB_POOL_RECYCLE', 1800),
+        pool_pre_ping=app_config.get('DB_POOL_PRE_PING', True),
+        connect_args=connect_args,
+        # utils/metrics.py cambia el pool por uno que mide la espera del checkout
+        poolclass=app_config.get('DB_POOL_CLASS'),
+    )
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+def get_engine():
+    """Obtener el engine compartido; se crea al primer uso con la configuración de init_app"""
+    if engine is None:
+        if _app_config is None:
+            raise RuntimeError('La base de datos no ha sido inicializada')
+        with _engine_lock:
+            init_engine(_app_config)
+    return engine
+
+
+def get_db():
+    """Sesión de la petición actual; se crea la primera vez que se pide"""
+    if 'db' not in g:
+        get_engine()
+        g.db = SessionLocal()
+    return g.db
+
+
+def close_db(exception=None):
+    """Cerrar la sesión de la petición (devuelve la conexión al pool)"""
+    db = g.pop('db', None)
+    if db is not None:
+        if exception is not None:
+            db.rollback()
+        db.close()
+
+
+def init_app(app):
+    """Registrar la configuración del engine y el cierre de sesión en la aplicación"""
+    global _app_config
+    _app_config = app.config
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,75 @@
+# Conexión async a la base de datos (modo ASGI, asgi.py)
+# Mismo esquema de database.py: un engine por proceso creado al primer uso,
+# pero con el driver asyncpg y AsyncSession. Los modelos son los mismos.
+import asyncio
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Fábrica de sesiones; se enlaza al engine en init_engine()
+SessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+engine = None
+
+_app_config = None
+_engine_lock = asyncio.Lock()
+
+
+def async_url(uri):
+    """La misma URL de SQLALCHEMY_DATABASE_URI con el driver asyncpg"""
+    return make_url(uri).set(drivername='postgresql+asyncpg')
+
+
+def init_engine(app_config):
+    """Crear el engine async compartido a partir de la configuración"""
+    global engine
+    if engine is not None:
+        return engine
+
+    connect_args = {}
+    timeout_ms = app_config.get('DB_STATEMENT_TIMEOUT_MS')
+    if timeout_ms:
+        # Equivalente asyncpg de options='-c statement_timeout=...'
+        connect_args['server_settings'] = {'statement_timeout': str(int(timeout_ms))}
+
+    engine = create_async_engine(
+        async_url(app_config['SQLALCHEMY_DATABASE_URI']),
+        pool_size=app_config.get('DB_POOL_SIZE', 5),
+        max_overflow=app_config.get('DB_MAX_OVERFLOW', 10),
+        pool_timeout=app_config.get('DB_POOL_TIMEOUT', 30),
+        pool_recycle=app_config.get('DB_POOL_RECYCLE', 1800),
+        pool_pre_ping=app_config.get('DB_POOL_PRE_PING', True),
+        connect_args=connect_args,
+    )
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+async def get_engine():
+    """Obtener el engine async; se crea al primer uso con la configuración de init_app"""
+    if engine is None:
+        if _app_config is None:
+            raise RuntimeError('La base de datos no ha sido inicializada')
+        async with _engine_lock:
+            init_engine(_app_config)
+    return engine
+
+
+async def get_db():
+    """Sesión nueva; usar como `async with await get_db() as db:`"""
+    await get_engine()
+    return SessionLocal()
+
+
+async def dispose():
+    """Cerrar las conexiones del pool al apagar el worker"""
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+
+
+def init_app(app):
+    """Registrar la configuración del engine async"""
+    global _app_config
+    _app_config = app.config
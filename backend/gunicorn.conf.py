@@ -0,0 +1,50 @@
+# Configuración de gunicorn para producción
+#
+#   gunicorn -c gunicorn.conf.py "app:create_app()"
+#
+# Todo se puede ajustar con variables de entorno (ver DOCUMENTACION_COMPLETA.md).
+import multiprocessing
+import os
+
+# Dirección donde escucha el servidor
+bind = f"0.0.0.0:{os.environ.get('BACKEND_PORT', '5000')}"
+
+# sync: un hilo por worker; gthread: hilos por worker (por defecto);
+# gevent: corrutinas, requiere gevent y psycogreen instalados
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+# Por defecto (2 x núcleos) + 1, la recomendación de gunicorn
+workers = int(os.environ.get('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+# Para la app: el pool del hasher reparte los núcleos entre los workers (utils/hasher.py)
+os.environ['GUNICORN_WORKERS'] = str(workers)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))  # solo gthread
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))  # solo gevent
+
+# Importar la app una vez en el proceso maestro: modelos, blueprints y
+# configuración se comparten copy-on-write entre los workers. Con gevent se
+# desactiva por defecto porque el monkey-patching debe ocurrir antes de importar.
+preload_app = os.environ.get('GUNICORN_PRELOAD', str(worker_class != 'gevent')).lower() == 'true'
+
+# Reciclar cada worker tras N peticiones (con variación para que no reinicien todos a la vez)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None  # vacío = sin log de acceso
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # psycopg2 es C puro: sin esto bloquea el loop de gevent en cada consulta
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+    # Con preload_app el maestro pudo abrir conexiones; cada worker arma su propio pool
+    import database
+    if database.engine is not None:
+        database.engine.dispose(close=False)
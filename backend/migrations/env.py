@@ -16,12 +16,9 @@ logger = logging.getLogger('alembic.env')
 
 
 def get_engine():
-    try:
-        # this works with Flask-SQLAlchemy<3 and Alchemical
-        return current_app.extensions['migrate'].db.get_engine()
-    except (TypeError, AttributeError):
-        # this works with Flask-SQLAlchemy>=3
-        return current_app.extensions['migrate'].db.engine
+    # La app no usa Flask-SQLAlchemy: el engine compartido vive en database.py
+    import database
+    return database.get_engine()
 
 
 def get_engine_url():
@@ -37,6 +34,7 @@ def get_engine_url():
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 config.set_main_option('sqlalchemy.url', get_engine_url())
+# Migrate(app, Base) registra la Base declarativa de models como "db"
 target_db = current_app.extensions['migrate'].db
 
 # other values from the config, defined by the needs of env.py,
@@ -51,6 +49,18 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Los índices trigram (pg_trgm) solo existen en las migraciones, no en
+    # los modelos; evitar que autogenerate proponga borrarlos
+    if type_ == 'index' and name and name.endswith('_trgm'):
+        return False
+    # Las vistas de reportes y su tabla de estado se manejan fuera de los modelos (utils/reportes.py),
+    # igual que la cola de trabajos (utils/trabajos.py)
+    if type_ == 'table' and name and name.startswith(('reporte', 'trabajos')):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +75,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -100,6 +111,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_object=include_object,
             **conf_args
         )
 
@@ -0,0 +1,70 @@
+"""esquema inicial: alumnos, profesores e instituciones
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases creadas antes con create_all() ya tienen estas tablas
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('alumnos'):
+        op.create_table(
+            'alumnos',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nombre', sa.String(length=100), nullable=False),
+            sa.Column('apellido', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('carrera', sa.String(length=100), nullable=False),
+            sa.Column('semestre', sa.Integer(), nullable=False),
+            sa.Column('periodo', sa.String(length=50), nullable=False),
+            sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+
+    if not inspector.has_table('profesores'):
+        op.create_table(
+            'profesores',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nombre', sa.String(length=50), nullable=False),
+            sa.Column('apellido', sa.String(length=50), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('especialidad', sa.String(length=50), nullable=False),
+            sa.Column('departamento', sa.String(length=50), nullable=False),
+            sa.Column('telefono', sa.String(length=20), nullable=True),
+            sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+
+    if not inspector.has_table('instituciones'):
+        op.create_table(
+            'instituciones',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nombre', sa.String(length=100), nullable=False),
+            sa.Column('direccion', sa.String(length=200), nullable=False),
+            sa.Column('telefono', sa.String(length=20), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=True),
+            sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('instituciones')
+    op.drop_table('profesores')
+    op.drop_table('alumnos')
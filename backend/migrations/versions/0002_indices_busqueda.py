@@ -0,0 +1,64 @@
+"""índices para filtros y búsqueda de los listados
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# Índices btree compuestos (también declarados en los modelos)
+BTREE = [
+    ('ix_alumnos_carrera_semestre_periodo', 'alumnos', ['carrera', 'semestre', 'periodo', 'id']),
+    ('ix_alumnos_periodo_semestre', 'alumnos', ['periodo', 'semestre', 'id']),
+    ('ix_profesores_departamento_especialidad', 'profesores', ['departamento', 'especialidad', 'id']),
+    ('ix_profesores_especialidad', 'profesores', ['especialidad', 'id']),
+]
+
+# Índices trigram para ILIKE por prefijo y subcadena (?nombre=, ?q=)
+TRGM = [
+    ('alumnos', 'nombre'),
+    ('alumnos', 'apellido'),
+    ('alumnos', 'email'),
+    ('profesores', 'nombre'),
+    ('profesores', 'apellido'),
+    ('profesores', 'email'),
+    ('instituciones', 'nombre'),
+    ('instituciones', 'email'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY no bloquea escrituras en tablas grandes, pero no puede
+    # ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns in BTREE:
+            op.create_index(name, table, columns, postgresql_concurrently=True,
+                            if_not_exists=True)
+        for table, column in TRGM:
+            op.create_index(f'ix_{table}_{column}_trgm', table, [column],
+                            postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'},
+                            postgresql_concurrently=True,
+                            if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, column in TRGM:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
+        for name, table, columns in BTREE:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True,
+                          if_exists=True)
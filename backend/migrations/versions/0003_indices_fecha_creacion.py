@@ -0,0 +1,33 @@
+"""índices sobre fecha_creacion para la actividad reciente de /stats
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+TABLAS = ['alumnos', 'profesores', 'instituciones']
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLAS:
+            op.create_index(f'ix_{table}_fecha_creacion', table, ['fecha_creacion'],
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLAS:
+            op.drop_index(f'ix_{table}_fecha_creacion', table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,50 @@
+"""llaves foráneas de alumnos y profesores hacia instituciones
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+TABLAS = ['alumnos', 'profesores']
+
+
+def upgrade():
+    for table in TABLAS:
+        # Columna nullable sin default: no reescribe la tabla
+        op.add_column(table, sa.Column('institucion_id', sa.Integer(), nullable=True))
+        # NOT VALID evita recorrer la tabla con un bloqueo exclusivo; se valida después
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_institucion_id_fkey '
+                   f'FOREIGN KEY (institucion_id) REFERENCES instituciones (id) '
+                   f'ON DELETE SET NULL NOT VALID')
+
+    # Fuera de la transacción del ADD: así se libera su bloqueo exclusivo antes
+    # de recorrer la tabla, y VALIDATE solo toma SHARE UPDATE EXCLUSIVE
+    with op.get_context().autocommit_block():
+        for table in TABLAS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_institucion_id_fkey')
+
+        # Alumnos/profesores de una institución paginados por id; también cubre el ON DELETE
+        for table in TABLAS:
+            op.create_index(f'ix_{table}_institucion_id', table, ['institucion_id', 'id'],
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLAS:
+            op.drop_index(f'ix_{table}_institucion_id', table_name=table,
+                          postgresql_concurrently=True, if_exists=True)
+    for table in TABLAS:
+        op.drop_constraint(f'{table}_institucion_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'institucion_id')
@@ -0,0 +1,47 @@
+"""vistas materializadas de reportes de inscripción
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Conteo de alumnos por todas las dimensiones de los reportes; /reportes suma
+    # sobre estas filas en lugar de recorrer alumnos
+    op.execute("""
+        CREATE MATERIALIZED VIEW reporte_alumnos AS
+        SELECT institucion_id, carrera, periodo, semestre,
+               extract(year FROM fecha_creacion)::integer AS anio,
+               count(*)::integer AS total
+        FROM alumnos
+        GROUP BY institucion_id, carrera, periodo, semestre, anio
+    """)
+    # REFRESH ... CONCURRENTLY exige un índice único sobre columnas simples (el GROUP BY
+    # garantiza una fila por combinación, también cuando institucion_id es NULL)
+    op.create_index('ux_reporte_alumnos', 'reporte_alumnos',
+                    ['institucion_id', 'carrera', 'periodo', 'semestre', 'anio'], unique=True)
+
+    # Última actualización de cada vista y los cambios de la tabla fuente que ya incluye
+    op.create_table(
+        'reportes_estado',
+        sa.Column('vista', sa.String(length=63), primary_key=True),
+        sa.Column('actualizado', sa.DateTime(), nullable=False),
+        sa.Column('cambios', sa.BigInteger(), nullable=False),
+        sa.Column('duracion_ms', sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('reportes_estado')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS reporte_alumnos')
@@ -0,0 +1,30 @@
+"""columna version para concurrencia optimista
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+TABLAS = ['alumnos', 'profesores', 'instituciones']
+
+
+def upgrade():
+    for table in TABLAS:
+        # Default constante: Postgres 11+ lo guarda en el catálogo sin reescribir la tabla
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in TABLAS:
+        op.drop_column(table, 'version')
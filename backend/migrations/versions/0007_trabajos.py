@@ -0,0 +1,63 @@
+"""cola de trabajos en segundo plano
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+AHORA = sa.text("(now() AT TIME ZONE 'utc')")
+
+
+def upgrade():
+    op.create_table(
+        'trabajos',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False, server_default='pendiente'),
+        sa.Column('parametros', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('progreso', postgresql.JSONB(), nullable=True),
+        sa.Column('resultado', postgresql.JSONB(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('intentos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_intentos', sa.Integer(), nullable=False, server_default='3'),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('creado', sa.DateTime(), nullable=False, server_default=AHORA),
+        sa.Column('disponible_en', sa.DateTime(), nullable=False, server_default=AHORA),
+        sa.Column('iniciado', sa.DateTime(), nullable=True),
+        sa.Column('latido', sa.DateTime(), nullable=True),
+        sa.Column('terminado', sa.DateTime(), nullable=True),
+    )
+    # Índices parciales: la cola (pendientes listos para correr) y los que están
+    # corriendo (para detectar workers caídos) son una fracción pequeña de la tabla
+    op.create_index('ix_trabajos_pendientes', 'trabajos', ['disponible_en', 'id'],
+                    postgresql_where=sa.text("estado = 'pendiente'"))
+    op.create_index('ix_trabajos_en_curso', 'trabajos', ['latido'],
+                    postgresql_where=sa.text("estado = 'en_curso'"))
+    op.create_index('ix_trabajos_terminado', 'trabajos', ['terminado'])
+
+    # Archivos de entrada (importaciones) y de salida (exportaciones) en partes de 1 MB
+    op.create_table(
+        'trabajos_datos',
+        sa.Column('trabajo_id', sa.BigInteger(), sa.ForeignKey('trabajos.id', ondelete='CASCADE'),
+                  primary_key=True),
+        sa.Column('tipo', sa.String(length=10), primary_key=True),
+        sa.Column('parte', sa.Integer(), primary_key=True),
+        sa.Column('datos', sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('trabajos_datos')
+    op.drop_table('trabajos')
@@ -0,0 +1,26 @@
+"""secuencia de ids del feed de cambios
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cada evento publicado con pg_notify toma su id de aquí, así que el mismo
+    # evento tiene el mismo id en todos los workers (Last-Event-ID sirve en cualquiera)
+    op.execute(sa.schema.CreateSequence(sa.Sequence('cambios_id_seq')))
+
+
+def downgrade():
+    op.execute(sa.schema.DropSequence(sa.Sequence('cambios_id_seq')))
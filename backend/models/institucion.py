@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 # Importar Base del __init__.py
@@ -12,7 +13,12 @@ class Institucion(Base):
     direccion = Column(String(200), nullable=False)
     telefono = Column(String(20), nullable=False)
     email = Column(String(120))
-    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, index=True)  # actividad reciente en /stats
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # concurrencia optimista (If-Match)
+
+    # Al borrar la institución, la base deja institucion_id en NULL (ondelete='SET NULL')
+    alumnos = relationship('Alumno', back_populates='institucion', passive_deletes=True)
+    profesores = relationship('Profesor', back_populates='institucion', passive_deletes=True)
     
     def __repr__(self):
         return f'<Institucion {self.nombre}>'
\ No newline at end of file
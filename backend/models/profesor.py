@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, ForeignKey
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 # Importar Base del __init__.py
@@ -6,6 +7,13 @@ from . import Base
 
 class Profesor(Base):
     __tablename__ = 'profesores'
+    __table_args__ = (
+        # Filtros del listado; el id al final permite paginar por cursor sin ordenar
+        Index('ix_profesores_departamento_especialidad', 'departamento', 'especialidad', 'id'),
+        Index('ix_profesores_especialidad', 'especialidad', 'id'),
+        # Profesores de una institución (/instituciones/<id>/profesores) paginados por id
+        Index('ix_profesores_institucion_id', 'institucion_id', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     nombre = Column(String(50), nullable=False)
@@ -14,7 +22,11 @@ class Profesor(Base):
     especialidad = Column(String(50), nullable=False)
     departamento = Column(String(50), nullable=False)
     telefono = Column(String(20))
-    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, index=True)  # actividad reciente en /stats
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # concurrencia optimista (If-Match)
+    institucion_id = Column(Integer, ForeignKey('instituciones.id', ondelete='SET NULL'))
+
+    institucion = relationship('Institucion', back_populates='profesores')
     
     def __repr__(self):
         return f'<Profesor {self.email}>'
\ No newline at end of file
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, ForeignKey
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 # Importar Base del __init__.py
@@ -6,6 +7,13 @@ from . import Base
 
 class Alumno(Base):
     __tablename__ = 'alumnos'
+    __table_args__ = (
+        # Filtros del listado; el id al final permite paginar por cursor sin ordenar
+        Index('ix_alumnos_carrera_semestre_periodo', 'carrera', 'semestre', 'periodo', 'id'),
+        Index('ix_alumnos_periodo_semestre', 'periodo', 'semestre', 'id'),
+        # Alumnos de una institución (/instituciones/<id>/alumnos) paginados por id
+        Index('ix_alumnos_institucion_id', 'institucion_id', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     nombre = Column(String(100), nullable=False)
@@ -15,7 +23,11 @@ class Alumno(Base):
     carrera = Column(String(100), nullable=False)
     semestre = Column(Integer, nullable=False)
     periodo = Column(String(50), nullable=False)
-    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow, index=True)  # actividad reciente en /stats
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # concurrencia optimista (If-Match)
+    institucion_id = Column(Integer, ForeignKey('instituciones.id', ondelete='SET NULL'))
+
+    institucion = relationship('Institucion', back_populates='alumnos')
     
     def __repr__(self):
         return f'<Alumno {self.email}>'
\ No newline at end of file
@@ -1,11 +1,30 @@
 # Routes package initialization
-from flask import Blueprint
+#
+# Los blueprints se importan bajo demanda (app.BLUEPRINTS); importar un solo
+# módulo de rutas no carga los demás.
+from importlib import import_module
+
+_BLUEPRINT_MODULES = {
+    'health_bp': '.health',
+    'metrics_bp': '.metrics',
+    'admin_bp': '.admin',
+    'auth_bp': '.auth',
+    'alumnos_bp': '.usuarios',
+    'profesores_bp': '.profesores',
+    'instituciones_bp': '.instituciones',
+    'stats_bp': '.stats',
+    'reportes_bp': '.reportes',
+    'importacion_bp': '.importacion',
+    'trabajos_bp': '.trabajos',
+    'eventos_bp': '.eventos',
+}
+
+
+def __getattr__(name):
+    if name in _BLUEPRINT_MODULES:
+        return getattr(import_module(_BLUEPRINT_MODULES[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-# Importar todos los blueprints
-from .auth import auth_bp
-from .usuarios import alumnos_bp
-from .profesores import profesores_bp
-from .instituciones import instituciones_bp
 
 # Exportar todos los blueprints
-__all__ = ['auth_bp', 'alumnos_bp', 'profesores_bp', 'instituciones_bp']
+__all__ = list(_BLUEPRINT_MODULES)
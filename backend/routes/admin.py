@@ -0,0 +1,47 @@
+from flask import Blueprint, Response, jsonify, request, send_file
+from utils.auth import admin_required
+from utils.profiler import profiler
+
+# Crear blueprint
+admin_bp = Blueprint('admin', __name__)
+
+
+#"""Perfiles y planes guardados"""
+@admin_bp.route('/admin/perfiles', methods=['GET'])
+@admin_required
+def list_perfiles():
+    """Perfiles (.prof) y planes EXPLAIN guardados, del más reciente al más antiguo (?tipo=perfil|explain)"""
+    return jsonify({'items': profiler.entries(request.args.get('tipo'))})
+
+
+#"""Detalle de un perfil o plan"""
+@admin_bp.route('/admin/perfiles/<item_id>', methods=['GET'])
+@admin_required
+def get_perfil(item_id):
+    """Metadatos y plan completo (EXPLAIN) o resumen de pstats (?limit=, ?orden=)"""
+    path = profiler.file_path(item_id, '.json')
+    if path is None:
+        return jsonify({'error': 'Perfil no encontrado'}), 404
+
+    if profiler.file_path(item_id, '.prof') is not None:
+        try:
+            limit = int(request.args.get('limit', 40))
+        except ValueError:
+            return jsonify({'error': 'El parámetro limit debe ser un número entero'}), 400
+        orden = request.args.get('orden', 'cumulative')
+        if orden not in ('cumulative', 'tottime', 'calls'):
+            return jsonify({'error': f'Orden no soportado: {orden}'}), 400
+        return Response(profiler.summary(item_id, limit, orden), mimetype='text/plain')
+    return send_file(path, mimetype='application/json')
+
+
+#"""Descargar un perfil"""
+@admin_bp.route('/admin/perfiles/<item_id>/descargar', methods=['GET'])
+@admin_required
+def download_perfil(item_id):
+    """Archivo .prof para snakeviz, flameprof o pstats"""
+    path = profiler.file_path(item_id, '.prof')
+    if path is None:
+        return jsonify({'error': 'Perfil no encontrado'}), 404
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f'{item_id}.prof')
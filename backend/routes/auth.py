@@ -1,47 +1,62 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, g, request, jsonify
 import jwt
-from datetime import datetime, timedelta
-import os
+from sqlalchemy import select, update
 from models import Alumno
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from config import config
+from database import get_db
+from utils.auth import tokens, token_required, REFRESH
+from utils.cache import cache
+from utils.eventos import eventos
+from utils.hasher import hasher, HasherBusy, busy_response
 
 # Crear blueprint
 auth_bp = Blueprint('auth', __name__)
 
-# Configurar base de datos
-config_name = os.environ.get('FLASK_ENV', 'development')
-app_config = config[config_name]
-engine = create_engine(app_config.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def login_statement(email):
+    """Lo que necesita el login (credenciales y datos del token), sin cargar el modelo"""
+    return select(Alumno.id, Alumno.nombre, Alumno.apellido, Alumno.email, Alumno.password_hash) \
+        .where(Alumno.email == email)
+
+
+def rehash_statement(alumno, password_hash):
+    """Guardar el hash nuevo solo si la contraseña no cambió mientras se calculaba"""
+    return update(Alumno) \
+        .where(Alumno.id == alumno.id, Alumno.password_hash == alumno.password_hash) \
+        .values(password_hash=password_hash)
+
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Endpoint para iniciar sesión"""
     data = request.get_json()
-    db = SessionLocal()
+    db = get_db()
     try:
         # Validar campos requeridos
         if not data.get('email') or not data.get('password'):
             return jsonify({'error': 'Email y contraseña son requeridos'}), 400
         
-        # Buscar alumno por email
-        alumno = db.query(Alumno).filter(Alumno.email == data['email']).first()
+        # Buscar alumno por email y devolver la conexión al pool antes de PBKDF2:
+        # una ráfaga de logins no debe ocupar el pool mientras se verifican
+        alumno = db.execute(login_statement(data['email'])).first()
+        db.rollback()
         
-        if not alumno or not check_password_hash(alumno.password_hash, data['password']):
+        if not alumno or not hasher.verify(alumno.password_hash, data['password']):
             return jsonify({'error': 'Credenciales inválidas'}), 401
         
-        # Generar token JWT
-        token = jwt.encode({
-            'user_id': alumno.id,
-            'email': alumno.email,
-            'exp': datetime.utcnow() + timedelta(hours=1)
-        }, app_config.JWT_SECRET_KEY, algorithm='HS256')
+        # Actualizar el hash si se generó con un algoritmo o costo anterior
+        if hasher.needs_rehash(alumno.password_hash):
+            try:
+                password_hash = hasher.hash(data['password'])
+            except HasherBusy:
+                # Se intentará en el siguiente login
+                password_hash = None
+            if password_hash is not None:
+                db.execute(rehash_statement(alumno, password_hash))
+                db.commit()
         
+        # Generar tokens JWT (acceso + refresco)
         return jsonify({
-            'token': token,
+            **tokens.issue(alumno),
             'user': {
                 'id': alumno.id,
                 'nombre': alumno.nombre,
@@ -51,16 +66,16 @@ def login():
             'mensaje': 'Login exitoso'
         })
         
+    except HasherBusy:
+        return busy_response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close()
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Endpoint para registro de alumno"""
     data = request.get_json()
-    db = SessionLocal()
+    db = get_db()
     try:
         # Validar campos requeridos
         required_fields = ['nombre', 'apellido', 'email', 'password', 'semestre', 'carrera', 'periodo']
@@ -69,6 +84,9 @@ def register():
         if missing_fields:
             return jsonify({'error': f'Campos requeridos: {", ".join(missing_fields)}'}), 400
         
+        # Hash antes de la primera consulta: la sesión no toma una conexión del pool mientras tanto
+        password_hash = hasher.hash(data['password'])
+        
         # Verificar si el email ya existe
         existing_alumno = db.query(Alumno).filter(Alumno.email == data['email']).first()
         if existing_alumno:
@@ -79,22 +97,55 @@ def register():
             nombre=data['nombre'],
             apellido=data['apellido'],
             email=data['email'],
-            password_hash=generate_password_hash(data['password']),
+            password_hash=password_hash,
             semestre=data['semestre'],
             carrera=data['carrera'],
             periodo=data['periodo']
         )
         
         db.add(alumno)
+        db.flush()
+        eventos.publish(db, 'alumnos', 'creado', [alumno.id], nombre=f'{alumno.nombre} {alumno.apellido}')
         db.commit()
+        cache.invalidate('alumnos')
         
         return jsonify({
             'id': alumno.id,
             'mensaje': 'Alumno registrado exitosamente'
         }), 201
         
+    except HasherBusy:
+        db.rollback()
+        return busy_response()
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
+
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    """Endpoint para renovar el token de acceso sin volver a enviar la contraseña"""
+    data = request.get_json(silent=True) or {}
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return jsonify({'error': 'refresh_token es requerido'}), 400
+
+    try:
+        claims = tokens.verify(refresh_token, REFRESH)
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Token de refresco expirado'}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({'error': 'Token de refresco inválido'}), 401
+
+    # Una consulta por llave primaria: el alumno pudo haberse eliminado
+    db = get_db()
+    alumno = db.get(Alumno, claims['user_id'])
+    if not alumno:
+        return jsonify({'error': 'Token de refresco inválido'}), 401
+
+    return jsonify(tokens.issue(alumno))
+
+@auth_bp.route('/me', methods=['GET'])
+@token_required
+def me(current_user_id):
+    """Datos del usuario autenticado tomados del token (sin consultar la base)"""
+    return jsonify({'id': current_user_id, 'email': g.jwt_claims.get('email')})
@@ -0,0 +1,36 @@
+from flask import Blueprint, Response, jsonify, request
+from utils.eventos import eventos, parse_snapshot
+
+# Crear blueprint
+eventos_bp = Blueprint('eventos', __name__)
+
+
+#"""Feed de cambios en vivo"""
+@eventos_bp.route('/events', methods=['GET'])
+def stream_eventos():
+    """Server-Sent Events con los cambios de alumnos, profesores e instituciones
+
+    Reanuda desde Last-Event-ID (lo envía EventSource al reconectarse), desde
+    ?desde=<id> o con lo que no incluye ?instantanea=<...> (el campo
+    "instantanea" de /stats).
+    """
+    if not eventos.enabled:
+        return jsonify({'error': 'El feed de eventos está deshabilitado'}), 404
+    instantanea = request.args.get('instantanea')
+    try:
+        instantanea = parse_snapshot(instantanea) if instantanea else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not eventos.acquire():
+        # Cada cliente ocupa un hilo mientras está conectado
+        response = jsonify({'error': 'Demasiados clientes de eventos en este proceso'})
+        response.headers['Retry-After'] = str(max(eventos.retry_ms // 1000, 1))
+        return response, 503
+
+    eventos.ensure_listener()
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    response = Response(eventos.stream(last_id, instantanea), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(eventos.release)
+    return response
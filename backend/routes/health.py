@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from database import get_engine
+
+# Crear blueprint
+health_bp = Blueprint('health', __name__)
+
+
+#"""Proceso vivo"""
+@health_bp.route('/health', methods=['GET'])
+def health():
+    """Liveness: el worker responde; no toca la base de datos"""
+    return jsonify({'estado': 'ok'})
+
+
+#"""Listo para recibir tráfico"""
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: hay una conexión disponible y la base responde"""
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text('SELECT 1'))
+    except Exception as e:
+        return jsonify({'estado': 'no disponible', 'error': e.__class__.__name__}), 503
+    return jsonify({'estado': 'ok'})
@@ -0,0 +1,79 @@
+import click
+from flask import Blueprint, current_app, request, jsonify
+from database import get_engine
+from utils.importer import Importer, FORMATS
+from utils.cache import cache
+from utils.trabajos import trabajos, accepted_response
+
+# Crear blueprint (cli_group=None registra los comandos en la raíz: flask importar ...)
+importacion_bp = Blueprint('importacion', __name__, cli_group=None)
+
+
+def _chunk_size():
+    return current_app.config.get('IMPORT_CHUNK_SIZE', 5000)
+
+
+#"""Importar un archivo CSV/NDJSON"""
+@importacion_bp.route('/<any(alumnos, profesores, instituciones):recurso>/import', methods=['POST'])
+def importar(recurso):
+    """Importar un archivo CSV o NDJSON (multipart "archivo" o cuerpo crudo)
+
+    Con ?async=1 el archivo se guarda y la importación la hace "flask worker":
+    responde 202 con el trabajo para seguir su progreso en /trabajos/<id>.
+    """
+    formato = request.args.get('format', 'csv')
+    if formato not in FORMATS:
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+
+    # Werkzeug guarda los archivos grandes en disco; se leen por partes
+    archivo = request.files.get('archivo')
+    stream = archivo.stream if archivo else request.stream
+
+    if request.args.get('async', '').lower() in ('1', 'true'):
+        try:
+            trabajo = trabajos.enqueue('importar', {'recurso': recurso, 'formato': formato,
+                                                    'lote': request.args.get('lote')}, input_stream=stream)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return accepted_response(trabajo)
+
+    def log_progress(report):
+        current_app.logger.info('Importando %s: %d procesadas, %d insertadas, %d rechazadas',
+                                recurso, report['procesadas'], report['insertadas'],
+                                report['rechazadas'])
+
+    try:
+        importer = Importer(get_engine(), recurso, _chunk_size())
+        return jsonify(importer.run(stream, formato, on_progress=log_progress))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    finally:
+        # Los lotes ya confirmados quedan aunque el archivo falle a la mitad
+        cache.invalidate(recurso)
+
+
+@importacion_bp.cli.command('importar')
+@click.argument('recurso', type=click.Choice(['alumnos', 'profesores', 'instituciones']))
+@click.argument('archivo', type=click.File('rb'))
+@click.option('--formato', type=click.Choice(FORMATS), default=None,
+              help='csv o ndjson (por defecto según la extensión)')
+@click.option('--lote', type=int, default=None, help='Filas por lote')
+def importar_command(recurso, archivo, formato, lote):
+    """Importar un archivo CSV/NDJSON de alumnos, profesores o instituciones"""
+    if formato is None:
+        formato = 'ndjson' if archivo.name.endswith(('.ndjson', '.jsonl')) else 'csv'
+
+    def progress(report):
+        click.echo(f"  {report['procesadas']} procesadas, {report['insertadas']} insertadas, "
+                   f"{report['rechazadas']} rechazadas")
+
+    importer = Importer(get_engine(), recurso, lote or _chunk_size())
+    try:
+        report = importer.run(archivo, formato, on_progress=progress)
+    finally:
+        cache.invalidate(recurso)
+
+    click.echo(f"Importación terminada: {report['insertadas']} insertadas, "
+               f"{report['rechazadas']} rechazadas de {report['procesadas']}")
+    for rechazo in report['rechazos']:
+        click.echo(f"  línea {rechazo['linea']}: {'; '.join(rechazo['errores'])}")
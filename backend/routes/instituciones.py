@@ -1,62 +1,121 @@
 from flask import Blueprint, request, jsonify
-from models import Institucion
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from config import config
-import os
+from models import Institucion, Alumno, Profesor
+from database import get_db
+from utils.pagination import parse_page_args, paginate
+from utils.cache import cached, invalidate_on_write
+from utils.serializers import serializer_for
+from utils.filters import parse_filters
+from utils.includes import parse_include, embed_includes
+from utils.exporter import export_response, FORMATS as EXPORT_FORMATS
+from utils.bulk import parse_bulk_items, parse_bulk_ids, bulk_create, bulk_update, bulk_delete
+from utils.validation import validate_record
+from utils.eventos import eventos
+from utils.versioning import parse_if_match, versioned_response, write_failure, apply_update, apply_delete
+from routes.usuarios import ALUMNO_FIELDS, ALUMNO_FILTERS, ALUMNO_SEARCH
+from routes.profesores import PROFESOR_FIELDS, PROFESOR_FILTERS, PROFESOR_SEARCH
 
 # Crear blueprint
 instituciones_bp = Blueprint('instituciones', __name__)
 
-# Configurar base de datos
-config_name = os.environ.get('FLASK_ENV', 'development')
-app_config = config[config_name]
-engine = create_engine(app_config.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Listados en caché (el detalle siempre se lee: su ETag lleva la versión); las escrituras los invalidan
+invalidate_on_write(instituciones_bp, 'instituciones')
+
+# Campos públicos que se pueden pedir con ?fields= (definidos en utils/serializers.py)
+INSTITUCION_FIELDS = serializer_for(Institucion).fields
+
+# Filtros del listado: igualdad exacta y búsqueda por prefijo (?q= busca subcadena)
+INSTITUCION_FILTERS = ()
+INSTITUCION_SEARCH = ('nombre', 'email')
+
+# Relaciones que se pueden embeber con ?include= (utils/includes.py)
+INSTITUCION_INCLUDES = ('alumnos', 'profesores')
+
+# Campos aceptados por las operaciones masivas (/instituciones/bulk)
+INSTITUCION_CREATE_FIELDS = ('nombre', 'direccion', 'telefono', 'email')
+INSTITUCION_UPDATE_FIELDS = ('nombre', 'direccion', 'telefono', 'email')
 
 #"""Obtener todas las instituciones"""
 @instituciones_bp.route('/instituciones', methods=['GET'])
+@cached('instituciones')
 def get_instituciones():
-    db = SessionLocal()
     try:
-        instituciones = db.query(Institucion).all()
-        return jsonify([{
-            'id': i.id,
-            'nombre': i.nombre,
-            'direccion': i.direccion,
-            'telefono': i.telefono,
-            'email': i.email,
-            'fecha_creacion': i.fecha_creacion.isoformat()
-        } for i in instituciones])
-    finally:
-        db.close()
+        limit, cursor, fields = parse_page_args(INSTITUCION_FIELDS)
+        criteria = parse_filters(Institucion, INSTITUCION_FILTERS, INSTITUCION_SEARCH)
+        include = parse_include(INSTITUCION_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    page = paginate(db, Institucion, fields, limit, cursor, criteria)
+    embed_includes(db, Institucion, page['items'], include)
+    return jsonify(page)
+
+#"""Exportar instituciones"""
+@instituciones_bp.route('/instituciones/export', methods=['GET'])
+def export_instituciones():
+    """Exportar instituciones en CSV o NDJSON (acepta los mismos filtros del listado)"""
+    formato = request.args.get('format', 'csv')
+    if formato not in EXPORT_FORMATS:
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+    try:
+        criteria = parse_filters(Institucion, INSTITUCION_FILTERS, INSTITUCION_SEARCH)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    gzip = request.args.get('gzip', '').lower() in ('1', 'true')
+    return export_response('instituciones', Institucion, INSTITUCION_FIELDS, formato, criteria, gzip)
 
 #"""Obtener una institución por ID"""
 @instituciones_bp.route('/instituciones/<int:institucion_id>', methods=['GET'])
 def get_institucion(institucion_id):
     """Obtener una institución por ID"""
-    db = SessionLocal()
     try:
-        institucion = db.query(Institucion).filter(Institucion.id == institucion_id).first()
-        if not institucion:
-            return jsonify({'error': 'Institución no encontrada'}), 404
-        return jsonify({
-            'id': institucion.id,
-            'nombre': institucion.nombre,
-            'direccion': institucion.direccion,
-            'telefono': institucion.telefono,
-            'email': institucion.email,
-            'fecha_creacion': institucion.fecha_creacion.isoformat()
-        })
-    finally:
-        db.close()
+        include = parse_include(INSTITUCION_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    institucion = serializer_for(Institucion).get(db, institucion_id)
+    if not institucion:
+        return jsonify({'error': 'Institución no encontrada'}), 404
+    embed_includes(db, Institucion, [institucion], include)
+    return versioned_response(institucion, request)
+
+def _related_page(institucion_id, model, allowed_fields, filters, search):
+    """Página de los registros de una institución con los filtros del listado del recurso"""
+    try:
+        limit, cursor, fields = parse_page_args(allowed_fields)
+        criteria = parse_filters(model, filters, search)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    if db.query(Institucion.id).filter(Institucion.id == institucion_id).first() is None:
+        return jsonify({'error': 'Institución no encontrada'}), 404
+    # Recorre el índice (institucion_id, id) con el mismo cursor por id
+    criteria.append(model.institucion_id == institucion_id)
+    return jsonify(paginate(db, model, fields, limit, cursor, criteria))
+
+#"""Alumnos de una institución"""
+@instituciones_bp.route('/instituciones/<int:institucion_id>/alumnos', methods=['GET'])
+@cached('alumnos')
+def get_institucion_alumnos(institucion_id):
+    """Alumnos de una institución, paginados y con los filtros de /alumnos"""
+    return _related_page(institucion_id, Alumno, ALUMNO_FIELDS, ALUMNO_FILTERS, ALUMNO_SEARCH)
+
+#"""Profesores de una institución"""
+@instituciones_bp.route('/instituciones/<int:institucion_id>/profesores', methods=['GET'])
+@cached('profesores')
+def get_institucion_profesores(institucion_id):
+    """Profesores de una institución, paginados y con los filtros de /profesores"""
+    return _related_page(institucion_id, Profesor, PROFESOR_FIELDS, PROFESOR_FILTERS, PROFESOR_SEARCH)
 
 #"""Crear una nueva institución"""
 @instituciones_bp.route('/instituciones', methods=['POST'])
 def create_institucion():
     """Crear una nueva institución"""
     data = request.get_json()
-    db = SessionLocal()
+    db = get_db()
     try:
         institucion = Institucion(
             nombre=data['nombre'],
@@ -65,53 +124,104 @@ def create_institucion():
             email=data.get('email')
         )
         db.add(institucion)
+        db.flush()
+        eventos.publish(db, 'instituciones', 'creado', [institucion.id], nombre=institucion.nombre)
         db.commit()
         return jsonify({'id': institucion.id, 'mensaje': 'Institución creada exitosamente'}), 201
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
 
 #"""Actualizar una institución"""
-@instituciones_bp.route('/instituciones/<int:institucion_id>', methods=['PUT'])
+@instituciones_bp.route('/instituciones/<int:institucion_id>', methods=['PUT', 'PATCH'])
 def update_institucion(institucion_id):
-    """Actualizar una institución"""
+    """Actualizar solo los campos enviados con un UPDATE (If-Match: versión esperada)"""
     data = request.get_json()
-    db = SessionLocal()
     try:
-        institucion = db.query(Institucion).filter(Institucion.id == institucion_id).first()
-        if not institucion:
-            return jsonify({'error': 'Institución no encontrada'}), 404
-        
-        institucion.nombre = data.get('nombre', institucion.nombre)
-        institucion.direccion = data.get('direccion', institucion.direccion)
-        institucion.telefono = data.get('telefono', institucion.telefono)
-        institucion.email = data.get('email', institucion.email)
-        
-        db.commit()
-        return jsonify({'mensaje': 'Institución actualizada exitosamente'})
+        expected = parse_if_match(request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    values, errors = validate_record(Institucion, data, INSTITUCION_UPDATE_FIELDS, partial=True)
+    if errors:
+        return jsonify({'error': '; '.join(errors)}), 400
+    if not values:
+        return jsonify({'error': 'No hay campos para actualizar'}), 400
+
+    db = get_db()
+    try:
+        version, current = apply_update(db, Institucion, institucion_id, values, expected)
+        if version is None:
+            payload, status = write_failure(current, 'Institución no encontrada')
+            return jsonify(payload), status
+        return jsonify({'mensaje': 'Institución actualizada exitosamente', 'version': version})
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
 
 #"""Eliminar una institución"""
 @instituciones_bp.route('/instituciones/<int:institucion_id>', methods=['DELETE'])
 def delete_institucion(institucion_id):
-    """Eliminar una institución"""
-    db = SessionLocal()
+    """Eliminar una institución con un DELETE ... RETURNING (If-Match: versión esperada)"""
     try:
-        institucion = db.query(Institucion).filter(Institucion.id == institucion_id).first()
-        if not institucion:
-            return jsonify({'error': 'Institución no encontrada'}), 404
-        
-        db.delete(institucion)
-        db.commit()
+        expected = parse_if_match(request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        deleted, current = apply_delete(db, Institucion, institucion_id, expected)
+        if not deleted:
+            payload, status = write_failure(current, 'Institución no encontrada')
+            return jsonify(payload), status
         return jsonify({'mensaje': 'Institución eliminada exitosamente'})
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
\ No newline at end of file
+
+#"""Crear instituciones en lote"""
+@instituciones_bp.route('/instituciones/bulk', methods=['POST'])
+def bulk_create_instituciones():
+    """Crear instituciones en lote con un reporte por registro"""
+    try:
+        items = parse_bulk_items(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_create(db, Institucion, items, INSTITUCION_CREATE_FIELDS, None))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+
+#"""Actualizar instituciones en lote"""
+@instituciones_bp.route('/instituciones/bulk', methods=['PATCH'])
+def bulk_update_instituciones():
+    """Actualizar instituciones en lote; cada registro lleva su id y solo los campos a cambiar"""
+    try:
+        items = parse_bulk_items(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_update(db, Institucion, items, INSTITUCION_UPDATE_FIELDS, None))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+
+#"""Eliminar instituciones en lote"""
+@instituciones_bp.route('/instituciones/bulk', methods=['DELETE'])
+def bulk_delete_instituciones():
+    """Eliminar instituciones en lote por lista de ids"""
+    try:
+        ids = parse_bulk_ids(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_delete(db, Institucion, ids))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
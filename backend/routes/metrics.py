@@ -0,0 +1,15 @@
+from flask import Blueprint, Response, jsonify
+import database
+from utils.metrics import metrics
+
+# Crear blueprint
+metrics_bp = Blueprint('metrics', __name__)
+
+
+#"""Métricas en formato Prometheus"""
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas del proceso que atiende la petición (formato de texto de Prometheus)"""
+    if not metrics.enabled:
+        return jsonify({'error': 'Métricas deshabilitadas'}), 404
+    return Response(metrics.render(database.engine), mimetype='text/plain; version=0.0.4')
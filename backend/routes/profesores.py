@@ -1,66 +1,93 @@
 from flask import Blueprint, request, jsonify
 from models import Profesor
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from config import config
-import os
+from database import get_db
+from utils.pagination import parse_page_args, paginate
+from utils.cache import cached, invalidate_on_write
+from utils.serializers import serializer_for
+from utils.filters import parse_filters
+from utils.includes import parse_include, with_include_fields, embed_includes
+from utils.exporter import export_response, FORMATS as EXPORT_FORMATS
+from utils.bulk import parse_bulk_items, parse_bulk_ids, bulk_create, bulk_update, bulk_delete
+from utils.validation import validate_record
+from utils.eventos import eventos
+from utils.versioning import parse_if_match, versioned_response, write_failure, apply_update, apply_delete
 
 # Crear blueprint
 profesores_bp = Blueprint('profesores', __name__)
 
-# Configurar base de datos
-config_name = os.environ.get('FLASK_ENV', 'development')
-app_config = config[config_name]
-engine = create_engine(app_config.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Listados en caché (el detalle siempre se lee: su ETag lleva la versión); las escrituras los invalidan
+invalidate_on_write(profesores_bp, 'profesores')
+
+# Campos públicos que se pueden pedir con ?fields= (definidos en utils/serializers.py)
+PROFESOR_FIELDS = serializer_for(Profesor).fields
+
+# Filtros del listado: igualdad exacta y búsqueda por prefijo (?q= busca subcadena)
+PROFESOR_FILTERS = ('departamento', 'especialidad', 'institucion_id')
+PROFESOR_SEARCH = ('nombre', 'apellido', 'email')
+
+# Relaciones que se pueden embeber con ?include= (utils/includes.py)
+PROFESOR_INCLUDES = ('institucion',)
+
+# Campos aceptados por las operaciones masivas (/profesores/bulk)
+PROFESOR_CREATE_FIELDS = ('nombre', 'apellido', 'email', 'especialidad', 'departamento', 'telefono',
+                          'institucion_id')
+PROFESOR_UPDATE_FIELDS = ('nombre', 'apellido', 'email', 'especialidad', 'departamento', 'telefono',
+                          'institucion_id')
 
 #"""Obtener todos los profesores"""
 @profesores_bp.route('/profesores', methods=['GET'])
+@cached('profesores')
 def get_profesores():
-    db = SessionLocal()
     try:
-        profesores = db.query(Profesor).all()
-        return jsonify([{
-            'id': p.id,
-            'nombre': p.nombre,
-            'apellido': p.apellido,
-            'email': p.email,
-            'especialidad': p.especialidad,
-            'departamento': p.departamento,
-            'telefono': p.telefono,
-            'fecha_creacion': p.fecha_creacion.isoformat()
-        } for p in profesores])
-    finally:
-        db.close()
+        limit, cursor, fields = parse_page_args(PROFESOR_FIELDS)
+        criteria = parse_filters(Profesor, PROFESOR_FILTERS, PROFESOR_SEARCH)
+        include = parse_include(PROFESOR_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    fields = with_include_fields(Profesor, fields, include)
+    page = paginate(db, Profesor, fields, limit, cursor, criteria)
+    embed_includes(db, Profesor, page['items'], include)
+    return jsonify(page)
+
+#"""Exportar profesores"""
+@profesores_bp.route('/profesores/export', methods=['GET'])
+def export_profesores():
+    """Exportar profesores en CSV o NDJSON (acepta los mismos filtros del listado)"""
+    formato = request.args.get('format', 'csv')
+    if formato not in EXPORT_FORMATS:
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+    try:
+        criteria = parse_filters(Profesor, PROFESOR_FILTERS, PROFESOR_SEARCH)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    gzip = request.args.get('gzip', '').lower() in ('1', 'true')
+    return export_response('profesores', Profesor, PROFESOR_FIELDS, formato, criteria, gzip)
 
 #"""Obtener un profesor por ID"""
 @profesores_bp.route('/profesores/<int:profesor_id>', methods=['GET'])
 def get_profesor(profesor_id):
     """Obtener un profesor por ID"""
-    db = SessionLocal()
     try:
-        profesor = db.query(Profesor).filter(Profesor.id == profesor_id).first()
-        if not profesor:
-            return jsonify({'error': 'Profesor no encontrado'}), 404
-        return jsonify({
-            'id': profesor.id,
-            'nombre': profesor.nombre,
-            'apellido': profesor.apellido,
-            'email': profesor.email,
-            'especialidad': profesor.especialidad,
-            'departamento': profesor.departamento,
-            'telefono': profesor.telefono,
-            'fecha_creacion': profesor.fecha_creacion.isoformat()
-        })
-    finally:
-        db.close()
+        include = parse_include(PROFESOR_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    profesor = serializer_for(Profesor).get(db, profesor_id)
+    if not profesor:
+        return jsonify({'error': 'Profesor no encontrado'}), 404
+    embed_includes(db, Profesor, [profesor], include)
+    return versioned_response(profesor, request)
 
 #"""Crear un nuevo profesor"""
 @profesores_bp.route('/profesores', methods=['POST'])
 def create_profesor():
     """Crear un nuevo profesor"""
     data = request.get_json()
-    db = SessionLocal()
+    db = get_db()
     try:
         profesor = Profesor(
             nombre=data['nombre'],
@@ -68,58 +95,108 @@ def create_profesor():
             email=data['email'],
             especialidad=data['especialidad'],
             departamento=data['departamento'],
-            telefono=data.get('telefono')
+            telefono=data.get('telefono'),
+            institucion_id=data.get('institucion_id')
         )
         db.add(profesor)
+        db.flush()
+        eventos.publish(db, 'profesores', 'creado', [profesor.id], nombre=f'{profesor.nombre} {profesor.apellido}')
         db.commit()
         return jsonify({'id': profesor.id, 'mensaje': 'Profesor creado exitosamente'}), 201
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
 
 #"""Actualizar un profesor"""
-@profesores_bp.route('/profesores/<int:profesor_id>', methods=['PUT'])
+@profesores_bp.route('/profesores/<int:profesor_id>', methods=['PUT', 'PATCH'])
 def update_profesor(profesor_id):
-    """Actualizar un profesor"""
+    """Actualizar solo los campos enviados con un UPDATE (If-Match: versión esperada)"""
     data = request.get_json()
-    db = SessionLocal()
     try:
-        profesor = db.query(Profesor).filter(Profesor.id == profesor_id).first()
-        if not profesor:
-            return jsonify({'error': 'Profesor no encontrado'}), 404
-        
-        profesor.nombre = data.get('nombre', profesor.nombre)
-        profesor.apellido = data.get('apellido', profesor.apellido)
-        profesor.email = data.get('email', profesor.email)
-        profesor.especialidad = data.get('especialidad', profesor.especialidad)
-        profesor.departamento = data.get('departamento', profesor.departamento)
-        profesor.telefono = data.get('telefono', profesor.telefono)
-        
-        db.commit()
-        return jsonify({'mensaje': 'Profesor actualizado exitosamente'})
+        expected = parse_if_match(request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    values, errors = validate_record(Profesor, data, PROFESOR_UPDATE_FIELDS, partial=True)
+    if errors:
+        return jsonify({'error': '; '.join(errors)}), 400
+    if not values:
+        return jsonify({'error': 'No hay campos para actualizar'}), 400
+
+    db = get_db()
+    try:
+        version, current = apply_update(db, Profesor, profesor_id, values, expected)
+        if version is None:
+            payload, status = write_failure(current, 'Profesor no encontrado')
+            return jsonify(payload), status
+        return jsonify({'mensaje': 'Profesor actualizado exitosamente', 'version': version})
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
 
 #"""Eliminar un profesor"""
 @profesores_bp.route('/profesores/<int:profesor_id>', methods=['DELETE'])
 def delete_profesor(profesor_id):
-    """Eliminar un profesor"""
-    db = SessionLocal()
+    """Eliminar un profesor con un DELETE ... RETURNING (If-Match: versión esperada)"""
     try:
-        profesor = db.query(Profesor).filter(Profesor.id == profesor_id).first()
-        if not profesor:
-            return jsonify({'error': 'Profesor no encontrado'}), 404
-        
-        db.delete(profesor)
-        db.commit()
+        expected = parse_if_match(request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        deleted, current = apply_delete(db, Profesor, profesor_id, expected)
+        if not deleted:
+            payload, status = write_failure(current, 'Profesor no encontrado')
+            return jsonify(payload), status
         return jsonify({'mensaje': 'Profesor eliminado exitosamente'})
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
\ No newline at end of file
+
+#"""Crear profesores en lote"""
+@profesores_bp.route('/profesores/bulk', methods=['POST'])
+def bulk_create_profesores():
+    """Crear profesores en lote con un reporte por registro"""
+    try:
+        items = parse_bulk_items(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_create(db, Profesor, items, PROFESOR_CREATE_FIELDS, 'email'))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+
+#"""Actualizar profesores en lote"""
+@profesores_bp.route('/profesores/bulk', methods=['PATCH'])
+def bulk_update_profesores():
+    """Actualizar profesores en lote; cada registro lleva su id y solo los campos a cambiar"""
+    try:
+        items = parse_bulk_items(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_update(db, Profesor, items, PROFESOR_UPDATE_FIELDS, 'email'))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+
+#"""Eliminar profesores en lote"""
+@profesores_bp.route('/profesores/bulk', methods=['DELETE'])
+def bulk_delete_profesores():
+    """Eliminar profesores en lote por lista de ids"""
+    try:
+        ids = parse_bulk_ids(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_delete(db, Profesor, ids))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
@@ -0,0 +1,109 @@
+import click
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select
+from models import Institucion
+from database import get_db
+from utils.auth import admin_required
+from utils.cache import cached
+from utils.filters import parse_filters
+from utils.reportes import reportes, REPORTE_ALUMNOS
+
+# Crear blueprint (sus comandos quedan bajo flask reportes ...)
+reportes_bp = Blueprint('reportes', __name__)
+reportes_bp.cli.help = 'Vistas materializadas de reportes'
+
+# Dimensiones por las que se agrupa (?por=) y se filtra (?carrera=...) el reporte de alumnos
+DIMENSIONES = ('institucion_id', 'carrera', 'periodo', 'semestre', 'anio')
+
+
+def _parse_por(args):
+    """Dimensiones de ?por=a,b en orden; lanza ValueError si alguna no existe"""
+    por = list(dict.fromkeys(d.strip() for d in args.get('por', '').split(',') if d.strip()))
+    invalid = [d for d in por if d not in DIMENSIONES]
+    if invalid:
+        raise ValueError(f'Dimensiones no válidas: {", ".join(invalid)}')
+    return por
+
+
+def _conteos(db, por, criteria):
+    """Suma de la vista agrupada por las dimensiones pedidas (con el nombre de la institución)"""
+    columns = [REPORTE_ALUMNOS.c[d] for d in por]
+    stmt = select(*columns, func.sum(REPORTE_ALUMNOS.c.total)).select_from(REPORTE_ALUMNOS)
+    if 'institucion_id' in por:
+        stmt = stmt.outerjoin(Institucion, Institucion.id == REPORTE_ALUMNOS.c.institucion_id) \
+            .add_columns(Institucion.nombre)
+        columns.append(Institucion.nombre)
+    for criterion in criteria:
+        stmt = stmt.where(criterion)
+    stmt = stmt.group_by(*columns).order_by(*columns)
+
+    items = []
+    for row in db.execute(stmt):
+        item = dict(zip(por, row))
+        item['total'] = int(row[len(por)] or 0)
+        if 'institucion_id' in por:
+            item['institucion'] = row[-1]
+        items.append(item)
+    return items
+
+
+#"""Estado de los reportes"""
+@reportes_bp.route('/reportes', methods=['GET'])
+def get_reportes():
+    """Vistas disponibles, su última actualización y las dimensiones del reporte"""
+    return jsonify({
+        'vistas': reportes.status(get_db()),
+        'dimensiones': list(DIMENSIONES),
+        'intervalo_segundos': reportes.interval,
+    })
+
+
+#"""Conteo de alumnos por dimensiones"""
+@reportes_bp.route('/reportes/alumnos', methods=['GET'])
+@cached('reportes')
+def get_reporte_alumnos():
+    """Alumnos por institución, carrera, periodo, semestre y/o año de alta
+
+    ?por=carrera,periodo agrupa; ?carrera=...&anio=2025 filtra. Los datos son
+    los de la última actualización de la vista (ver 'actualizado').
+    """
+    try:
+        por = _parse_por(request.args)
+        criteria = parse_filters(REPORTE_ALUMNOS.c, DIMENSIONES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    items = _conteos(db, por, criteria)
+    estado = {e['vista']: e for e in reportes.status(db)}['reporte_alumnos']
+    return jsonify({
+        'por': por,
+        'items': items,
+        'total': sum(item['total'] for item in items),
+        'actualizado': estado['actualizado'],
+    })
+
+
+#"""Actualizar las vistas de reportes"""
+@reportes_bp.route('/reportes/actualizar', methods=['POST'])
+@admin_required
+def actualizar_reportes():
+    """REFRESH CONCURRENTLY inmediato (?forzar=1 aunque la tabla no haya cambiado)"""
+    forzar = request.args.get('forzar', '').lower() in ('1', 'true')
+    refreshed = reportes.refresh(force=forzar)
+    if refreshed is None:
+        return jsonify({'error': 'Otro proceso está actualizando los reportes'}), 409
+    return jsonify({'actualizadas': refreshed})
+
+
+@reportes_bp.cli.command('actualizar')
+@click.option('--forzar', is_flag=True, help='Actualizar aunque la tabla fuente no haya cambiado')
+def actualizar_command(forzar):
+    """Actualizar las vistas de reportes (para cron si REPORTES_REFRESH_SECONDS=0)"""
+    refreshed = reportes.refresh(force=forzar)
+    if refreshed is None:
+        raise click.ClickException('Otro proceso está actualizando los reportes')
+    for r in refreshed:
+        click.echo(f"{r['vista']}: {r['duracion_ms']}ms")
+    if not refreshed:
+        click.echo('Sin cambios desde la última actualización')
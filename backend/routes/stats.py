@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+import json
+import threading
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from sqlalchemy import cast, Date, func, text
+from models import Alumno, Profesor, Institucion
+from database import get_db
+from utils.cache import cache
+
+# Crear blueprint
+stats_bp = Blueprint('stats', __name__)
+
+# Las estadísticas se guardan en la capa de caché con su propio TTL
+_CACHE_KEY = 'stats:dashboard'
+_cache_lock = threading.Lock()
+
+
+def _distribucion(db, column):
+    """COUNT agrupado por una columna, de mayor a menor"""
+    total = func.count()
+    rows = db.query(column, total).group_by(column).order_by(total.desc(), column).all()
+    return [{'valor': valor, 'total': cantidad} for valor, cantidad in rows]
+
+
+def _actividad(db, model, desde):
+    """Registros creados por día a partir de una fecha"""
+    dia = cast(model.fecha_creacion, Date)
+    rows = db.query(dia, func.count()).filter(model.fecha_creacion >= desde) \
+        .group_by(dia).order_by(dia).all()
+    return [{'fecha': fecha.isoformat(), 'total': cantidad} for fecha, cantidad in rows]
+
+
+def _recientes(db, model, columns, limite):
+    """Últimos registros creados (usa la llave primaria, no recorre la tabla)"""
+    rows = db.query(model.id, *columns, model.fecha_creacion) \
+        .order_by(model.id.desc()).limit(limite).all()
+    return [{
+        'id': row[0],
+        'nombre': ' '.join(str(v) for v in row[1:-1] if v),
+        'fecha_creacion': row[-1].isoformat() if row[-1] else None
+    } for row in rows]
+
+
+def _calcular_stats(db):
+    """Todas las métricas del dashboard con COUNT/GROUP BY en Postgres"""
+    # Todas las consultas ven la misma instantánea, fijada por la primera. El
+    # cliente la pasa a /events?instantanea= para recibir justo lo que no incluye
+    db.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+    instantanea = db.execute(text('SELECT pg_current_snapshot()::text')).scalar()
+    dias = current_app.config.get('STATS_ACTIVITY_DAYS', 30)
+    desde = datetime.utcnow() - timedelta(days=dias)
+    return {
+        'totales': {
+            'alumnos': db.query(func.count(Alumno.id)).scalar(),
+            'profesores': db.query(func.count(Profesor.id)).scalar(),
+            'instituciones': db.query(func.count(Institucion.id)).scalar(),
+        },
+        'alumnos_por_carrera': _distribucion(db, Alumno.carrera),
+        'alumnos_por_semestre': _distribucion(db, Alumno.semestre),
+        'alumnos_por_periodo': _distribucion(db, Alumno.periodo),
+        'profesores_por_departamento': _distribucion(db, Profesor.departamento),
+        'profesores_por_especialidad': _distribucion(db, Profesor.especialidad),
+        'actividad': {
+            'dias': dias,
+            'alumnos': _actividad(db, Alumno, desde),
+            'profesores': _actividad(db, Profesor, desde),
+            'instituciones': _actividad(db, Institucion, desde),
+        },
+        'recientes': {
+            'alumnos': _recientes(db, Alumno, [Alumno.nombre, Alumno.apellido], 5),
+            'profesores': _recientes(db, Profesor, [Profesor.nombre, Profesor.apellido], 5),
+            'instituciones': _recientes(db, Institucion, [Institucion.nombre], 5),
+        },
+        'generado': datetime.utcnow().isoformat(),
+        'instantanea': instantanea,
+    }
+
+
+#"""Estadísticas agregadas para el dashboard"""
+@stats_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """Estadísticas agregadas para el dashboard"""
+    body = cache.get(_CACHE_KEY)
+    if body is None:
+        # Solo un hilo por proceso recalcula; los demás esperan y reutilizan el resultado
+        with _cache_lock:
+            body = cache.backend.get(_CACHE_KEY)
+            if body is None:
+                body = json.dumps(_calcular_stats(get_db())).encode('utf-8')
+                cache.set(_CACHE_KEY, body, current_app.config.get('STATS_CACHE_TTL', 30))
+    response = Response(body, mimetype='application/json')
+    response.headers['Cache-Control'] = cache.cache_control('Authorization' in request.headers)
+    return response
+
+
+#"""Contadores de la caché de respuestas"""
+@stats_bp.route('/stats/cache', methods=['GET'])
+def get_cache_stats():
+    """Aciertos, fallos y expulsiones de la caché (los contadores son por proceso)"""
+    return jsonify(cache.stats())
@@ -0,0 +1,259 @@
+import click
+from flask import Blueprint, Response, current_app, jsonify, request
+from sqlalchemy import text
+from werkzeug.security import check_password_hash
+from models import Alumno, Profesor, Institucion
+from database import get_db, get_engine
+from utils.auth import is_admin_request
+from utils.cache import cache
+from utils.exporter import FORMATS as EXPORT_FORMATS, iter_rows, iter_csv, iter_ndjson, iter_gzip
+from utils.filters import parse_filters
+from utils.hasher import hasher, DEFAULT_PASSWORD
+from utils.importer import Importer, FORMATS as IMPORT_FORMATS
+from utils.reportes import reportes
+from utils.trabajos import trabajos, accepted_response, iter_parts, ESTADOS
+from routes.usuarios import ALUMNO_FIELDS, ALUMNO_FILTERS, ALUMNO_SEARCH
+from routes.profesores import PROFESOR_FIELDS, PROFESOR_FILTERS, PROFESOR_SEARCH
+from routes.instituciones import INSTITUCION_FIELDS, INSTITUCION_FILTERS, INSTITUCION_SEARCH
+
+# Crear blueprint (cli_group=None registra el comando en la raíz: flask worker)
+trabajos_bp = Blueprint('trabajos', __name__, cli_group=None)
+
+# Recurso -> (modelo, campos exportados, filtros de igualdad, filtros por prefijo)
+RECURSOS = {
+    'alumnos': (Alumno, ALUMNO_FIELDS, ALUMNO_FILTERS, ALUMNO_SEARCH),
+    'profesores': (Profesor, PROFESOR_FIELDS, PROFESOR_FILTERS, PROFESOR_SEARCH),
+    'instituciones': (Institucion, INSTITUCION_FIELDS, INSTITUCION_FILTERS, INSTITUCION_SEARCH),
+}
+
+# Filas entre dos actualizaciones de progreso de una exportación
+_PROGRESS_ROWS = 10000
+
+# Alumnos por UPDATE al rehashear
+_REHASH_BATCH = 10000
+
+
+def _recurso(parametros):
+    recurso = parametros.get('recurso')
+    if recurso not in RECURSOS:
+        raise ValueError(f'Recurso no válido: {recurso}')
+    return recurso
+
+
+#"""Tipos de trabajo"""
+def _validar_exportacion(parametros):
+    recurso = _recurso(parametros)
+    formato = parametros.get('formato', 'csv')
+    if formato not in EXPORT_FORMATS:
+        raise ValueError(f'Formato no soportado: {formato}')
+    filtros = parametros.get('filtros') or {}
+    if not isinstance(filtros, dict):
+        raise ValueError('filtros debe ser un objeto {"campo": "valor"}')
+    model, _, equality, prefix = RECURSOS[recurso]
+    parse_filters(model, equality, prefix, args=filtros)  # lanza ValueError si no son válidos
+    return {'recurso': recurso, 'formato': formato, 'gzip': bool(parametros.get('gzip')), 'filtros': filtros}
+
+
+@trabajos.register('exportar', validate=_validar_exportacion)
+def exportar(trabajo):
+    """Exportación completa a un archivo que se descarga al terminar"""
+    p = trabajo.parametros
+    model, fields, equality, prefix = RECURSOS[p['recurso']]
+    criteria = parse_filters(model, equality, prefix, args=p['filtros'])
+
+    filas = 0
+
+    def contar(rows):
+        nonlocal filas
+        for row in rows:
+            filas += 1
+            if filas % _PROGRESS_ROWS == 0:
+                trabajo.progress(filas=filas)
+            yield row
+
+    rows = contar(iter_rows(model, fields, criteria))
+    chunks = iter_csv(fields, rows) if p['formato'] == 'csv' else iter_ndjson(fields, rows)
+    archivo = f"{p['recurso']}.{p['formato']}"
+    mimetype = EXPORT_FORMATS[p['formato']]
+    if p['gzip']:
+        chunks = iter_gzip(chunks, current_app.config.get('EXPORT_GZIP_LEVEL', 6))
+        archivo += '.gz'
+        mimetype = 'application/gzip'
+
+    salida = trabajo.output()
+    for chunk in chunks:
+        salida.write(chunk)
+    salida.close()
+    return {'filas': filas, 'bytes': salida.size, 'archivo': archivo, 'mimetype': mimetype}
+
+
+def _validar_importacion(parametros):
+    recurso = _recurso(parametros)
+    formato = parametros.get('formato', 'csv')
+    if formato not in IMPORT_FORMATS:
+        raise ValueError(f'Formato no soportado: {formato}')
+    try:
+        lote = int(parametros.get('lote') or 0) or None
+    except (TypeError, ValueError):
+        raise ValueError('lote debe ser un número entero')
+    return {'recurso': recurso, 'formato': formato, 'lote': lote}
+
+
+# Un solo intento: los lotes ya confirmados quedan, repetir duplicaría los rechazos
+@trabajos.register('importar', validate=_validar_importacion, max_attempts=1)
+def importar(trabajo):
+    """Importación del archivo que se subió al encolar (ver POST /<recurso>/import?async=1)"""
+    p = trabajo.parametros
+    lote = p['lote'] or current_app.config.get('IMPORT_CHUNK_SIZE', 5000)
+
+    def progreso(report):
+        trabajo.progress(procesadas=report['procesadas'], insertadas=report['insertadas'],
+                         rechazadas=report['rechazadas'])
+
+    try:
+        with trabajo.input() as archivo:
+            return Importer(get_engine(), p['recurso'], lote).run(archivo, p['formato'], on_progress=progreso)
+    finally:
+        # Con CACHE_BACKEND=memory esto solo toca la caché del worker: los procesos
+        # web invalidan al recibir el evento de cada lote confirmado
+        cache.invalidate(p['recurso'])
+
+
+@trabajos.register('reportes', validate=lambda p: {'forzar': bool(p.get('forzar'))}, admin=True)
+def actualizar_reportes(trabajo):
+    """REFRESH CONCURRENTLY de las vistas de reportes"""
+    refreshed = reportes.refresh(force=trabajo.parametros['forzar'])
+    if refreshed is None:
+        # Se reintenta con espera: otro proceso tiene el advisory lock
+        raise RuntimeError('Otro proceso está actualizando los reportes')
+    return {'actualizadas': refreshed}
+
+
+@trabajos.register('rehash', validate=lambda p: {}, admin=True)
+def rehash(trabajo):
+    """Rehashear con PASSWORD_HASH_METHOD a los alumnos que siguen con la contraseña por defecto
+
+    Las contraseñas propias solo se pueden rehashear en el login (hace falta el
+    texto plano); las cargas masivas, en cambio, comparten un mismo hash de la
+    contraseña por defecto, que se verifica una vez y se reemplaza por lotes.
+    """
+    with get_engine().connect() as conn:
+        conn.execute(text('SET statement_timeout = 0'))
+        candidatos = conn.execute(text("""
+            SELECT password_hash, count(*) FROM alumnos
+            WHERE split_part(password_hash, '$', 1) <> :prefix
+            GROUP BY password_hash HAVING count(*) > 1
+        """), {'prefix': hasher.prefix}).all()
+        max_id = conn.execute(text('SELECT max(id) FROM alumnos')).scalar() or 0
+
+    viejos = [h for h, _ in candidatos if check_password_hash(h, DEFAULT_PASSWORD)]
+    total = sum(n for h, n in candidatos if h in viejos)
+    rehasheados = 0
+    if viejos:
+        nuevo = hasher.default_hash()
+        # Por rangos de id (índice de la llave primaria), en transacciones cortas
+        for desde in range(0, max_id, _REHASH_BATCH):
+            with get_engine().begin() as conn:
+                rehasheados += conn.execute(text("""
+                    UPDATE alumnos SET password_hash = :nuevo
+                    WHERE id > :desde AND id <= :hasta AND password_hash = ANY(:viejos)
+                """), {'nuevo': nuevo, 'viejos': viejos, 'desde': desde,
+                       'hasta': desde + _REHASH_BATCH}).rowcount
+            trabajo.progress(rehasheados=rehasheados, total=total)
+    return {'rehasheados': rehasheados, 'hashes_por_defecto': len(viejos), 'metodo': hasher.prefix}
+
+
+#"""Encolar un trabajo"""
+@trabajos_bp.route('/trabajos', methods=['POST'])
+def crear_trabajo():
+    """Encolar {"tipo": "exportar", "parametros": {...}}; responde 202 con el trabajo"""
+    data = request.get_json(silent=True) or {}
+    tipo = data.get('tipo')
+    handler = trabajos.handlers.get(tipo)
+    if handler is None or tipo == 'importar':
+        # importar necesita el archivo: POST /<recurso>/import?async=1
+        return jsonify({'error': f'Tipo de trabajo no válido: {tipo}'}), 400
+    if handler['admin'] and not is_admin_request():
+        return jsonify({'error': 'Acceso de administrador requerido'}), 403
+
+    try:
+        trabajo = trabajos.enqueue(tipo, data.get('parametros') or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return accepted_response(trabajo)
+
+
+#"""Listar trabajos"""
+@trabajos_bp.route('/trabajos', methods=['GET'])
+def get_trabajos():
+    """Trabajos más recientes (?estado=pendiente&tipo=exportar)"""
+    estado = request.args.get('estado')
+    if estado and estado not in ESTADOS:
+        return jsonify({'error': f'Estado no válido: {estado}'}), 400
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+    except ValueError:
+        return jsonify({'error': 'limit debe ser un número entero'}), 400
+    return jsonify({'items': trabajos.recent(get_db(), estado, request.args.get('tipo'), limit)})
+
+
+#"""Estado de un trabajo"""
+@trabajos_bp.route('/trabajos/<int:trabajo_id>', methods=['GET'])
+def get_trabajo(trabajo_id):
+    """Estado, progreso, resultado y error del último intento"""
+    trabajo = trabajos.get(get_db(), trabajo_id)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    response = jsonify(trabajo)
+    if trabajo['estado'] in ('pendiente', 'en_curso'):
+        # Sugerencia para quien consulta en bucle
+        response.headers['Retry-After'] = '2'
+    return response
+
+
+#"""Descargar el archivo de un trabajo"""
+@trabajos_bp.route('/trabajos/<int:trabajo_id>/resultado', methods=['GET'])
+def descargar_resultado(trabajo_id):
+    """Archivo generado por el trabajo (exportaciones), enviado por partes"""
+    trabajo = trabajos.get(get_db(), trabajo_id)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    if trabajo['estado'] != 'terminado':
+        return jsonify({'error': f"El trabajo está {trabajo['estado']}"}), 409
+    resultado = trabajo['resultado'] or {}
+    if 'archivo' not in resultado:
+        return jsonify({'error': 'El trabajo no generó un archivo'}), 404
+
+    return Response(
+        iter_parts(trabajo_id, 'salida'),
+        mimetype=resultado['mimetype'],
+        headers={'Content-Disposition': f"attachment; filename={resultado['archivo']}",
+                 'Content-Length': str(resultado['bytes']), 'X-Accel-Buffering': 'no'},
+    )
+
+
+#"""Cancelar un trabajo"""
+@trabajos_bp.route('/trabajos/<int:trabajo_id>', methods=['DELETE'])
+def cancelar_trabajo(trabajo_id):
+    """Cancelar un trabajo pendiente o en curso"""
+    db = get_db()
+    if trabajos.cancel(db, trabajo_id):
+        return jsonify({'mensaje': 'Trabajo cancelado'})
+    trabajo = trabajos.get(db, trabajo_id)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify({'error': f"El trabajo ya está {trabajo['estado']}"}), 409
+
+
+@trabajos_bp.cli.command('worker')
+@click.option('--concurrencia', type=int, default=None, help='Trabajos a la vez (por defecto TRABAJOS_CONCURRENCIA)')
+@click.option('--tipos', default=None, help='Solo estos tipos, separados por coma (por defecto todos)')
+@click.option('--una-vez', is_flag=True, help='Vaciar la cola y salir (para cron o pruebas)')
+def worker_command(concurrencia, tipos, una_vez):
+    """Ejecutar los trabajos en segundo plano (importaciones, exportaciones, reportes, rehash)"""
+    tipos = [t.strip() for t in tipos.split(',')] if tipos else list(trabajos.handlers)
+    desconocidos = [t for t in tipos if t not in trabajos.handlers]
+    if desconocidos:
+        raise click.BadParameter(f'Tipos no registrados: {", ".join(desconocidos)}', param_hint='--tipos')
+    concurrencia = concurrencia or current_app.config.get('TRABAJOS_CONCURRENCIA', 2)
+    trabajos.run_worker(current_app._get_current_object(), concurrencia, tipos, once=una_vez)
@@ -1,68 +1,96 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash
 from models import Alumno
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from config import config
-import os
+from database import get_db
+from utils.pagination import parse_page_args, paginate
+from utils.cache import cached, invalidate_on_write
+from utils.serializers import serializer_for
+from utils.filters import parse_filters
+from utils.includes import parse_include, with_include_fields, embed_includes
+from utils.exporter import export_response, FORMATS as EXPORT_FORMATS
+from utils.bulk import parse_bulk_items, parse_bulk_ids, bulk_create, bulk_update, bulk_delete
+from utils.hasher import hasher, HasherBusy, busy_response, DEFAULT_PASSWORD
+from utils.validation import validate_record
+from utils.eventos import eventos
+from utils.versioning import parse_if_match, versioned_response, write_failure, apply_update, apply_delete
 
 # Crear blueprint
 alumnos_bp = Blueprint('alumnos', __name__)
 
-# Configurar base de datos
-config_name = os.environ.get('FLASK_ENV', 'development')
-app_config = config[config_name]
-engine = create_engine(app_config.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Listados en caché (el detalle siempre se lee: su ETag lleva la versión); las escrituras los invalidan
+invalidate_on_write(alumnos_bp, 'alumnos')
+
+# Campos públicos que se pueden pedir con ?fields= (definidos en utils/serializers.py)
+ALUMNO_FIELDS = serializer_for(Alumno).fields
+
+# Filtros del listado: igualdad exacta y búsqueda por prefijo (?q= busca subcadena)
+ALUMNO_FILTERS = ('carrera', 'semestre', 'periodo', 'institucion_id')
+ALUMNO_SEARCH = ('nombre', 'apellido', 'email')
+
+# Relaciones que se pueden embeber con ?include= (utils/includes.py)
+ALUMNO_INCLUDES = ('institucion',)
+
+# Campos aceptados por las operaciones masivas (/alumnos/bulk)
+ALUMNO_CREATE_FIELDS = ('nombre', 'apellido', 'email', 'semestre', 'carrera', 'periodo', 'institucion_id')
+ALUMNO_UPDATE_FIELDS = ('nombre', 'apellido', 'semestre', 'carrera', 'periodo', 'institucion_id')
 
 #"""Obtener todos los alumnos"""
 @alumnos_bp.route('/alumnos', methods=['GET'])
+@cached('alumnos')
 def get_alumnos():
-    db = SessionLocal()
     try:
-        alumnos = db.query(Alumno).all()
-        return jsonify([{
-            "id": alumno.id,
-            "nombre": alumno.nombre,
-            "apellido": alumno.apellido,
-            "email": alumno.email,
-            "semestre": alumno.semestre,
-            "carrera": alumno.carrera,
-            "periodo": alumno.periodo,
-            "fecha_creacion": alumno.fecha_creacion.isoformat()
-        } for alumno in alumnos])
-    finally:
-        db.close()
+        limit, cursor, fields = parse_page_args(ALUMNO_FIELDS)
+        criteria = parse_filters(Alumno, ALUMNO_FILTERS, ALUMNO_SEARCH)
+        include = parse_include(ALUMNO_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    fields = with_include_fields(Alumno, fields, include)
+    page = paginate(db, Alumno, fields, limit, cursor, criteria)
+    embed_includes(db, Alumno, page['items'], include)
+    return jsonify(page)
+
+#"""Exportar alumnos"""
+@alumnos_bp.route('/alumnos/export', methods=['GET'])
+def export_alumnos():
+    """Exportar alumnos en CSV o NDJSON (acepta los mismos filtros del listado)"""
+    formato = request.args.get('format', 'csv')
+    if formato not in EXPORT_FORMATS:
+        return jsonify({'error': f'Formato no soportado: {formato}'}), 400
+    try:
+        criteria = parse_filters(Alumno, ALUMNO_FILTERS, ALUMNO_SEARCH)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    gzip = request.args.get('gzip', '').lower() in ('1', 'true')
+    return export_response('alumnos', Alumno, ALUMNO_FIELDS, formato, criteria, gzip)
 
 #"""Obtener un alumno por ID"""
 @alumnos_bp.route('/alumnos/<int:alumno_id>', methods=['GET'])
 def get_alumno(alumno_id):
     """Obtener un alumno por ID"""
-    db = SessionLocal()
     try:
-        alumno = db.query(Alumno).filter(Alumno.id == alumno_id).first()
-        if not alumno:
-            return jsonify({"error": "Alumno no encontrado"}), 404
-        return jsonify({
-            "id": alumno.id,
-            "nombre": alumno.nombre,
-            "apellido": alumno.apellido,
-            "email": alumno.email,
-            "semestre": alumno.semestre,
-            "carrera": alumno.carrera,
-            "periodo": alumno.periodo,
-            "fecha_creacion": alumno.fecha_creacion.isoformat()
-        })
-    finally:
-        db.close()
+        include = parse_include(ALUMNO_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    alumno = serializer_for(Alumno).get(db, alumno_id)
+    if not alumno:
+        return jsonify({"error": "Alumno no encontrado"}), 404
+    embed_includes(db, Alumno, [alumno], include)
+    return versioned_response(alumno, request)
 
 #
 @alumnos_bp.route('/alumnos', methods=['POST'])
 def create_alumno():
     """Crear un nuevo alumno"""
     data = request.get_json()
-    db = SessionLocal()
+    db = get_db()
     try:
+        # Hash antes de la primera consulta: la sesión no toma una conexión del pool mientras tanto
+        password_hash = hasher.hash(data.get('password') or DEFAULT_PASSWORD)
+
         # Verificar si el email ya existe
         if data.get('email'):
             existing_user = db.query(Alumno).filter(Alumno.email == data['email']).first()
@@ -73,60 +101,130 @@ def create_alumno():
             nombre=data['nombre'],
             apellido=data['apellido'],
             email=data.get('email', ''),
-            password_hash=generate_password_hash(data.get('password', 'defaultpassword')),
+            password_hash=password_hash,
             semestre=data['semestre'],
             carrera=data['carrera'],
-            periodo=data['periodo']
+            periodo=data['periodo'],
+            institucion_id=data.get('institucion_id')
         )
         db.add(alumno)
+        db.flush()
+        eventos.publish(db, 'alumnos', 'creado', [alumno.id], nombre=f'{alumno.nombre} {alumno.apellido}')
         db.commit()
         return jsonify({'id': alumno.id, 'mensaje': 'Alumno creado exitosamente'}), 201
+    except HasherBusy:
+        db.rollback()
+        return busy_response()
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
 
 #"""Actualizar un alumno"""
-@alumnos_bp.route('/alumnos/<int:alumno_id>', methods=['PUT'])
+@alumnos_bp.route('/alumnos/<int:alumno_id>', methods=['PUT', 'PATCH'])
 def update_alumno(alumno_id):
-    """Actualizar un alumno"""
+    """Actualizar solo los campos enviados con un UPDATE (If-Match: versión esperada)"""
     data = request.get_json()
-    db = SessionLocal()
     try:
-        alumno = db.query(Alumno).filter(Alumno.id == alumno_id).first()
-        if not alumno:
-            return jsonify({'error': 'Alumno no encontrado'}), 404
-        
-        alumno.nombre = data.get('nombre', alumno.nombre)
-        alumno.apellido = data.get('apellido', alumno.apellido)
-        alumno.semestre = data.get('semestre', alumno.semestre)
-        alumno.carrera = data.get('carrera', alumno.carrera)
-        alumno.periodo = data.get('periodo', alumno.periodo)
-        
-        db.commit()
-        return jsonify({'mensaje': 'Alumno actualizado exitosamente'})
+        expected = parse_if_match(request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    values, errors = validate_record(Alumno, data, ALUMNO_UPDATE_FIELDS, partial=True)
+    if errors:
+        return jsonify({'error': '; '.join(errors)}), 400
+
+    db = get_db()
+    try:
+        if data.get('password'):
+            values['password_hash'] = hasher.hash(data['password'])
+        if not values:
+            return jsonify({'error': 'No hay campos para actualizar'}), 400
+
+        version, current = apply_update(db, Alumno, alumno_id, values, expected)
+        if version is None:
+            payload, status = write_failure(current, 'Alumno no encontrado')
+            return jsonify(payload), status
+        return jsonify({'mensaje': 'Alumno actualizado exitosamente', 'version': version})
+    except HasherBusy:
+        db.rollback()
+        return busy_response()
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
 
 #"""Eliminar un alumno"""
 @alumnos_bp.route('/alumnos/<int:alumno_id>', methods=['DELETE'])
 def delete_alumno(alumno_id):
-    """Eliminar un alumno"""
-    db = SessionLocal()
+    """Eliminar un alumno con un DELETE ... RETURNING (If-Match: versión esperada)"""
     try:
-        alumno = db.query(Alumno).filter(Alumno.id == alumno_id).first()
-        if not alumno:
-            return jsonify({'error': 'Alumno no encontrado'}), 404
-        
-        db.delete(alumno)
-        db.commit()
+        expected = parse_if_match(request.headers.get('If-Match'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        deleted, current = apply_delete(db, Alumno, alumno_id, expected)
+        if not deleted:
+            payload, status = write_failure(current, 'Alumno no encontrado')
+            return jsonify(payload), status
         return jsonify({'mensaje': 'Alumno eliminado exitosamente'})
     except Exception as e:
         db.rollback()
         return jsonify({'error': str(e)}), 400
-    finally:
-        db.close()
\ No newline at end of file
+
+#"""Crear alumnos en lote"""
+@alumnos_bp.route('/alumnos/bulk', methods=['POST'])
+def bulk_create_alumnos():
+    """Crear alumnos en lote con un reporte por registro"""
+    try:
+        items = parse_bulk_items(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def set_password_hash(valid):
+        # Un solo hash para la contraseña por defecto; el resto en paralelo
+        passwords = [items[i].get('password') for i, _ in valid]
+        passwords = [str(p) if p else None for p in passwords]
+        for (_, clean), password_hash in zip(valid, hasher.hash_many(passwords)):
+            clean['password_hash'] = password_hash
+
+    db = get_db()
+    try:
+        return jsonify(bulk_create(db, Alumno, items, ALUMNO_CREATE_FIELDS, 'email', set_password_hash))
+    except HasherBusy:
+        db.rollback()
+        return busy_response()
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+
+#"""Actualizar alumnos en lote"""
+@alumnos_bp.route('/alumnos/bulk', methods=['PATCH'])
+def bulk_update_alumnos():
+    """Actualizar alumnos en lote; cada registro lleva su id y solo los campos a cambiar"""
+    try:
+        items = parse_bulk_items(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_update(db, Alumno, items, ALUMNO_UPDATE_FIELDS, 'email'))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
+
+#"""Eliminar alumnos en lote"""
+@alumnos_bp.route('/alumnos/bulk', methods=['DELETE'])
+def bulk_delete_alumnos():
+    """Eliminar alumnos en lote por lista de ids"""
+    try:
+        ids = parse_bulk_ids(request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_db()
+    try:
+        return jsonify(bulk_delete(db, Alumno, ids))
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 400
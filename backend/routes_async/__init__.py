@@ -0,0 +1,11 @@
+# Rutas del modo async (asgi.py)
+#
+# Cada módulo expone una lista `routes` de Starlette con las mismas URLs y
+# respuestas que su blueprint de Flask en routes/. Se importan al crear la app.
+ROUTE_MODULES = (
+    'routes_async.health',
+    'routes_async.auth',
+    'routes_async.alumnos',
+    'routes_async.profesores',
+    'routes_async.instituciones',
+)
@@ -0,0 +1,88 @@
+from sqlalchemy import select
+from starlette.routing import Route
+
+from models import Alumno
+from database_async import get_db
+from routes.usuarios import ALUMNO_FILTERS, ALUMNO_SEARCH, ALUMNO_UPDATE_FIELDS
+from routes_async.common import (JSONResponse, error, publish, busy_response, read_json, if_match, apply_update,
+                                 write_failure_response, list_endpoint, detail_endpoint, delete_endpoint, invalidate)
+from utils.hasher import hasher, HasherBusy, DEFAULT_PASSWORD
+from utils.validation import validate_record
+
+
+async def create_alumno(request):
+    """Crear un nuevo alumno"""
+    data = await read_json(request)
+    # Hash antes de abrir la sesión: no ocupa una conexión del pool mientras tanto
+    try:
+        password_hash = await hasher.hash_async(data.get('password') or DEFAULT_PASSWORD)
+    except HasherBusy:
+        return busy_response()
+    async with await get_db() as db:
+        try:
+            # Verificar si el email ya existe
+            if data.get('email'):
+                existing = await db.scalar(select(Alumno.id).where(Alumno.email == data['email']))
+                if existing:
+                    return error('El email ya está registrado', 400)
+
+            alumno = Alumno(
+                nombre=data['nombre'],
+                apellido=data['apellido'],
+                email=data.get('email', ''),
+                password_hash=password_hash,
+                semestre=data['semestre'],
+                carrera=data['carrera'],
+                periodo=data['periodo'],
+                institucion_id=data.get('institucion_id')
+            )
+            db.add(alumno)
+            await db.flush()
+            await publish(db, 'alumnos', 'creado', [alumno.id], nombre=f'{alumno.nombre} {alumno.apellido}')
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+    await invalidate('alumnos')
+    return JSONResponse({'id': alumno.id, 'mensaje': 'Alumno creado exitosamente'}, status_code=201)
+
+
+async def update_alumno(request):
+    """Actualizar solo los campos enviados con un UPDATE (If-Match: versión esperada)"""
+    data = await read_json(request)
+    try:
+        expected = if_match(request)
+    except ValueError as e:
+        return error(str(e), 400)
+    values, errors = validate_record(Alumno, data, ALUMNO_UPDATE_FIELDS, partial=True)
+    if errors:
+        return error('; '.join(errors), 400)
+
+    async with await get_db() as db:
+        try:
+            if data.get('password'):
+                values['password_hash'] = await hasher.hash_async(data['password'])
+            if not values:
+                return error('No hay campos para actualizar', 400)
+
+            version, current = await apply_update(db, Alumno, request.path_params['id'], values, expected)
+            if version is None:
+                return write_failure_response(current, 'Alumno no encontrado')
+        except HasherBusy:
+            await db.rollback()
+            return busy_response()
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+    await invalidate('alumnos')
+    return JSONResponse({'mensaje': 'Alumno actualizado exitosamente', 'version': version})
+
+
+routes = [
+    Route('/alumnos', list_endpoint(Alumno, 'alumnos', ALUMNO_FILTERS, ALUMNO_SEARCH), methods=['GET']),
+    Route('/alumnos', create_alumno, methods=['POST']),
+    Route('/alumnos/{id:int}', detail_endpoint(Alumno, 'alumnos', 'Alumno no encontrado'), methods=['GET']),
+    Route('/alumnos/{id:int}', update_alumno, methods=['PUT', 'PATCH']),
+    Route('/alumnos/{id:int}', delete_endpoint(Alumno, 'alumnos', 'Alumno no encontrado',
+                                               'Alumno eliminado exitosamente'), methods=['DELETE']),
+]
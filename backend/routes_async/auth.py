@@ -0,0 +1,145 @@
+from sqlalchemy import select
+from starlette.routing import Route
+import jwt
+
+from models import Alumno
+from database_async import get_db
+from routes.auth import login_statement, rehash_statement
+from routes_async.common import JSONResponse, error, busy_response, publish, read_json, invalidate
+from utils.auth import tokens, REFRESH
+from utils.hasher import hasher, HasherBusy
+
+
+def _token_from_header(request):
+    header = request.headers.get('Authorization', '')
+    scheme, _, value = header.partition(' ')
+    return value.strip() if scheme.lower() == 'bearer' else header.strip()
+
+
+async def login(request):
+    """Endpoint para iniciar sesión"""
+    data = await read_json(request)
+    if not data.get('email') or not data.get('password'):
+        return error('Email y contraseña son requeridos', 400)
+
+    # La sesión se cierra (y su conexión vuelve al pool) antes de PBKDF2
+    try:
+        async with await get_db() as db:
+            alumno = (await db.execute(login_statement(data['email']))).first()
+    except Exception as e:
+        return error(str(e), 500)
+
+    try:
+        if not alumno or not await hasher.verify_async(alumno.password_hash, data['password']):
+            return error('Credenciales inválidas', 401)
+    except HasherBusy:
+        return busy_response()
+
+    # Actualizar el hash si se generó con un algoritmo o costo anterior
+    if hasher.needs_rehash(alumno.password_hash):
+        try:
+            password_hash = await hasher.hash_async(data['password'])
+        except HasherBusy:
+            # Se intentará en el siguiente login
+            password_hash = None
+        if password_hash is not None:
+            try:
+                async with await get_db() as db:
+                    await db.execute(rehash_statement(alumno, password_hash))
+                    await db.commit()
+            except Exception as e:
+                return error(str(e), 500)
+
+    return JSONResponse({
+        **tokens.issue(alumno),
+        'user': {
+            'id': alumno.id,
+            'nombre': alumno.nombre,
+            'apellido': alumno.apellido,
+            'email': alumno.email
+        },
+        'mensaje': 'Login exitoso'
+    })
+
+
+async def register(request):
+    """Endpoint para registro de alumno"""
+    data = await read_json(request)
+    required_fields = ['nombre', 'apellido', 'email', 'password', 'semestre', 'carrera', 'periodo']
+    missing_fields = [field for field in required_fields if not data.get(field)]
+    if missing_fields:
+        return error(f'Campos requeridos: {", ".join(missing_fields)}', 400)
+
+    # Hash antes de abrir la sesión: no ocupa una conexión del pool mientras tanto
+    try:
+        password_hash = await hasher.hash_async(data['password'])
+    except HasherBusy:
+        return busy_response()
+
+    async with await get_db() as db:
+        try:
+            existing = await db.scalar(select(Alumno.id).where(Alumno.email == data['email']))
+            if existing:
+                return error('El email ya está registrado', 400)
+
+            alumno = Alumno(
+                nombre=data['nombre'],
+                apellido=data['apellido'],
+                email=data['email'],
+                password_hash=password_hash,
+                semestre=data['semestre'],
+                carrera=data['carrera'],
+                periodo=data['periodo']
+            )
+            db.add(alumno)
+            await db.flush()
+            await publish(db, 'alumnos', 'creado', [alumno.id], nombre=f'{alumno.nombre} {alumno.apellido}')
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+
+    await invalidate('alumnos')
+    return JSONResponse({'id': alumno.id, 'mensaje': 'Alumno registrado exitosamente'}, status_code=201)
+
+
+async def refresh(request):
+    """Endpoint para renovar el token de acceso sin volver a enviar la contraseña"""
+    refresh_token = (await read_json(request)).get('refresh_token')
+    if not refresh_token:
+        return error('refresh_token es requerido', 400)
+
+    try:
+        claims = tokens.verify(refresh_token, REFRESH)
+    except jwt.ExpiredSignatureError:
+        return error('Token de refresco expirado', 401)
+    except jwt.InvalidTokenError:
+        return error('Token de refresco inválido', 401)
+
+    async with await get_db() as db:
+        alumno = await db.get(Alumno, claims['user_id'])
+    if not alumno:
+        return error('Token de refresco inválido', 401)
+    return JSONResponse(tokens.issue(alumno))
+
+
+async def me(request):
+    """Datos del usuario autenticado tomados del token (sin consultar la base)"""
+    token = _token_from_header(request)
+    if not token:
+        return error('Token de acceso requerido', 401)
+    try:
+        claims = tokens.verify(token)
+    except jwt.ExpiredSignatureError:
+        return error('Token expirado', 401)
+    except jwt.InvalidTokenError:
+        return error('Token inválido', 401)
+    return JSONResponse({'id': claims['user_id'], 'email': claims.get('email')})
+
+
+routes = [
+    Route('/login', login, methods=['POST']),
+    Route('/register', register, methods=['POST']),
+    Route('/refresh', refresh, methods=['POST']),
+    Route('/me', me, methods=['GET']),
+]
@@ -0,0 +1,192 @@
+# Utilidades compartidas por las rutas async
+#
+# Listado y detalle reutilizan la misma paginación, filtros y serializadores
+# que los blueprints de Flask; solo cambia la ejecución (AsyncSession).
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from database_async import get_db
+from utils.cache import cache, MemoryBackend, _pack, _unpack
+from utils.eventos import eventos
+from utils.filters import parse_filters
+from utils.pagination import parse_page_args, page_statement, page_payload
+from utils.serializers import dumps, serializer_for
+from utils.versioning import (parse_if_match, versioned_etag, write_failure, update_statement,
+                              delete_statement, version_statement, DETAIL_CACHE_CONTROL)
+
+
+class JSONResponse(Response):
+    """Respuesta JSON con el mismo codificador que jsonify (orjson si está instalado)"""
+    media_type = 'application/json'
+
+    def render(self, content):
+        return dumps(content)
+
+
+def error(mensaje, status):
+    return JSONResponse({'error': mensaje}, status_code=status)
+
+
+def busy_response():
+    """Igual que utils.hasher.busy_response: 429 con Retry-After"""
+    return JSONResponse({'error': 'Servidor ocupado, intenta de nuevo en unos segundos'}, status_code=429,
+                        headers={'Retry-After': '1'})
+
+
+async def read_json(request):
+    """Cuerpo JSON de la petición ({} si viene vacío o no es JSON)"""
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def cache_call(fn, *args):
+    """Llamar a la caché sin bloquear el event loop
+
+    La caché es síncrona: en memoria es un diccionario con lock, pero con Redis
+    cada llamada es un viaje de red, así que se hace en el pool de hilos.
+    """
+    if isinstance(cache.backend, MemoryBackend):
+        return fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+
+async def invalidate(namespace):
+    """cache.invalidate() desde un handler async"""
+    await cache_call(cache.invalidate, namespace)
+
+
+def _lookup(namespace, path, query):
+    # Generación y entrada en una sola ida al pool de hilos
+    key = f'{namespace}:{cache.generation(namespace)}:{path}?{query}'
+    return key, cache.get(key)
+
+
+def cached(namespace):
+    """Equivalente async de utils.cache.cached: misma llave, mismo ETag y 304"""
+    def decorator(endpoint):
+        async def decorated(request):
+            query = urlencode(sorted(request.query_params.multi_items()))
+            key, value = await cache_call(_lookup, namespace, request.url.path, query)
+            if value is None:
+                response = await endpoint(request)
+                if response.status_code != 200:
+                    return response
+                etag = response.headers.get('ETag', '').strip('"') or hashlib.sha1(response.body).hexdigest()
+                await cache_call(cache.set, key, _pack(etag, response.media_type, response.body))
+            else:
+                etag, mimetype, body = _unpack(value)
+                response = Response(body, media_type=mimetype)
+
+            headers = {'ETag': f'"{etag}"', 'Cache-Control': cache.cache_control('Authorization' in request.headers)}
+            if headers['ETag'] in request.headers.get('If-None-Match', ''):
+                return Response(status_code=304, headers=headers)
+            response.headers.update(headers)
+            return response
+        return decorated
+    return decorator
+
+
+def list_endpoint(model, namespace, filters=(), search=()):
+    """Handler de listado paginado con filtros, como get_<recurso>() en routes/"""
+    fields_allowed = serializer_for(model).fields
+
+    @cached(namespace)
+    async def endpoint(request):
+        try:
+            limit, cursor, fields = parse_page_args(fields_allowed, request.query_params,
+                                                    request.app.config)
+            criteria = parse_filters(model, filters, search, request.query_params)
+        except ValueError as e:
+            return error(str(e), 400)
+
+        async with await get_db() as db:
+            rows = (await db.execute(page_statement(model, fields, limit, cursor, criteria))).all()
+        return JSONResponse(page_payload(model, rows, fields, limit))
+
+    return endpoint
+
+
+def detail_endpoint(model, namespace, not_found):
+    """Handler de detalle por id, como get_<recurso>(id) en routes/"""
+    serializer = serializer_for(model)
+
+    # Sin caché, igual que utils.versioning.versioned_response
+    async def endpoint(request):
+        async with await get_db() as db:
+            row = (await db.execute(serializer.statement(request.path_params['id']))).first()
+        if row is None:
+            return error(not_found, 404)
+        item = serializer.row(row)
+        response = JSONResponse(item)
+        headers = {'ETag': f'"{versioned_etag(item["version"], response.body)}"',
+                   'Cache-Control': DETAIL_CACHE_CONTROL}
+        if headers['ETag'] in request.headers.get('If-None-Match', ''):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return response
+
+    return endpoint
+
+
+def if_match(request):
+    """Versión esperada del encabezado If-Match; ValueError si no es válida"""
+    return parse_if_match(request.headers.get('If-Match'))
+
+
+def write_failure_response(current, not_found):
+    payload, status = write_failure(current, not_found)
+    return JSONResponse(payload, status_code=status)
+
+
+async def publish(db, recurso, accion, ids, **extra):
+    """Igual que eventos.publish con AsyncSession (se entrega al confirmar)"""
+    if eventos.publishing and ids:
+        await db.execute(eventos.statement(recurso, accion, ids, **extra))
+
+
+async def apply_update(db, model, record_id, values, expected_version=None):
+    """Igual que utils.versioning.apply_update con AsyncSession"""
+    version = (await db.execute(update_statement(model, record_id, values, expected_version))).scalar()
+    if version is not None:
+        await publish(db, model.__tablename__, 'actualizado', [record_id], version=version)
+        await db.commit()
+        return version, None
+    await db.rollback()
+    return None, (await db.execute(version_statement(model, record_id))).scalar()
+
+
+def delete_endpoint(model, namespace, not_found, mensaje):
+    """Handler de borrado por id (DELETE ... RETURNING, If-Match) que invalida la caché del recurso"""
+    async def endpoint(request):
+        try:
+            expected = if_match(request)
+        except ValueError as e:
+            return error(str(e), 400)
+        record_id = request.path_params['id']
+        async with await get_db() as db:
+            try:
+                deleted = (await db.execute(delete_statement(model, record_id, expected))).scalar()
+                if deleted is None:
+                    await db.rollback()
+                    current = (await db.execute(version_statement(model, record_id))).scalar()
+                    return write_failure_response(current, not_found)
+                await publish(db, model.__tablename__, 'eliminado', [record_id])
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                return error(str(e), 400)
+        await invalidate(namespace)
+        return JSONResponse({'mensaje': mensaje})
+
+    return endpoint
+
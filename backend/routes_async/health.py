@@ -0,0 +1,27 @@
+from sqlalchemy import text
+from starlette.routing import Route
+
+from database_async import get_engine
+from routes_async.common import JSONResponse
+
+
+async def health(request):
+    """Liveness: el worker responde; no toca la base de datos"""
+    return JSONResponse({'estado': 'ok'})
+
+
+async def ready(request):
+    """Readiness: hay una conexión disponible y la base responde"""
+    try:
+        engine = await get_engine()
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+    except Exception as e:
+        return JSONResponse({'estado': 'no disponible', 'error': e.__class__.__name__}, status_code=503)
+    return JSONResponse({'estado': 'ok'})
+
+
+routes = [
+    Route('/health', health, methods=['GET']),
+    Route('/ready', ready, methods=['GET']),
+]
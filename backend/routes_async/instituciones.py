@@ -0,0 +1,67 @@
+from starlette.routing import Route
+
+from models import Institucion
+from database_async import get_db
+from routes.instituciones import INSTITUCION_FILTERS, INSTITUCION_SEARCH, INSTITUCION_UPDATE_FIELDS
+from routes_async.common import (JSONResponse, error, publish, read_json, if_match, apply_update,
+                                 write_failure_response, list_endpoint, detail_endpoint, delete_endpoint, invalidate)
+from utils.validation import validate_record
+
+
+async def create_institucion(request):
+    """Crear una nueva institución"""
+    data = await read_json(request)
+    async with await get_db() as db:
+        try:
+            institucion = Institucion(
+                nombre=data['nombre'],
+                direccion=data['direccion'],
+                telefono=data['telefono'],
+                email=data.get('email')
+            )
+            db.add(institucion)
+            await db.flush()
+            await publish(db, 'instituciones', 'creado', [institucion.id], nombre=institucion.nombre)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+    await invalidate('instituciones')
+    return JSONResponse({'id': institucion.id, 'mensaje': 'Institución creada exitosamente'}, status_code=201)
+
+
+async def update_institucion(request):
+    """Actualizar solo los campos enviados con un UPDATE (If-Match: versión esperada)"""
+    data = await read_json(request)
+    try:
+        expected = if_match(request)
+    except ValueError as e:
+        return error(str(e), 400)
+    values, errors = validate_record(Institucion, data, INSTITUCION_UPDATE_FIELDS, partial=True)
+    if errors:
+        return error('; '.join(errors), 400)
+    if not values:
+        return error('No hay campos para actualizar', 400)
+
+    async with await get_db() as db:
+        try:
+            version, current = await apply_update(db, Institucion, request.path_params['id'], values, expected)
+            if version is None:
+                return write_failure_response(current, 'Institución no encontrada')
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+    await invalidate('instituciones')
+    return JSONResponse({'mensaje': 'Institución actualizada exitosamente', 'version': version})
+
+
+routes = [
+    Route('/instituciones', list_endpoint(Institucion, 'instituciones', INSTITUCION_FILTERS,
+                                          INSTITUCION_SEARCH), methods=['GET']),
+    Route('/instituciones', create_institucion, methods=['POST']),
+    Route('/instituciones/{id:int}', detail_endpoint(Institucion, 'instituciones',
+                                                     'Institución no encontrada'), methods=['GET']),
+    Route('/instituciones/{id:int}', update_institucion, methods=['PUT', 'PATCH']),
+    Route('/instituciones/{id:int}', delete_endpoint(Institucion, 'instituciones', 'Institución no encontrada',
+                                                     'Institución eliminada exitosamente'), methods=['DELETE']),
+]
@@ -0,0 +1,68 @@
+from starlette.routing import Route
+
+from models import Profesor
+from database_async import get_db
+from routes.profesores import PROFESOR_FILTERS, PROFESOR_SEARCH, PROFESOR_UPDATE_FIELDS
+from routes_async.common import (JSONResponse, error, publish, read_json, if_match, apply_update,
+                                 write_failure_response, list_endpoint, detail_endpoint, delete_endpoint, invalidate)
+from utils.validation import validate_record
+
+
+async def create_profesor(request):
+    """Crear un nuevo profesor"""
+    data = await read_json(request)
+    async with await get_db() as db:
+        try:
+            profesor = Profesor(
+                nombre=data['nombre'],
+                apellido=data['apellido'],
+                email=data['email'],
+                especialidad=data['especialidad'],
+                departamento=data['departamento'],
+                telefono=data.get('telefono'),
+                institucion_id=data.get('institucion_id')
+            )
+            db.add(profesor)
+            await db.flush()
+            await publish(db, 'profesores', 'creado', [profesor.id], nombre=f'{profesor.nombre} {profesor.apellido}')
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+    await invalidate('profesores')
+    return JSONResponse({'id': profesor.id, 'mensaje': 'Profesor creado exitosamente'}, status_code=201)
+
+
+async def update_profesor(request):
+    """Actualizar solo los campos enviados con un UPDATE (If-Match: versión esperada)"""
+    data = await read_json(request)
+    try:
+        expected = if_match(request)
+    except ValueError as e:
+        return error(str(e), 400)
+    values, errors = validate_record(Profesor, data, PROFESOR_UPDATE_FIELDS, partial=True)
+    if errors:
+        return error('; '.join(errors), 400)
+    if not values:
+        return error('No hay campos para actualizar', 400)
+
+    async with await get_db() as db:
+        try:
+            version, current = await apply_update(db, Profesor, request.path_params['id'], values, expected)
+            if version is None:
+                return write_failure_response(current, 'Profesor no encontrado')
+        except Exception as e:
+            await db.rollback()
+            return error(str(e), 400)
+    await invalidate('profesores')
+    return JSONResponse({'mensaje': 'Profesor actualizado exitosamente', 'version': version})
+
+
+routes = [
+    Route('/profesores', list_endpoint(Profesor, 'profesores', PROFESOR_FILTERS, PROFESOR_SEARCH), methods=['GET']),
+    Route('/profesores', create_profesor, methods=['POST']),
+    Route('/profesores/{id:int}', detail_endpoint(Profesor, 'profesores', 'Profesor no encontrado'), methods=['GET']),
+    Route('/profesores/{id:int}', update_profesor, methods=['PUT', 'PATCH']),
+    Route('/profesores/{id:int}', delete_endpoint(Profesor, 'profesores', 'Profesor no encontrado',
+                                                  'Profesor eliminado exitosamente'), methods=['DELETE']),
+]
@@ -1,11 +1,11 @@
 # Script para generar datos de prueba
+# Crea unos pocos registros a través de la API. Para volúmenes grandes
+# (10k/100k/1M filas) usar python -m benchmarks.generar_datos.
+import os
 import requests
-import json
-import random
-from datetime import datetime, timedelta
 
 # URLs de la API
-BASE_URL = "http://localhost:5000"
+BASE_URL = os.environ.get("API_URL", "http://localhost:5000")
 
 # Datos de prueba para usuarios
 usuarios_prueba = [
@@ -160,7 +160,10 @@ def crear_institucion(institucion):
 def verificar_servidor():
     """Verificar que el servidor esté corriendo"""
     try:
-        response = requests.get(f"{BASE_URL}/usuarios")
+        response = requests.get(f"{BASE_URL}/health", timeout=5)
+        if response.status_code != 200:
+            print(f"❌ Servidor respondió {response.status_code} en /health")
+            return False
         print("✅ Servidor respondiendo correctamente")
         return True
     except Exception as e:
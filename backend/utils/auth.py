@@ -1,31 +1,161 @@
+# Emisión y verificación de tokens JWT
+#
+# Las llaves se resuelven una sola vez en init_app. Cada token lleva en el
+# encabezado el "kid" de la llave que lo firmó, así se puede rotar la llave
+# activa sin invalidar los tokens emitidos con las anteriores. Los tokens ya
+# verificados se guardan en un LRU acotado (por hash del token) hasta su exp.
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from functools import wraps
-from flask import request, jsonify
+import hashlib
+import hmac
+import threading
+import time
+
+from flask import current_app, g, request, jsonify
 import jwt
-from datetime import datetime
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+
+def parse_key_set(value):
+    """Convertir "kid1:secreto1,kid2:secreto2" en un diccionario kid -> secreto"""
+    keys = {}
+    for item in (value or '').split(','):
+        kid, sep, secret = item.strip().partition(':')
+        if sep and kid and secret:
+            keys[kid] = secret
+    return keys
+
+
+class TokenManager:
+    """Llaves de firma, emisión de tokens y verificación con caché"""
+
+    def __init__(self):
+        self.algorithm = 'HS256'
+        self.active_kid = None
+        self.keys = {}
+        self.access_expires = 3600
+        self.refresh_expires = 30 * 24 * 3600
+        self.cache_size = 10000
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.algorithm = app.config.get('JWT_ALGORITHM', self.algorithm)
+        self.active_kid = app.config.get('JWT_KEY_ID', 'principal')
+        # Llaves anteriores: solo verifican; la activa es la única que firma
+        self.keys = parse_key_set(app.config.get('JWT_KEYS'))
+        self.keys[self.active_kid] = app.config['JWT_SECRET_KEY']
+        self.access_expires = app.config.get('JWT_ACCESS_TOKEN_EXPIRES', self.access_expires)
+        self.refresh_expires = app.config.get('JWT_REFRESH_TOKEN_EXPIRES', self.refresh_expires)
+        self.cache_size = app.config.get('JWT_CACHE_SIZE', self.cache_size)
+        with self._lock:
+            self._cache.clear()
+
+    def _encode(self, alumno, tipo, seconds):
+        now = datetime.now(timezone.utc)
+        claims = {
+            'user_id': alumno.id,
+            'email': alumno.email,
+            'typ': tipo,
+            'iat': now,
+            'exp': now + timedelta(seconds=seconds),
+        }
+        return jwt.encode(claims, self.keys[self.active_kid], algorithm=self.algorithm,
+                          headers={'kid': self.active_kid})
+
+    def issue(self, alumno):
+        """Par de tokens (acceso, refresco) para un alumno autenticado"""
+        return {
+            'token': self._encode(alumno, ACCESS, self.access_expires),
+            'refresh_token': self._encode(alumno, REFRESH, self.refresh_expires),
+            'expires_in': self.access_expires,
+        }
+
+    def verify(self, token, tipo=ACCESS):
+        """Claims del token; lanza jwt.InvalidTokenError (o una subclase) si no es válido"""
+        digest = hashlib.sha256(token.encode('utf-8')).digest()
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(digest)
+            if cached is not None:
+                if cached['exp'] > now:
+                    self._cache.move_to_end(digest)
+                    claims = cached
+                else:
+                    del self._cache[digest]
+                    raise jwt.ExpiredSignatureError('Signature has expired')
+        if cached is None:
+            claims = self._decode(token)
+            with self._lock:
+                self._cache[digest] = claims
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        # Los tokens sin "typ" (anteriores a los de refresco) son de acceso
+        if claims.get('typ', ACCESS) != tipo:
+            raise jwt.InvalidTokenError('Tipo de token incorrecto')
+        return claims
+
+    def _decode(self, token):
+        # Tokens sin "kid" se firmaron con la llave principal antes de la rotación
+        kid = jwt.get_unverified_header(token).get('kid', self.active_kid)
+        key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError('Llave desconocida')
+        return jwt.decode(token, key, algorithms=[self.algorithm],
+                          options={'require': ['exp', 'user_id']})
+
+
+# Instancia compartida; se configura con tokens.init_app(app)
+tokens = TokenManager()
+
+
+def _token_from_header():
+    header = request.headers.get('Authorization', '')
+    scheme, _, value = header.partition(' ')
+    # Se acepta "Bearer <token>" y el token solo (como lo envía el frontend)
+    return value.strip() if scheme.lower() == 'bearer' else header.strip()
+
 
 def token_required(f):
-    """Decorador para verificar token JWT"""
+    """Decorador para verificar token JWT
+
+    Deja los claims verificados en g.jwt_claims para que la ruta no vuelva a decodificar.
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Verificar si el token está en el header Authorization
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization']
-        
+        token = _token_from_header()
         if not token:
             return jsonify({'error': 'Token de acceso requerido'}), 401
-        
+
         try:
-            # Decodificar el token
-            from app import app
-            data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            current_user_id = data['user_id']
+            g.jwt_claims = tokens.verify(token)
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token expirado'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Token inválido'}), 401
-        
-        return f(current_user_id, *args, **kwargs)
-    
-    return decorated
\ No newline at end of file
+
+        return f(g.jwt_claims['user_id'], *args, **kwargs)
+
+    return decorated
+
+
+def is_admin_request():
+    """La petición trae X-Admin-Token igual a ADMIN_TOKEN (sin ADMIN_TOKEN no hay administradores)"""
+    expected = current_app.config.get('ADMIN_TOKEN')
+    provided = request.headers.get('X-Admin-Token', '')
+    return bool(expected) and hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8'))
+
+
+def admin_required(f):
+    """Decorador para rutas de administración (perfiles, planes de consultas)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify({'error': 'Acceso de administrador requerido'}), 403
+        return f(*args, **kwargs)
+
+    return decorated
@@ -0,0 +1,221 @@
+# Operaciones masivas: validan el lote completo y escriben en una sola transacción
+from flask import current_app
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from utils.eventos import eventos
+from utils.validation import validate_record
+
+
+def parse_bulk_items(data):
+    """Aceptar una lista JSON o {"items": [...]} y aplicar el máximo por lote"""
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ValueError('Se esperaba una lista de registros no vacía')
+    max_items = current_app.config.get('BULK_MAX_ITEMS', 10000)
+    if len(items) > max_items:
+        raise ValueError(f'Máximo {max_items} registros por lote')
+    return items
+
+
+def parse_bulk_ids(data):
+    """Aceptar una lista de ids o {"ids": [...]}"""
+    ids = data.get('ids') if isinstance(data, dict) else data
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('Se esperaba una lista de ids no vacía')
+    max_items = current_app.config.get('BULK_MAX_ITEMS', 10000)
+    if len(ids) > max_items:
+        raise ValueError(f'Máximo {max_items} registros por lote')
+    if any(isinstance(i, bool) or not isinstance(i, int) for i in ids):
+        raise ValueError('Todos los ids deben ser números enteros')
+    return ids
+
+
+def _report(results, estado_ok):
+    ok = sum(1 for r in results if r['estado'] == estado_ok)
+    return {
+        estado_ok + 's': ok,
+        'errores': len(results) - ok,
+        'resultados': results,
+    }
+
+
+def _error(indice, errores, **extra):
+    return {'indice': indice, 'estado': 'error', 'errores': errores, **extra}
+
+
+def _missing_references(db, model, records):
+    """Llaves foráneas que apuntan a registros inexistentes: {indice: [errores]}
+
+    Una consulta IN por columna con llave foránea; records es [(indice, valores_limpios)].
+    """
+    errors = {}
+    for column in model.__table__.columns:
+        for fk in column.foreign_keys:
+            values = {clean[column.name] for _, clean in records if clean.get(column.name) is not None}
+            if not values:
+                continue
+            existing = set(db.execute(select(fk.column).where(fk.column.in_(values))).scalars())
+            for i, clean in records:
+                value = clean.get(column.name)
+                if value is not None and value not in existing:
+                    errors.setdefault(i, []).append(f'{column.name} no existe: {value}')
+    return errors
+
+
+def bulk_create(db, model, items, fields, unique_field=None, prepare=None):
+    """Insertar un lote con un solo INSERT ... ON CONFLICT DO NOTHING
+
+    prepare(valid) puede completar columnas calculadas (p. ej. password_hash)
+    sobre la lista de (indice, valores_limpios) antes de insertar.
+    """
+    results = [None] * len(items)
+    valid = []
+    seen = {}
+
+    for i, item in enumerate(items):
+        clean, errors = validate_record(model, item, fields)
+        if not errors and unique_field:
+            key = clean[unique_field]
+            if key in seen:
+                errors.append(f'{unique_field} repetido en el lote (índice {seen[key]})')
+            else:
+                seen[key] = i
+        if errors:
+            results[i] = _error(i, errors)
+        else:
+            valid.append((i, clean))
+
+    # Referencias a otras tablas (p. ej. institucion_id) en una consulta IN por columna
+    missing = _missing_references(db, model, valid)
+    if missing:
+        for i, errors in missing.items():
+            results[i] = _error(i, errors)
+        valid = [(i, clean) for i, clean in valid if i not in missing]
+
+    # Conflictos contra la base en una sola consulta IN
+    if unique_field and valid:
+        column = getattr(model, unique_field)
+        existing = {v for (v,) in db.query(column).filter(column.in_(list(seen))).all()}
+        still_valid = []
+        for i, clean in valid:
+            if clean[unique_field] in existing:
+                results[i] = _error(i, [f'El {unique_field} ya está registrado'])
+            else:
+                still_valid.append((i, clean))
+        valid = still_valid
+
+    if valid:
+        if prepare:
+            prepare(valid)
+        rows = [clean for _, clean in valid]
+
+        if unique_field:
+            column = getattr(model, unique_field)
+            # ON CONFLICT cubre inserciones concurrentes entre el IN y el INSERT
+            stmt = pg_insert(model).on_conflict_do_nothing(index_elements=[unique_field]) \
+                .returning(model.id, column)
+            inserted = {value: new_id for new_id, value in db.execute(stmt, rows)}
+            for i, clean in valid:
+                new_id = inserted.get(clean[unique_field])
+                if new_id is None:
+                    results[i] = _error(i, [f'El {unique_field} ya está registrado'])
+                else:
+                    results[i] = {'indice': i, 'estado': 'creado', 'id': new_id}
+            new_ids = list(inserted.values())
+        else:
+            stmt = pg_insert(model).returning(model.id, sort_by_parameter_order=True)
+            new_ids = db.execute(stmt, rows).scalars().all()
+            for (i, _), new_id in zip(valid, new_ids):
+                results[i] = {'indice': i, 'estado': 'creado', 'id': new_id}
+        eventos.publish(db, model.__tablename__, 'creado', new_ids)
+
+    db.commit()
+    return _report(results, 'creado')
+
+
+def bulk_update(db, model, items, fields, unique_field=None):
+    """Actualizar un lote por id con UPDATE agrupados (executemany)"""
+    results = [None] * len(items)
+    valid = []
+    seen_ids = {}
+
+    for i, item in enumerate(items):
+        record_id = item.get('id') if isinstance(item, dict) else None
+        if isinstance(record_id, bool) or not isinstance(record_id, int):
+            results[i] = _error(i, ['id es requerido y debe ser un número entero'])
+            continue
+        clean, errors = validate_record(model, item, fields, partial=True)
+        if not clean and not errors:
+            errors.append('No hay campos para actualizar')
+        if record_id in seen_ids:
+            errors.append(f'id repetido en el lote (índice {seen_ids[record_id]})')
+        else:
+            seen_ids[record_id] = i
+        if errors:
+            results[i] = _error(i, errors, id=record_id)
+        else:
+            valid.append((i, record_id, clean))
+
+    missing = _missing_references(db, model, [(i, clean) for i, _, clean in valid])
+    if missing:
+        for i, record_id, _ in valid:
+            if i in missing:
+                results[i] = _error(i, missing[i], id=record_id)
+        valid = [entry for entry in valid if entry[0] not in missing]
+
+    if valid:
+        found = {v for (v,) in db.query(model.id).filter(model.id.in_([r for _, r, _ in valid])).all()}
+
+        owners = {}
+        if unique_field:
+            column = getattr(model, unique_field)
+            values = [c[unique_field] for _, _, c in valid if unique_field in c]
+            if values:
+                owners = dict(db.query(column, model.id).filter(column.in_(values)).all())
+
+        claimed = {}
+        still_valid = []
+        for i, record_id, clean in valid:
+            if record_id not in found:
+                results[i] = _error(i, ['Registro no encontrado'], id=record_id)
+                continue
+            if unique_field in clean:
+                value = clean[unique_field]
+                owner = owners.get(value, record_id)
+                if owner != record_id or claimed.get(value, record_id) != record_id:
+                    results[i] = _error(i, [f'El {unique_field} ya está registrado'], id=record_id)
+                    continue
+                claimed[value] = record_id
+            still_valid.append((i, record_id, clean))
+        valid = still_valid
+
+    if valid:
+        # UPDATE masivo por llave primaria del ORM: agrupa filas con los mismos campos
+        db.execute(update(model), [{'id': record_id, **clean} for _, record_id, clean in valid])
+        # La versión sube en la base (no se puede expresar por fila en el executemany)
+        db.execute(update(model).where(model.id.in_([r for _, r, _ in valid]))
+                   .values(version=model.version + 1))
+        for i, record_id, _ in valid:
+            results[i] = {'indice': i, 'estado': 'actualizado', 'id': record_id}
+        eventos.publish(db, model.__tablename__, 'actualizado', [r for _, r, _ in valid])
+
+    db.commit()
+    return _report(results, 'actualizado')
+
+
+def bulk_delete(db, model, ids):
+    """Borrar un lote de ids con un solo DELETE ... RETURNING"""
+    stmt = delete(model).where(model.id.in_(ids)).returning(model.id) \
+        .execution_options(synchronize_session=False)
+    deleted = set(db.execute(stmt).scalars().all())
+    eventos.publish(db, model.__tablename__, 'eliminado', sorted(deleted))
+    db.commit()
+
+    results = []
+    for i, record_id in enumerate(ids):
+        if record_id in deleted:
+            results.append({'indice': i, 'estado': 'eliminado', 'id': record_id})
+        else:
+            results.append(_error(i, ['Registro no encontrado'], id=record_id))
+    return _report(results, 'eliminado')
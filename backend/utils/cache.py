@@ -0,0 +1,258 @@
+# Caché de respuestas de lectura con invalidación por escritura
+#
+# El backend es intercambiable: LRU con TTL en memoria del proceso (por
+# defecto) o Redis, compartido entre procesos. Cada recurso tiene una
+# "generación" que forma parte de la llave; una escritura la cambia y con eso
+# quedan obsoletos de una vez el listado y los detalles del recurso.
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+
+from flask import Response, request
+
+try:
+    import redis
+except ImportError:  # dependencia opcional, solo para CACHE_BACKEND=redis
+    redis = None
+
+
+class MemoryBackend:
+    """LRU con TTL en memoria del proceso"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expira, value = item
+            if expira is not None and expira <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expira = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expira, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def eviction_count(self):
+        return self.evictions
+
+
+class LocalRedis:
+    """Sustituto local de un cliente de Redis (get/set con ex/delete/flushdb/info)
+
+    Sirve para probar el backend de Redis sin un servidor: CACHE_REDIS_URL=local://
+    """
+
+    def __init__(self):
+        self._backend = MemoryBackend(max_entries=float('inf'))
+
+    def get(self, key):
+        return self._backend.get(key)
+
+    def set(self, key, value, ex=None):
+        self._backend.set(key, value if isinstance(value, bytes) else str(value).encode('utf-8'), ex)
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self._backend.delete(key)
+
+    def flushdb(self):
+        self._backend.clear()
+
+    def info(self, section=None):
+        return {'evicted_keys': 0, 'expired_keys': self._backend.evictions}
+
+
+class RedisBackend:
+    """Backend compartido entre procesos sobre un cliente compatible con redis-py"""
+
+    def __init__(self, client, prefix='escuela:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix='escuela:'):
+        if url.startswith('local://'):
+            return cls(LocalRedis(), prefix)
+        if redis is None:
+            raise RuntimeError('CACHE_BACKEND=redis requiere el paquete "redis"')
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        self.client.flushdb()
+
+    def eviction_count(self):
+        # Expulsiones por memoria y expiraciones del servidor (de todos los procesos)
+        info = self.client.info('stats')
+        return int(info.get('evicted_keys', 0)) + int(info.get('expired_keys', 0))
+
+
+def _pack(etag, mimetype, body):
+    return b'\n'.join((etag.encode('ascii'), mimetype.encode('ascii'), body))
+
+
+def _unpack(value):
+    etag, mimetype, body = value.split(b'\n', 2)
+    return etag.decode('ascii'), mimetype.decode('ascii'), body
+
+
+# Recursos cuyas respuestas embeben a otro (include= y rutas anidadas):
+# invalidar uno invalida también los que lo muestran
+RELATED_NAMESPACES = {
+    'alumnos': ('instituciones',),
+    'profesores': ('instituciones',),
+    'instituciones': ('alumnos', 'profesores'),
+}
+
+
+class Cache:
+    """Caché de respuestas con contadores de aciertos, fallos y expulsiones"""
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self.ttl = 60
+        self.shared_max_age = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CACHE_TTL', self.ttl)
+        self.shared_max_age = app.config.get('CACHE_SHARED_MAX_AGE', self.shared_max_age)
+        if app.config.get('CACHE_BACKEND', 'memory') == 'redis':
+            self.backend = RedisBackend.from_url(app.config['CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 10000))
+        self.hits = self.misses = 0
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def generation(self, namespace):
+        """Generación actual del recurso (se crea si no existe o fue expulsada)"""
+        key = f'{namespace}:gen'
+        value = self.backend.get(key)
+        if value is None:
+            value = str(time.time_ns()).encode('ascii')
+            self.backend.set(key, value)
+        return value.decode('ascii') if isinstance(value, bytes) else value
+
+    def invalidate(self, namespace):
+        """Descartar todo lo guardado del recurso (listados y detalles) y de los relacionados"""
+        # Un valor nuevo y único: no se reutiliza aunque la llave se haya expulsado
+        generation = str(time.time_ns()).encode('ascii')
+        for name in (namespace,) + RELATED_NAMESPACES.get(namespace, ()):
+            self.backend.set(f'{name}:gen', generation)
+
+    def get(self, key):
+        value = self.backend.get(key)
+        self._count(value is not None)
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl or self.ttl)
+
+    def cache_control(self, with_token=False):
+        """Cache-Control de una lectura pública
+
+        El navegador siempre revalida con el ETag (max-age=0); un proxy compartido
+        (nginx) puede servirla shared_max_age segundos sin preguntar. Las peticiones
+        con token nunca se guardan en el proxy.
+        """
+        if self.shared_max_age <= 0 or with_token:
+            return 'no-cache'
+        return f'public, max-age=0, s-maxage={self.shared_max_age}'
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.eviction_count(),
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+        }
+
+
+# Instancia compartida; se configura con cache.init_app(app)
+cache = Cache()
+
+
+def _request_key(namespace):
+    # Parámetros ordenados: ?a=1&b=2 y ?b=2&a=1 comparten entrada
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f'{namespace}:{cache.generation(namespace)}:{request.path}?{query}'
+
+
+def cached(namespace):
+    """Decorador para GET: guarda el cuerpo 200 y responde con ETag / 304"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = _request_key(namespace)
+            value = cache.get(key)
+            if value is None:
+                response = f(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                body = response.get_data()
+                # ETag fuerte: el que puso la vista o el resumen del cuerpo
+                etag = response.get_etag()[0] or hashlib.sha1(body).hexdigest()
+                cache.set(key, _pack(etag, response.mimetype, body))
+            else:
+                etag, mimetype, body = _unpack(value)
+                response = Response(body, mimetype=mimetype)
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache.cache_control('Authorization' in request.headers)
+            return response.make_conditional(request)
+        return decorated
+    return decorator
+
+
+def invalidate_on_write(blueprint, namespace):
+    """Invalidar el recurso después de cada escritura exitosa del blueprint"""
+    @blueprint.after_request
+    def invalidar_cache(response):
+        if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400:
+            cache.invalidate(namespace)
+        return response
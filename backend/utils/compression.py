@@ -0,0 +1,211 @@
+# Compresión de respuestas según Accept-Encoding
+#
+# Un after_request comprime las respuestas de texto (JSON, CSV, NDJSON) con el
+# mejor algoritmo que acepte el cliente: zstd y brotli si sus paquetes están
+# instalados, gzip siempre. Las respuestas completas solo se comprimen desde
+# COMPRESS_MIN_SIZE bytes; las que se generan en streaming (exportaciones) se
+# comprimen trozo a trozo con un flush por trozo, así que se siguen enviando
+# por partes. Como el ETag identifica el cuerpo, los cuerpos comprimidos de
+# respuestas con ETag (las de la caché) se guardan en un LRU pequeño y un
+# listado repetido no se vuelve a comprimir.
+from collections import OrderedDict
+import threading
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # dependencia opcional
+    zstandard = None
+
+# Tipos que vale la pena comprimir (los binarios ya suelen venir comprimidos)
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/csv', 'text/plain', 'text/html', 'text/css',
+)
+
+
+class _Gzip:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31 = formato gzip
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self, chunks):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(_as_bytes(chunk)) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class _Brotli:
+    name = 'br'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.level)
+        for chunk in chunks:
+            data = compressor.process(_as_bytes(chunk)) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class _Zstd:
+    name = 'zstd'
+
+    def __init__(self, level):
+        self.level = level
+        self._local = threading.local()  # ZstdCompressor no se comparte entre hilos
+
+    def _compressor(self):
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor
+
+    def compress(self, data):
+        return self._compressor().compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(_as_bytes(chunk)) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def _as_bytes(chunk):
+    return chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def parse_accept_encoding(header):
+    """{codificación: q} de Accept-Encoding (en minúsculas)"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class Compression:
+    """Extensión de Flask que comprime las respuestas según Accept-Encoding"""
+
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.encoders = []
+        self._cache = OrderedDict()
+        self._cache_size = 256
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        if not self.enabled:
+            return
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self._cache_size = app.config.get('COMPRESS_CACHE_ENTRIES', self._cache_size)
+        self._cache.clear()
+
+        available = {
+            'gzip': lambda: _Gzip(app.config.get('COMPRESS_GZIP_LEVEL', 6)),
+            'br': lambda: _Brotli(app.config.get('COMPRESS_BR_LEVEL', 4)) if brotli else None,
+            'zstd': lambda: _Zstd(app.config.get('COMPRESS_ZSTD_LEVEL', 3)) if zstandard else None,
+        }
+        # Orden de preferencia del servidor; las que no tienen paquete se omiten
+        names = [n.strip() for n in app.config.get('COMPRESS_ALGORITHMS', 'zstd,br,gzip').split(',') if n.strip()]
+        self.encoders = [e for e in (available[n]() for n in names if n in available) if e is not None]
+        app.after_request(self._after_request)
+
+    def choose(self, accept_encoding):
+        """Codificador preferido que acepta el cliente, o None"""
+        accepted = parse_accept_encoding(accept_encoding)
+        if not accepted:
+            return None
+        wildcard = accepted.get('*', 0.0)
+        best, best_q = None, 0.0
+        for encoder in self.encoders:
+            q = accepted.get(encoder.name, wildcard)
+            if q > best_q:  # a igual q gana el orden del servidor
+                best, best_q = encoder, q
+        return best
+
+    def _compress_cached(self, encoder, etag, body):
+        if etag is None:
+            return encoder.compress(body)
+        key = (etag, encoder.name)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+        data = encoder.compress(body)
+        with self._lock:
+            self._cache[key] = data
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return data
+
+    def _after_request(self, response):
+        if (request.method == 'HEAD' or response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+
+        # La representación depende de Accept-Encoding aunque esta vez no se comprima
+        response.vary.add('Accept-Encoding')
+        encoder = self.choose(request.headers.get('Accept-Encoding'))
+        if encoder is None:
+            return response
+
+        if response.is_streamed:
+            response.response = encoder.stream(response.response)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            etag, weak = response.get_etag()
+            response.set_data(self._compress_cached(encoder, etag, body))
+
+        response.headers['Content-Encoding'] = encoder.name
+        # El cuerpo comprimido ya no es idéntico byte a byte: el ETag pasa a débil
+        # (If-None-Match compara débil, así que el 304 sigue funcionando)
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+# Instancia compartida; se configura con compression.init_app(app)
+compression = Compression()
@@ -0,0 +1,336 @@
+# Feed de cambios: pg_notify al escribir y Server-Sent Events en /events
+#
+# Las escrituras de alumnos, profesores e instituciones publican un evento con
+# pg_notify dentro de su misma transacción: Postgres solo lo entrega si la
+# transacción se confirma y en el orden en que se confirmaron. Cada worker
+# tiene una sola conexión con LISTEN (un hilo creado con el primer cliente de
+# /events) que guarda los eventos en un búfer circular en memoria
+# (EVENTOS_BUFFER) y despierta a los clientes conectados.
+#
+# Con CACHE_BACKEND=memory cada proceso tiene su propia caché y una escritura
+# solo invalida la del proceso que la hizo (o ninguna, si viene del flask
+# worker). Por eso el hilo arranca entonces con la primera petición de cada
+# proceso web (o en el lifespan de la app ASGI) y cada evento invalida el
+# recurso en la caché local; las invalidaciones sin evento (vistas de
+# reportes) se avisan por el canal "cache".
+#
+# Cada evento lleva además el id de la transacción que lo publicó. /stats
+# devuelve la instantánea de Postgres (pg_current_snapshot) en la que calculó
+# sus conteos, y /events?instantanea= reenvía exactamente los eventos cuya
+# transacción esa instantánea no ve: como Postgres los entrega en orden de
+# commit, son un sufijo del búfer. Los ids salen de una
+# secuencia de Postgres (migración 0008), así que un cliente que se reconecta
+# con Last-Event-ID retoma desde el búfer de cualquier worker; si ese id ya no
+# está en el búfer recibe un evento "reset" y vuelve a pedir /stats.
+from collections import deque, namedtuple
+from datetime import datetime
+from itertools import islice
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from sqlalchemy import text
+
+import database
+from utils.cache import cache
+
+CANAL = 'cambios'
+
+# Invalidaciones de la caché en memoria que no son un cambio del feed (payload: el recurso)
+CANAL_CACHE = 'cache'
+
+ACCIONES = ('creado', 'actualizado', 'eliminado')
+
+# Ids por evento (el payload de NOTIFY tiene un límite de 8000 bytes); el
+# total siempre va completo
+_MAX_IDS = 100
+
+# Mensaje: "<id> <transacción> <JSON>"
+_NOTIFY = text(f"SELECT pg_notify('{CANAL}', nextval('cambios_id_seq') || ' ' || pg_current_xact_id() "
+               f"|| ' ' || :payload)")
+_NOTIFY_CURSOR = (f"SELECT pg_notify('{CANAL}', nextval('cambios_id_seq') || ' ' || pg_current_xact_id() "
+                  f"|| ' ' || %s)")
+_NOTIFY_CACHE = text(f"SELECT pg_notify('{CANAL_CACHE}', :recurso)")
+
+# (posición local en el búfer, id del evento, tipo SSE, JSON, transacción que lo publicó)
+Evento = namedtuple('Evento', 'seq id tipo datos xid', defaults=(None,))
+
+# Instantánea de Postgres: xmin, xmax y transacciones en curso (xip)
+Instantanea = namedtuple('Instantanea', 'xmin xmax xip')
+
+
+def parse_snapshot(texto):
+    """Instantánea a partir de pg_current_snapshot()::text ("xmin:xmax:xip,..."); ValueError si no es válida"""
+    try:
+        xmin, xmax, xip = texto.split(':')
+        return Instantanea(int(xmin), int(xmax), frozenset(int(x) for x in xip.split(',') if x))
+    except (AttributeError, ValueError):
+        raise ValueError('instantanea no válida') from None
+
+
+def visible(xid, instantanea):
+    """Si una transacción confirmada ya se ve en la instantánea (como pg_visible_in_snapshot)"""
+    return xid < instantanea.xmin or (xid < instantanea.xmax and xid not in instantanea.xip)
+
+
+def _payload(recurso, accion, ids, total, extra):
+    ids = list(ids)
+    return json.dumps({
+        'recurso': recurso,
+        'accion': accion,
+        'ids': ids[:_MAX_IDS],
+        'total': len(ids) if total is None else total,
+        'fecha': datetime.utcnow().isoformat(),
+        **extra,
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def format_sse(evento):
+    """Evento en el formato de text/event-stream"""
+    lineas = []
+    if evento.id is not None:
+        lineas.append(f'id: {evento.id}')
+    lineas.append(f'event: {evento.tipo}')
+    lineas.append(f'data: {evento.datos}')
+    return '\n'.join(lineas) + '\n\n'
+
+
+class Eventos:
+    """Publicación de cambios con pg_notify y reparto a los clientes de /events"""
+
+    def __init__(self):
+        self.enabled = True
+        self.cache_local = False
+        self.buffer_size = 1000
+        self.keepalive = 15
+        self.max_clients = 2
+        self.retry_ms = 3000
+        self.logger = None
+        self._buffer = deque(maxlen=self.buffer_size)
+        self._seq = 0
+        self._clients = 0
+        self._pid = None
+        # Cobertura del búfer para ?instantanea=: los eventos con seq > _desde_seq
+        # llegaron sin cortes desde un LISTEN cuya instantánea tenía xmax _listen_xmax
+        # (None mientras no hay conexión); _recortado si el búfer ya descartó alguno
+        self._desde_seq = 0
+        self._listen_xmax = None
+        self._recortado = False
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('EVENTOS_ENABLED', True)
+        # Caché por proceso: los eventos la invalidan en todos los procesos web
+        self.cache_local = app.config.get('CACHE_BACKEND', 'memory') == 'memory'
+        self.buffer_size = app.config.get('EVENTOS_BUFFER', self.buffer_size)
+        self.keepalive = app.config.get('EVENTOS_KEEPALIVE_SECONDS', self.keepalive)
+        self.max_clients = app.config.get('EVENTOS_MAX_CLIENTES', self.max_clients)
+        self.retry_ms = app.config.get('EVENTOS_RETRY_MS', self.retry_ms)
+        self.logger = getattr(app, 'logger', None) or logging.getLogger(__name__)
+        self._buffer = deque(maxlen=self.buffer_size)
+        if self.cache_local and hasattr(app, 'before_request'):
+            # La app ASGI no tiene before_request: lo arranca en su lifespan
+            app.before_request(self.ensure_listener)
+
+    @property
+    def publishing(self):
+        # Sin el feed los eventos siguen haciendo falta para invalidar la caché en memoria
+        return self.enabled or self.cache_local
+
+    def statement(self, recurso, accion, ids=(), total=None, **extra):
+        """SELECT pg_notify(...) del evento, para ejecutarlo en la transacción de la escritura"""
+        return _NOTIFY.bindparams(payload=_payload(recurso, accion, ids, total, extra))
+
+    def publish(self, db, recurso, accion, ids=(), total=None, **extra):
+        """Publicar en la transacción de db (Session o Connection); se entrega al confirmarla"""
+        if self.publishing and (ids or total):
+            db.execute(self.statement(recurso, accion, ids, total, **extra))
+
+    def publish_cursor(self, cursor, recurso, accion, ids=(), total=None, **extra):
+        """Igual que publish sobre un cursor de psycopg2 (importación con COPY)"""
+        if self.publishing and (ids or total):
+            cursor.execute(_NOTIFY_CURSOR, (_payload(recurso, accion, ids, total, extra),))
+
+    def invalidate_cache(self, db, recurso):
+        """Invalidar recurso en la caché en memoria de todos los procesos al confirmar db"""
+        if self.cache_local:
+            db.execute(_NOTIFY_CACHE, {'recurso': recurso})
+
+    def ensure_listener(self):
+        # Una conexión con LISTEN por proceso, creada después del fork de gunicorn
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._listen, name='eventos', daemon=True).start()
+
+    def _listen(self):
+        espera = 1
+        conectado_antes = False
+        while True:
+            try:
+                raw = database.get_engine().raw_connection()
+                conn = raw.driver_connection
+                # Fuera del pool: la conexión queda abierta mientras viva el proceso
+                raw.detach()
+            except Exception:
+                self.logger.exception('No se pudo abrir la conexión de eventos')
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CANAL}')
+                    cursor.execute(f'LISTEN {CANAL_CACHE}')
+                    # Lo confirmado después de esta instantánea se recibe
+                    cursor.execute('SELECT pg_current_snapshot()::text')
+                    listen = parse_snapshot(cursor.fetchone()[0])
+                if self.cache_local:
+                    # Lo guardado antes de escuchar pudo quedar obsoleto sin aviso
+                    cache.backend.clear()
+                if conectado_antes:
+                    # Los eventos mientras no había conexión se perdieron
+                    self._append(None, 'reset', '{}')
+                with self._cond:
+                    self._desde_seq = self._seq
+                    self._listen_xmax = listen.xmax
+                    self._recortado = False
+                    self._cond.notify_all()
+                conectado_antes = True
+                espera = 1
+                while True:
+                    if select.select([conn], [], [], self.keepalive)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            self._received(conn.notifies.pop(0))
+            except Exception:
+                with self._cond:
+                    self._listen_xmax = None
+                self.logger.exception('Se perdió la conexión de eventos; reconectando')
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _received(self, notify):
+        if notify.channel == CANAL_CACHE:
+            if self.cache_local:
+                cache.invalidate(notify.payload)
+            return
+        evento_id, xid, datos = notify.payload.split(' ', 2)
+        if self.cache_local:
+            cache.invalidate(json.loads(datos)['recurso'])
+        self._append(evento_id, 'cambio', datos, int(xid))
+
+    def _append(self, evento_id, tipo, datos, xid=None):
+        with self._cond:
+            if len(self._buffer) == self._buffer.maxlen and self._buffer[0].seq > self._desde_seq:
+                self._recortado = True
+            self._seq += 1
+            self._buffer.append(Evento(self._seq, evento_id, tipo, datos, xid))
+            self._cond.notify_all()
+
+    def acquire(self):
+        """Reservar un lugar para un cliente; False si ya hay EVENTOS_MAX_CLIENTES en este proceso"""
+        with self._lock:
+            if self.max_clients and self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._clients -= 1
+
+    def _position(self, last_id):
+        # Posición local del evento last_id en el búfer; None si ya no está
+        for evento in reversed(self._buffer):
+            if evento.id == last_id:
+                return evento.seq
+        return None
+
+    def _snapshot_position(self, instantanea):
+        # seq después del cual están los eventos que la instantánea no ve; None si
+        # el búfer no alcanza para saberlo (se perdió la conexión o descartó eventos)
+        if self._listen_xmax is None:
+            return None
+        alguno_visible = False
+        for evento in self._buffer:
+            if evento.seq <= self._desde_seq:
+                continue
+            if not visible(evento.xid, instantanea):
+                break
+            alguno_visible = True
+        else:
+            evento = None
+        inicio = self._seq if evento is None else evento.seq - 1
+        if alguno_visible:
+            # Un evento ya contado sigue en el búfer: todo lo que se confirmó después también
+            return inicio
+        # Sin eventos ya contados en el búfer: vale si nada se descartó y la
+        # instantánea es posterior al LISTEN (nada sin ver se confirmó antes de escuchar)
+        if not self._recortado and instantanea.xmin >= self._listen_xmax:
+            return inicio
+        return None
+
+    def _after(self, seq):
+        # Eventos posteriores a seq; None si el cliente se quedó atrás del búfer
+        if not self._buffer or seq >= self._buffer[-1].seq:
+            return []
+        inicio = self._buffer[0].seq
+        if seq < inicio - 1:
+            return None
+        return list(islice(self._buffer, seq - inicio + 1, None))
+
+    def stream(self, last_id=None, instantanea=None):
+        """Generador de text/event-stream hasta que el cliente se va
+
+        Empieza después de last_id, con lo que no ve instantanea (ver parse_snapshot)
+        o desde ahora.
+        """
+        with self._cond:
+            seq = self._seq
+            if last_id:
+                position = self._position(last_id)
+            elif instantanea is not None:
+                # El hilo de LISTEN de este proceso puede estar conectándose todavía
+                self._cond.wait_for(lambda: self._listen_xmax is not None, self.keepalive)
+                position = self._snapshot_position(instantanea)
+            else:
+                position = None
+        yield f'retry: {self.retry_ms}\n\n'
+        if position is not None:
+            seq = position
+        elif last_id or instantanea is not None:
+            yield format_sse(Evento(None, None, 'reset', '{}'))
+
+        while True:
+            with self._cond:
+                pending = self._after(seq)
+                if pending == []:
+                    self._cond.wait(self.keepalive)
+                    pending = self._after(seq)
+                if pending is None:
+                    seq = self._seq
+            if pending is None:
+                yield format_sse(Evento(None, None, 'reset', '{}'))
+            elif pending:
+                seq = pending[-1].seq
+                yield ''.join(format_sse(evento) for evento in pending)
+            else:
+                # Comentario: mantiene viva la conexión y detecta clientes que se fueron
+                yield ': keepalive\n\n'
+
+
+# Instancia compartida; se configura con eventos.init_app(app)
+eventos = Eventos()
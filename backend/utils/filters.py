@@ -0,0 +1,47 @@
+# Filtros de listados desde el query string, ejecutados en SQL
+from flask import request
+from sqlalchemy import Integer, or_
+
+
+def _escape_like(valor):
+    """Escapar comodines de LIKE en el texto del usuario"""
+    return valor.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def parse_filters(model, equality_fields=(), prefix_fields=(), args=None):
+    """Construir los criterios de filtrado a partir de request.args (o de args)
+
+    - equality_fields: ?campo=valor compara por igualdad
+    - prefix_fields: ?campo=texto busca por prefijo (sin distinguir mayúsculas)
+    - ?q=texto busca la subcadena en cualquiera de los prefix_fields
+
+    Lanza ValueError si algún valor no tiene el tipo de la columna.
+    """
+    args = request.args if args is None else args
+    criteria = []
+
+    for field in equality_fields:
+        valor = args.get(field)
+        if valor in (None, ''):
+            continue
+        column = getattr(model, field)
+        if isinstance(column.type, Integer):
+            try:
+                valor = int(valor)
+            except ValueError:
+                raise ValueError(f'El filtro {field} debe ser un número entero')
+        criteria.append(column == valor)
+
+    for field in prefix_fields:
+        valor = args.get(field)
+        if valor in (None, ''):
+            continue
+        column = getattr(model, field)
+        criteria.append(column.ilike(_escape_like(valor) + '%', escape='\\'))
+
+    q = args.get('q', '').strip()
+    if q and prefix_fields:
+        patron = '%' + _escape_like(q) + '%'
+        criteria.append(or_(*[getattr(model, f).ilike(patron, escape='\\') for f in prefix_fields]))
+
+    return criteria
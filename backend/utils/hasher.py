@@ -0,0 +1,175 @@
+# Servicio de hash de contraseñas fuera del hilo de la petición
+#
+# PBKDF2/scrypt son costosos a propósito. En lugar de calcularlos en el hilo
+# que atiende la petición, se envían a un pool de procesos acotado; si la cola
+# está llena se rechaza con 429 para que las lecturas sigan respondiendo.
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import os
+import threading
+
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Contraseña asignada cuando el registro no trae una (igual que create_alumno)
+DEFAULT_PASSWORD = 'defaultpassword'
+
+
+class HasherBusy(Exception):
+    """La cola de hashing está saturada"""
+
+
+def default_workers():
+    """Procesos del pool por defecto: los núcleos repartidos entre los workers de gunicorn
+
+    gunicorn.conf.py exporta GUNICORN_WORKERS; cada worker tiene su propio pool,
+    así que con un proceso por núcleo en cada uno habría workers × núcleos
+    procesos de PBKDF2 compitiendo por los mismos núcleos. Fuera de gunicorn
+    (servidor de desarrollo, flask worker) se usan todos los núcleos.
+    """
+    gunicorn_workers = int(os.environ.get('GUNICORN_WORKERS') or 1)
+    return max(1, (os.cpu_count() or 1) // gunicorn_workers)
+
+
+def busy_response():
+    """Respuesta estándar cuando el hasher rechaza la petición"""
+    response = jsonify({'error': 'Servidor ocupado, intenta de nuevo en unos segundos'})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
+
+class Hasher:
+    """Pool de procesos para generar y verificar hashes con control de admisión"""
+
+    def __init__(self):
+        self.method = 'pbkdf2:sha256:600000'
+        self.salt_length = 16
+        self.workers = default_workers()
+        self.max_pending = self.workers * 4
+        self.timeout = 30
+        self._prefix = None
+        self._default_hash = None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', self.salt_length)
+        self.workers = app.config.get('HASHER_WORKERS') or default_workers()
+        self.max_pending = app.config.get('HASHER_MAX_PENDING') or self.workers * 4
+        self.timeout = app.config.get('HASHER_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._prefix = None
+        self._default_hash = None
+
+    def _get_pool(self):
+        # Se crea al primer uso y de nuevo tras un fork (cada worker de gunicorn tiene el suyo)
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _acquire(self, n, wait=False):
+        # Reservar n lugares de la cola; sin lugares (o tras timeout si wait) lanza HasherBusy
+        acquired = 0
+        try:
+            for _ in range(n):
+                if not self._slots.acquire(blocking=wait, timeout=self.timeout if wait else None):
+                    raise HasherBusy()
+                acquired += 1
+        except HasherBusy:
+            for _ in range(acquired):
+                self._slots.release()
+            raise
+
+    def _release(self, n):
+        for _ in range(n):
+            self._slots.release()
+
+    def _run(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._get_pool().submit(fn, *args, **kwargs).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    async def _run_async(self, fn, *args, **kwargs):
+        # Igual que _run, pero espera el resultado sin bloquear el loop de asyncio
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._get_pool().submit(fn, *args, **kwargs)
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        finally:
+            self._slots.release()
+
+    @property
+    def prefix(self):
+        """Parámetros canónicos del método configurado (p. ej. pbkdf2:sha256:600000)"""
+        if self._prefix is None:
+            sample = generate_password_hash('x', method=self.method, salt_length=self.salt_length)
+            self._prefix = sample.split('$', 1)[0]
+        return self._prefix
+
+    def hash(self, password):
+        """Generar el hash en el pool; lanza HasherBusy si la cola está llena"""
+        return self._run(generate_password_hash, password,
+                         method=self.method, salt_length=self.salt_length)
+
+    def verify(self, password_hash, password):
+        """Verificar una contraseña en el pool; lanza HasherBusy si la cola está llena"""
+        return self._run(check_password_hash, password_hash, password)
+
+    async def hash_async(self, password):
+        """Versión para handlers async de hash()"""
+        return await self._run_async(_hash_with, password, self.method, self.salt_length)
+
+    async def verify_async(self, password_hash, password):
+        """Versión para handlers async de verify()"""
+        return await self._run_async(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True si el hash se generó con otro algoritmo o costo que el configurado"""
+        return password_hash.split('$', 1)[0] != self.prefix
+
+    def default_hash(self):
+        """Hash de la contraseña por defecto, calculado una sola vez por proceso"""
+        if self._default_hash is None:
+            self._default_hash = self._get_pool().submit(
+                _hash_with, DEFAULT_PASSWORD, self.method, self.salt_length
+            ).result(timeout=self.timeout)
+        return self._default_hash
+
+    def hash_many(self, passwords, wait=False):
+        """Hashear un lote (None = contraseña por defecto) repartido en el pool
+
+        Lo usan las cargas masivas. Reserva en la cola tantos lugares como
+        procesos ocupa el lote (hasta el pool completo), así que las peticiones
+        individuales reciben 429 mientras corre; sin lugares lanza HasherBusy,
+        o con wait=True (importaciones) espera su turno hasta HASHER_TIMEOUT.
+        """
+        pending = [p for p in passwords if p]
+        slots = min(len(pending), self.workers, self.max_pending)
+        self._acquire(slots, wait)
+        try:
+            hashed = list(self._get_pool().map(
+                _hash_with, pending,
+                [self.method] * len(pending), [self.salt_length] * len(pending),
+                chunksize=16,
+            ))
+        finally:
+            self._release(slots)
+        hashed = iter(hashed)
+        return [next(hashed) if p else self.default_hash() for p in passwords]
+
+
+def _hash_with(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+# Instancia compartida; se configura con hasher.init_app(app)
+hasher = Hasher()
@@ -0,0 +1,201 @@
+# Importación en streaming de CSV/NDJSON con COPY a una tabla temporal
+#
+# El archivo se lee por lotes (nunca completo en memoria). Cada lote se
+# valida contra las columnas del modelo, se carga con COPY en una tabla
+# temporal y se mezcla en la tabla real con INSERT ... SELECT ... ON CONFLICT.
+import csv
+import io
+import json
+
+from models import Alumno, Profesor, Institucion
+from utils.eventos import eventos
+from utils.hasher import hasher
+from utils.validation import validate_record
+
+# Columnas que el sistema llena por su cuenta
+_SYSTEM_COLUMNS = ('id', 'fecha_creacion', 'password_hash', 'version')
+
+# recurso -> (modelo, columna única)
+RESOURCES = {
+    'alumnos': (Alumno, 'email'),
+    'profesores': (Profesor, 'email'),
+    'instituciones': (Institucion, None),
+}
+
+FORMATS = ('csv', 'ndjson')
+
+# Máximo de rechazos detallados en el reporte (el resto solo se cuenta)
+MAX_REJECT_DETAILS = 1000
+
+
+def importable_fields(model):
+    """Columnas que se aceptan desde el archivo"""
+    return tuple(c.name for c in model.__table__.columns if c.name not in _SYSTEM_COLUMNS)
+
+
+def iter_records(stream, formato):
+    """Generar (línea, registro, error) leyendo el flujo binario de a poco"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if formato == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+    else:
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None, 'JSON inválido'
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, 'Cada línea debe ser un objeto JSON'
+                continue
+            yield line_number, record, None
+
+
+class Importer:
+    """Carga de un archivo en lotes sobre una conexión directa de psycopg2"""
+
+    def __init__(self, engine, recurso, chunk_size=5000):
+        if recurso not in RESOURCES:
+            raise ValueError(f'Recurso no soportado: {recurso}')
+        self.engine = engine
+        self.recurso = recurso
+        self.model, self.unique_field = RESOURCES[recurso]
+        self.fields = importable_fields(self.model)
+        self.chunk_size = chunk_size
+        self.table = self.model.__tablename__
+        self.columns = list(self.fields) + (['password_hash'] if self.model is Alumno else [])
+        self.report = {
+            'recurso': recurso,
+            'procesadas': 0,
+            'insertadas': 0,
+            'rechazadas': 0,
+            'rechazos': [],
+        }
+
+    def _reject(self, linea, errores):
+        self.report['rechazadas'] += 1
+        if len(self.report['rechazos']) < MAX_REJECT_DETAILS:
+            self.report['rechazos'].append({'linea': linea, 'errores': errores})
+
+    def _create_staging(self, cursor):
+        # Misma definición de columnas que la tabla real, sin índices ni restricciones
+        cols = ', '.join(self.columns)
+        cursor.execute(
+            f'CREATE TEMP TABLE IF NOT EXISTS staging_{self.table} ON COMMIT DELETE ROWS AS '
+            f'SELECT {cols}, 0 AS linea FROM {self.table} WITH NO DATA'
+        )
+
+    def _load_chunk(self, conn, chunk):
+        """Validar, copiar y mezclar un lote; confirma la transacción del lote"""
+        valid = []
+        seen = set()
+        for linea, record, error in chunk:
+            self.report['procesadas'] += 1
+            if error:
+                self._reject(linea, [error])
+                continue
+            clean, errors = validate_record(self.model, record, self.fields)
+            if not errors and self.unique_field:
+                key = clean[self.unique_field]
+                if key in seen:
+                    errors.append(f'{self.unique_field} repetido en el archivo')
+                else:
+                    seen.add(key)
+            if errors:
+                self._reject(linea, errors)
+            else:
+                valid.append((linea, record, clean))
+
+        if not valid:
+            return
+
+        if self.model is Alumno:
+            passwords = [str(r['password']) if r.get('password') else None for _, r, _ in valid]
+            for (_, _, clean), password_hash in zip(valid, hasher.hash_many(passwords, wait=True)):
+                clean['password_hash'] = password_hash
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for linea, _, clean in valid:
+            writer.writerow([clean.get(c) for c in self.columns] + [linea])
+        buffer.seek(0)
+
+        cols = ', '.join(self.columns)
+        staging = f'staging_{self.table}'
+        cursor = conn.cursor()
+        try:
+            self._create_staging(cursor)
+            cursor.copy_expert(f'COPY {staging} ({cols}, linea) FROM STDIN WITH (FORMAT csv)', buffer)
+            rejected = self._reject_missing_references(cursor, staging)
+
+            insert = (f'INSERT INTO {self.table} ({cols}, fecha_creacion) '
+                      f"SELECT {cols}, now() AT TIME ZONE 'utc' FROM {staging}")
+            if self.unique_field:
+                key = self.unique_field
+                # Las filas que chocan con registros existentes se reportan como rechazadas
+                cursor.execute(
+                    f'WITH ins AS ({insert} ON CONFLICT ({key}) DO NOTHING RETURNING {key}) '
+                    f'SELECT s.linea FROM {staging} s LEFT JOIN ins ON ins.{key} = s.{key} '
+                    f'WHERE ins.{key} IS NULL ORDER BY s.linea'
+                )
+                conflicts = [row[0] for row in cursor.fetchall()]
+                for linea in conflicts:
+                    self._reject(linea, [f'El {key} ya está registrado'])
+                inserted = len(valid) - rejected - len(conflicts)
+            else:
+                cursor.execute(insert)
+                inserted = cursor.rowcount
+            self.report['insertadas'] += inserted
+            # Un evento por lote, solo con el total (los ids no se leen de vuelta)
+            eventos.publish_cursor(cursor, self.recurso, 'creado', total=inserted)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _reject_missing_references(self, cursor, staging):
+        """Sacar del staging las filas cuya llave foránea no existe; devuelve cuántas"""
+        rejected = 0
+        for column in self.model.__table__.columns:
+            if column.name not in self.columns:
+                continue
+            for fk in column.foreign_keys:
+                target, target_col = fk.column.table.name, fk.column.name
+                cursor.execute(
+                    f'DELETE FROM {staging} s WHERE s.{column.name} IS NOT NULL AND NOT EXISTS '
+                    f'(SELECT 1 FROM {target} t WHERE t.{target_col} = s.{column.name}) '
+                    f'RETURNING s.linea, s.{column.name}'
+                )
+                for linea, value in sorted(cursor.fetchall()):
+                    self._reject(linea, [f'{column.name} no existe: {value}'])
+                    rejected += 1
+        return rejected
+
+    def run(self, stream, formato, on_progress=None):
+        """Importar todo el flujo; on_progress(reporte) se llama tras cada lote"""
+        if formato not in FORMATS:
+            raise ValueError(f'Formato no soportado: {formato}')
+
+        conn = self.engine.raw_connection()
+        try:
+            chunk = []
+            for item in iter_records(stream, formato):
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    self._load_chunk(conn, chunk)
+                    chunk = []
+                    if on_progress:
+                        on_progress(self.report)
+            if chunk:
+                self._load_chunk(conn, chunk)
+                if on_progress:
+                    on_progress(self.report)
+        finally:
+            conn.close()
+        return self.report
@@ -0,0 +1,96 @@
+# Relaciones embebidas con ?include= (una consulta por relación, sin objetos del ORM)
+#
+# Las relaciones se leen de los modelos (relationship) y se resuelven sobre los
+# diccionarios ya serializados: muchos-a-uno con un SELECT ... WHERE id IN (...)
+# y uno-a-muchos con row_number() por padre para acotar cuántos hijos se
+# embeben. Así el listado sigue usando el camino rápido de tuplas y el número
+# de consultas no depende del tamaño de la página.
+from flask import current_app, request
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import MANYTOONE
+
+from utils.serializers import serializer_for
+
+
+def parse_include(allowed, args=None):
+    """Leer ?include=a,b; lanza ValueError si alguna relación no está permitida"""
+    args = request.args if args is None else args
+    requested = args.get('include')
+    if not requested:
+        return []
+    names = list(dict.fromkeys(n.strip() for n in requested.split(',') if n.strip()))
+    invalid = [n for n in names if n not in allowed]
+    if invalid:
+        raise ValueError(f'Relaciones no válidas en include: {", ".join(invalid)}')
+    return names
+
+
+def with_include_fields(model, fields, names):
+    """Agregar a fields las llaves foráneas que necesitan las relaciones pedidas
+
+    Igual que el id con el cursor, la llave de una relación muchos-a-uno se
+    devuelve siempre que se pide esa relación.
+    """
+    fields = list(fields)
+    for name in names:
+        relationship = inspect(model).relationships[name]
+        if relationship.direction is MANYTOONE:
+            for column in relationship.local_columns:
+                if column.name not in fields:
+                    fields.append(column.name)
+    return fields
+
+
+def _many_to_one(db, relationship, items, name):
+    target = relationship.mapper.class_
+    serializer = serializer_for(target)
+    (column,) = relationship.local_columns
+    ids = {item[column.name] for item in items if item.get(column.name) is not None}
+
+    related = {}
+    if ids:
+        stmt = select(*serializer.columns()).where(target.id.in_(ids))
+        related = {r['id']: r for r in serializer.rows(db.execute(stmt).all())}
+    for item in items:
+        item[name] = related.get(item.get(column.name))
+
+
+def _one_to_many(db, relationship, items, name, max_related):
+    target = relationship.mapper.class_
+    serializer = serializer_for(target)
+    (column,) = relationship.remote_side
+    grouped = {item['id']: [] for item in items}
+
+    if grouped:
+        # Los primeros max_related hijos de cada padre, en una sola consulta
+        numbered = select(
+            *serializer.columns(),
+            column.label('_padre'),
+            func.row_number().over(partition_by=column, order_by=target.id).label('_n'),
+        ).where(column.in_(list(grouped))).subquery()
+        stmt = (select(*[numbered.c[f] for f in serializer.fields], numbered.c._padre)
+                .where(numbered.c._n <= max_related)
+                .order_by(numbered.c._padre, numbered.c.id))
+        for row in db.execute(stmt):
+            grouped[row[-1]].append(tuple(row[:-1]))
+    for item in items:
+        item[name] = serializer.rows(grouped[item['id']])
+
+
+def embed_includes(db, model, items, names, max_related=None):
+    """Agregar a cada diccionario de items las relaciones pedidas (modifica items)
+
+    Uno-a-muchos se corta en INCLUDE_MAX_RELATED registros por padre; la lista
+    completa se pide por la ruta anidada (p. ej. /instituciones/<id>/alumnos).
+    """
+    if not names or not items:
+        return items
+    if max_related is None:
+        max_related = current_app.config.get('INCLUDE_MAX_RELATED', 50)
+    for name in names:
+        relationship = inspect(model).relationships[name]
+        if relationship.direction is MANYTOONE:
+            _many_to_one(db, relationship, items, name)
+        else:
+            _one_to_many(db, relationship, items, name, max_related)
+    return items
@@ -0,0 +1,239 @@
+# Métricas de rendimiento por petición
+#
+# Un middleware (before/after_request) mide la latencia de cada endpoint; los
+# eventos de SQLAlchemy cuentan las sentencias y el tiempo en la base de la
+# petición actual, y el pool (TimedQueuePool) mide cuánto se espera por una
+# conexión libre. Todo se acumula en memoria por proceso y se expone en
+# /metrics con el formato de texto de Prometheus. Cada respuesta lleva un
+# encabezado Server-Timing y las peticiones lentas se registran con sus SQL.
+from bisect import bisect_left
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+# Límites superiores (segundos) de los buckets de los histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Sentencias que se guardan por petición para el registro de lentas
+MAX_LOGGED_STATEMENTS = 50
+
+
+_INF = 'le="+Inf"'
+
+
+def _escape(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=''):
+    pares = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Counter:
+    """Contador monotónico por combinación de etiquetas"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_labels(self.label_names, labels)} {value}'
+
+
+class Histogram:
+    """Histograma acumulado (buckets, suma y conteo) por combinación de etiquetas"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+
+    def observe(self, value, labels=()):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self):
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            acumulado = 0
+            for bound, n in zip(self.buckets, counts):
+                acumulado += n
+                le = _labels(self.label_names, labels, f'le="{bound}"')
+                yield f'{self.name}_bucket{le} {acumulado}'
+            yield f'{self.name}_bucket{_labels(self.label_names, labels, _INF)} {count}'
+            yield f'{self.name}_sum{_labels(self.label_names, labels)} {total}'
+            yield f'{self.name}_count{_labels(self.label_names, labels)} {count}'
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide la espera por una conexión libre (checkout)"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe_pool_wait(time.perf_counter() - inicio)
+
+
+class Metrics:
+    """Registro de métricas del proceso, middleware de Flask y eventos del engine"""
+
+    def __init__(self):
+        self.enabled = True
+        self.slow_ms = 500
+        self.server_timing = True
+        self.logger = None
+        self._lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'Peticiones atendidas',
+                                ('endpoint', 'method', 'status'))
+        self.latency = Histogram('http_request_duration_seconds', 'Latencia por endpoint',
+                                 ('endpoint', 'method'))
+        self.statements = Counter('db_statements_total', 'Sentencias SQL ejecutadas por endpoint',
+                                  ('endpoint',))
+        self.statements_per_request = Histogram('db_statements_per_request', 'Sentencias SQL por petición',
+                                                ('endpoint',), buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100))
+        self.db_time = Counter('db_time_seconds_total', 'Tiempo en la base de datos por endpoint',
+                               ('endpoint',))
+        self.pool_wait = Histogram('db_pool_checkout_wait_seconds', 'Espera por una conexión del pool',
+                                   buckets=POOL_WAIT_BUCKETS)
+        self.slow = Counter('http_slow_requests_total', 'Peticiones que superaron METRICS_SLOW_REQUEST_MS',
+                            ('endpoint',))
+        self._families = (self.requests, self.latency, self.statements, self.statements_per_request,
+                          self.db_time, self.pool_wait, self.slow)
+        self._engine_events = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        if not self.enabled:
+            return
+        self.slow_ms = app.config.get('METRICS_SLOW_REQUEST_MS', self.slow_ms)
+        self.server_timing = app.config.get('METRICS_SERVER_TIMING', self.server_timing)
+        self.logger = app.logger
+        # El engine se crea al primer uso: el pool con medición se pide por configuración
+        app.config.setdefault('DB_POOL_CLASS', TimedQueuePool)
+        self._listen_engines()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _listen_engines(self):
+        # Eventos a nivel de clase: aplican al engine aunque todavía no exista
+        if self._engine_events:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        self._engine_events = True
+
+    # --- Middleware ---
+
+    def _before_request(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_db = [0, 0.0, 0.0, []]  # sentencias, tiempo en la base, espera del pool, SQL
+
+    def _after_request(self, response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        count, db_time, pool_wait, sentencias = g.pop('_metrics_db')
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+
+        with self._lock:
+            self.requests.inc((endpoint, request.method, str(response.status_code)))
+            self.latency.observe(elapsed, (endpoint, request.method))
+            self.statements.inc((endpoint,), count)
+            self.statements_per_request.observe(count, (endpoint,))
+            self.db_time.inc((endpoint,), db_time)
+
+        if self.server_timing:
+            response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.1f}, '
+                                 f'db;dur={db_time * 1000:.1f};desc="{count} SQL", '
+                                 f'pool;dur={pool_wait * 1000:.1f}')
+
+        if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+            with self._lock:
+                self.slow.inc((endpoint,))
+            detalle = ''.join(f'\n  {ms:8.1f}ms  {sql}' for sql, ms in sentencias)
+            self.logger.warning('Petición lenta: %s %s %d en %.1fms (%d sentencias, %.1fms en la base)%s',
+                                request.method, request.full_path.rstrip('?'), response.status_code,
+                                elapsed * 1000, count, db_time * 1000, detalle)
+        return response
+
+    # --- Base de datos ---
+
+    def observe_pool_wait(self, seconds):
+        with self._lock:
+            self.pool_wait.observe(seconds)
+        if has_request_context() and '_metrics_db' in g:
+            g._metrics_db[2] += seconds
+
+    # --- Exposición ---
+
+    def render(self, engine=None):
+        """Todas las métricas del proceso en formato de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            for family in self._families:
+                lines.append(f'# HELP {family.name} {family.help}')
+                lines.append(f'# TYPE {family.name} {family.kind}')
+                lines.extend(family.samples())
+
+        if engine is not None:
+            pool = engine.pool
+            for name, help_text, value in (
+                ('db_pool_size', 'Conexiones permanentes del pool', pool.size()),
+                ('db_pool_checked_out', 'Conexiones en uso', pool.checkedout()),
+                ('db_pool_overflow', 'Conexiones abiertas por encima de pool_size', max(pool.overflow(), 0)),
+                ('db_pool_checked_in', 'Conexiones libres en el pool', pool.checkedin()),
+            ):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_metrics_inicio', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_metrics_inicio')
+    if not inicios:
+        return
+    elapsed = time.perf_counter() - inicios.pop()
+    if not has_request_context():
+        return
+    data = g.get('_metrics_db')
+    if data is None:
+        return
+    data[0] += 1
+    data[1] += elapsed
+    if len(data[3]) < MAX_LOGGED_STATEMENTS:
+        data[3].append((' '.join(statement.split())[:500], elapsed * 1000))
+
+
+# Instancia compartida; se configura con metrics.init_app(app)
+metrics = Metrics()
@@ -0,0 +1,76 @@
+# Paginación por cursor (keyset sobre id) y proyección de campos
+from flask import current_app, request
+from sqlalchemy import select
+
+from utils.serializers import serializer_for
+
+
+def parse_page_args(allowed_fields, args=None, config=None):
+    """Leer limit, cursor y fields del query string
+
+    args y config son los de la petición y la app de Flask si no se indican.
+    Lanza ValueError si algún parámetro no es válido.
+    """
+    args = request.args if args is None else args
+    config = current_app.config if config is None else config
+    default_size = config.get('PAGE_SIZE_DEFAULT', 50)
+    max_size = config.get('PAGE_SIZE_MAX', 500)
+
+    try:
+        limit = int(args.get('limit', default_size))
+    except ValueError:
+        raise ValueError('El parámetro limit debe ser un número entero')
+    # Límite duro del servidor, sin importar lo que pida el cliente
+    limit = max(1, min(limit, max_size))
+
+    cursor = args.get('cursor')
+    if cursor not in (None, ''):
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            raise ValueError('Cursor inválido')
+    else:
+        cursor = None
+
+    fields = list(allowed_fields)
+    requested = args.get('fields')
+    if requested:
+        fields = [f.strip() for f in requested.split(',') if f.strip()]
+        invalid = [f for f in fields if f not in allowed_fields]
+        if invalid:
+            raise ValueError(f'Campos no válidos: {", ".join(invalid)}')
+        # El id siempre se incluye porque es la llave del cursor
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+
+    return limit, cursor, fields
+
+
+def page_statement(model, fields, limit, cursor=None, criteria=()):
+    """SELECT de una página con solo las columnas pedidas (sirve para Session y AsyncSession)"""
+    stmt = select(*[getattr(model, f) for f in fields])
+    for criterion in criteria:
+        stmt = stmt.where(criterion)
+    if cursor is not None:
+        stmt = stmt.where(model.id > cursor)
+    # Se pide una fila extra para saber si hay página siguiente
+    return stmt.order_by(model.id).limit(limit + 1)
+
+
+def page_payload(model, rows, fields, limit):
+    """Respuesta de la página a partir de las filas de page_statement"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = serializer_for(model).rows(rows, fields)
+    return {
+        'items': items,
+        'next_cursor': items[-1]['id'] if has_more else None,
+        'limit': limit,
+    }
+
+
+def paginate(db, model, fields, limit, cursor=None, criteria=()):
+    """Ejecutar una página de la consulta seleccionando solo las columnas pedidas"""
+    rows = db.execute(page_statement(model, fields, limit, cursor, criteria)).all()
+    return page_payload(model, rows, fields, limit)
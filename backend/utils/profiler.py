@@ -0,0 +1,250 @@
+# Perfilado opcional por petición y EXPLAIN de consultas lentas
+#
+# Una petición se perfila con cProfile si trae X-Profile: 1 junto con un
+# X-Admin-Token válido, o al azar según PROFILER_SAMPLE_RATE. El resultado se
+# guarda como .prof (pstats; se abre con snakeviz o flameprof para ver la
+# gráfica de llama) y el id va en el encabezado X-Profile-Id. Los SELECT que
+# superan EXPLAIN_SLOW_QUERY_MS se vuelven a ejecutar con EXPLAIN (ANALYZE,
+# BUFFERS) después de enviar la respuesta; los que llaman funciones con efectos
+# (pg_notify, nextval, advisory locks...) o bloquean filas solo con EXPLAIN,
+# que no los ejecuta. Todo queda en PROFILER_DIR con un
+# límite de archivos y de megabytes: al pasarlo se borran los más antiguos.
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import database
+from utils.auth import is_admin_request
+
+# Ids de archivo: fecha + aleatorio, sin rutas ni puntos
+_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+
+# Sentencias lentas capturadas por petición como máximo
+MAX_EXPLAINS_PER_REQUEST = 5
+
+# SELECT que no se pueden repetir con ANALYZE: funciones con efectos fuera de la
+# transacción (o que no se deshacen con el rollback) y bloqueos de filas
+_SIDE_EFFECTS_RE = re.compile(
+    r'\b(pg_notify|nextval|setval|set_config|pg_(try_)?advisory_\w+|pg_(cancel|terminate)_backend'
+    r'|pg_sleep\w*|lo_\w+|dblink\w*)\s*\('
+    r'|\bFOR\s+(NO\s+KEY\s+|KEY\s+)?(UPDATE|SHARE)\b',
+    re.IGNORECASE,
+)
+
+
+class Profiler:
+    """Perfilado de peticiones, captura de planes y retención en disco"""
+
+    def __init__(self):
+        self.directory = None
+        self.sample_rate = 0.0
+        self.max_files = 200
+        self.max_bytes = 200 * 1024 * 1024
+        self.explain_ms = 0
+        self.explain_per_minute = 10
+        self._explain_window = [0.0, 0]  # inicio de la ventana, planes en ella
+        self._lock = threading.Lock()
+        self._engine_events = False
+
+    def init_app(self, app):
+        directory = app.config.get('PROFILER_DIR') or 'profiles'
+        self.directory = directory if os.path.isabs(directory) else os.path.join(app.root_path, directory)
+        self.sample_rate = app.config.get('PROFILER_SAMPLE_RATE', self.sample_rate)
+        self.max_files = app.config.get('PROFILER_MAX_FILES', self.max_files)
+        self.max_bytes = app.config.get('PROFILER_MAX_MB', 200) * 1024 * 1024
+        self.explain_ms = app.config.get('EXPLAIN_SLOW_QUERY_MS', self.explain_ms)
+        self.explain_per_minute = app.config.get('EXPLAIN_MAX_PER_MINUTE', self.explain_per_minute)
+        if self.explain_ms and not self._engine_events:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self._engine_events = True
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    # --- Perfilado ---
+
+    def _wants_profile(self):
+        if request.headers.get('X-Profile') == '1' and is_admin_request():
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self):
+        if not self._wants_profile():
+            return
+        import cProfile  # solo las peticiones perfiladas lo necesitan
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Otro perfilador activo en el proceso
+            return
+        g._profiler = perfil
+        g._profiler_start = time.perf_counter()
+
+    def _after_request(self, response):
+        perfil = g.pop('_profiler', None)
+        lentas = g.pop('_profiler_slow', None)
+        if perfil is None and not lentas:
+            return response
+
+        contexto = {'metodo': request.method, 'ruta': request.full_path.rstrip('?'),
+                    'endpoint': request.url_rule.rule if request.url_rule is not None else None}
+        if perfil is not None:
+            perfil.disable()
+            elapsed_ms = (time.perf_counter() - g.pop('_profiler_start')) * 1000
+            profile_id = self._new_id()
+            perfil.dump_stats(self._path(profile_id, '.prof'))
+            self._write_meta(profile_id, 'perfil', {
+                **contexto,
+                'duracion_ms': round(elapsed_ms, 1),
+                'status': response.status_code,
+            })
+            response.headers['X-Profile-Id'] = profile_id
+
+        if lentas:
+            # Después de enviar la respuesta, fuera del tiempo de la petición
+            response.call_on_close(lambda: self._explain(lentas, contexto))
+        return response
+
+    # --- EXPLAIN ---
+
+    def _allow_explain(self):
+        with self._lock:
+            ahora = time.monotonic()
+            if ahora - self._explain_window[0] >= 60:
+                self._explain_window[:] = [ahora, 0]
+            if self._explain_window[1] >= self.explain_per_minute:
+                return False
+            self._explain_window[1] += 1
+            return True
+
+    def _explain(self, lentas, contexto):
+        for statement, parameters, elapsed_ms in lentas:
+            if not self._allow_explain():
+                return
+            # ANALYZE ejecuta la consulta: solo lecturas simples y dentro de una transacción que se descarta
+            analyze = not _SIDE_EFFECTS_RE.search(statement)
+            opciones = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+            try:
+                with database.get_engine().connect() as conn:
+                    plan = conn.exec_driver_sql(f'EXPLAIN ({opciones}) ' + statement, parameters).scalar()
+                    conn.rollback()
+            except Exception as e:
+                plan = {'error': f'{e.__class__.__name__}: {e}'}
+            self._write_meta(self._new_id(), 'explain', {
+                **contexto,
+                'duracion_ms': round(elapsed_ms, 1),
+                'sql': statement,
+                'parametros': repr(parameters),
+                'analyze': analyze,
+                'plan': plan,
+            })
+
+    # --- Almacenamiento ---
+
+    def _new_id(self):
+        return time.strftime('%Y%m%dT%H%M%S') + '-' + uuid.uuid4().hex[:8]
+
+    def _path(self, item_id, suffix):
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, item_id + suffix)
+
+    def _write_meta(self, item_id, tipo, data):
+        meta = {'id': item_id, 'tipo': tipo, 'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'), **data}
+        with open(self._path(item_id, '.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+        self._prune()
+
+    def _prune(self):
+        """Borrar los resultados más antiguos hasta respetar el límite de archivos y de tamaño"""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.is_file()]
+        except FileNotFoundError:
+            return
+        grupos = {}
+        for entry in entries:
+            item_id = entry.name.split('.', 1)[0]
+            grupo = grupos.setdefault(item_id, [0, []])
+            grupo[0] += entry.stat().st_size
+            grupo[1].append(entry.path)
+
+        total = sum(size for size, _ in grupos.values())
+        # Los ids empiezan con la fecha: el orden alfabético es el cronológico
+        for item_id in sorted(grupos):
+            if len(grupos) <= self.max_files and total <= self.max_bytes:
+                break
+            size, paths = grupos.pop(item_id)
+            total -= size
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def entries(self, tipo=None):
+        """Metadatos de los resultados guardados, del más reciente al más antiguo"""
+        try:
+            names = sorted((n for n in os.listdir(self.directory) if n.endswith('.json')), reverse=True)
+        except FileNotFoundError:
+            return []
+        items = []
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if tipo and meta.get('tipo') != tipo:
+                continue
+            meta.pop('plan', None)
+            meta.pop('sql', None)
+            items.append(meta)
+        return items
+
+    def file_path(self, item_id, suffix):
+        """Ruta del resultado o None si el id no es válido o no existe"""
+        if not _ID_RE.match(item_id):
+            return None
+        path = os.path.join(self.directory, item_id + suffix)
+        return path if os.path.exists(path) else None
+
+    def summary(self, item_id, limit=40, sort='cumulative'):
+        """Las funciones más costosas de un .prof en texto (pstats)"""
+        path = self.file_path(item_id, '.prof')
+        if path is None:
+            return None
+        import pstats
+        salida = io.StringIO()
+        pstats.Stats(path, stream=salida).sort_stats(sort).print_stats(limit)
+        return salida.getvalue()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_profiler_inicio', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get('_profiler_inicio')
+    if not inicios:
+        return
+    elapsed_ms = (time.perf_counter() - inicios.pop()) * 1000
+    if elapsed_ms < profiler.explain_ms or executemany or not has_request_context():
+        return
+    if statement.lstrip()[:6].upper() != 'SELECT':
+        return
+    lentas = g.setdefault('_profiler_slow', [])
+    if len(lentas) < MAX_EXPLAINS_PER_REQUEST:
+        lentas.append((statement, parameters, elapsed_ms))
+
+
+# Instancia compartida; se configura con profiler.init_app(app)
+profiler = Profiler()
@@ -0,0 +1,306 @@
+# Límite de peticiones y control de admisión
+#
+# Cada petición gasta fichas de una cubeta por IP y, si trae un token válido,
+# de otra por usuario. Las cubetas se rellenan a RATELIMIT_*_RATE fichas por
+# segundo hasta RATELIMIT_*_BURST, y el costo depende del endpoint: login,
+# listados y exportaciones cuestan más que leer un detalle. Sin fichas la
+# respuesta es 429 con Retry-After. Además, algunos endpoints tienen un máximo
+# de peticiones simultáneas por proceso para que no acaparen los hilos del
+# worker ni el pool de conexiones.
+#
+# Las cubetas viven en memoria del proceso (por defecto) o en Redis, donde las
+# comparten todos los workers; RATELIMIT_REDIS_URL=local:// usa un sustituto
+# en memoria con el mismo algoritmo.
+from fnmatch import fnmatchcase
+import ipaddress
+import math
+import threading
+import time
+
+import jwt
+from flask import g, jsonify, request
+
+from utils.auth import tokens, is_admin_request, _token_from_header
+from utils.hasher import busy_response
+
+try:
+    import redis
+except ImportError:  # dependencia opcional, solo para RATELIMIT_BACKEND=redis
+    redis = None
+
+# Costo en fichas por endpoint (patrones sobre request.endpoint, gana el primero)
+COSTS = (
+    ('auth.login', 10),
+    ('auth.register', 10),
+    ('auth.refresh', 5),
+    ('*.export_*', 20),
+    ('*.bulk_*', 20),
+    ('importacion.*', 20),
+    ('*.get_alumnos', 5),
+    ('*.get_profesores', 5),
+    ('*.get_instituciones', 5),
+    ('instituciones.get_institucion_alumnos', 5),
+    ('instituciones.get_institucion_profesores', 5),
+    ('stats.get_stats', 5),
+    ('reportes.get_reporte_*', 5),
+    ('trabajos.crear_trabajo', 10),
+    ('trabajos.descargar_resultado', 20),
+)
+READ_COST = 1
+WRITE_COST = 2
+
+# Peticiones simultáneas por proceso
+CONCURRENCY = (
+    ('*.export_*', 2),
+    ('importacion.*', 1),
+    ('*.bulk_*', 2),
+    ('reportes.actualizar_reportes', 1),
+)
+
+# Sin límite: sondas del orquestador, Prometheus y administración
+EXEMPT = ('health.*', 'metrics.*', 'admin.*', 'static')
+
+
+def _match(rules, endpoint, default=None):
+    for pattern, value in rules:
+        if fnmatchcase(endpoint, pattern):
+            return value
+    return default
+
+
+class MemoryBuckets:
+    """Cubetas de fichas en memoria del proceso"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}  # llave -> (fichas, instante, instante en que vuelve a estar llena)
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst):
+        """Gastar cost fichas: 0 si alcanzó, o los segundos que faltan para que alcance"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        # Una cubeta llena equivale a no tenerla; si aun así sobran, se van las más antiguas
+        for key in [k for k, b in self._buckets.items() if b[2] <= now]:
+            del self._buckets[key]
+        excess = len(self._buckets) - self.max_keys
+        for key in list(self._buckets)[:max(excess, 0)]:
+            del self._buckets[key]
+
+
+# Misma cubeta en Redis, atómica; el reloj es el del servidor de Redis
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(bucket[1]) or burst
+local stamp = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - stamp) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class LocalScriptRedis:
+    """Sustituto local de Redis para RATELIMIT_REDIS_URL=local://
+
+    No ejecuta Lua: register_script devuelve el mismo algoritmo de cubeta en Python.
+    """
+
+    def __init__(self):
+        self._buckets = MemoryBuckets(max_keys=float('inf'))
+
+    def register_script(self, source):
+        def script(keys, args):
+            rate, burst, cost = (float(a) for a in args)
+            return str(self._buckets.take(keys[0], cost, rate, burst)).encode('ascii')
+        return script
+
+
+class RedisBuckets:
+    """Cubetas compartidas entre procesos (un script Lua por petición)"""
+
+    def __init__(self, client, prefix='escuela:rl:'):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+    @classmethod
+    def from_url(cls, url, prefix='escuela:rl:'):
+        if url.startswith('local://'):
+            return cls(LocalScriptRedis(), prefix)
+        if redis is None:
+            raise RuntimeError('RATELIMIT_BACKEND=redis requiere el paquete "redis"')
+        return cls(redis.Redis.from_url(url, socket_timeout=0.1), prefix)
+
+    def take(self, key, cost, rate, burst):
+        return float(self._script(keys=[self.prefix + key], args=[rate, burst, cost]))
+
+
+def _too_many(wait):
+    response = jsonify({'error': 'Demasiadas peticiones, intenta de nuevo más tarde'})
+    response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+    return response, 429
+
+
+class RateLimiter:
+    """Middleware de Flask: cubetas por IP y por usuario y máximo de concurrencia por endpoint"""
+
+    def __init__(self):
+        self.enabled = True
+        self.backend = MemoryBuckets()
+        self.ip_rate, self.ip_burst = 20.0, 200.0
+        self.user_rate, self.user_burst = 20.0, 200.0
+        self.trusted_proxies = 0
+        self.proxy_networks = ()
+        self.logger = None
+        self._policies = {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        self._last_error = 0.0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        if not self.enabled:
+            return
+        if app.config.get('RATELIMIT_BACKEND', 'memory') == 'redis':
+            self.backend = RedisBuckets.from_url(app.config['RATELIMIT_REDIS_URL'])
+        else:
+            self.backend = MemoryBuckets(app.config.get('RATELIMIT_MAX_KEYS', 100000))
+        self.ip_rate = float(app.config.get('RATELIMIT_IP_RATE', self.ip_rate))
+        self.ip_burst = float(app.config.get('RATELIMIT_IP_BURST', self.ip_burst))
+        self.user_rate = float(app.config.get('RATELIMIT_USER_RATE', self.user_rate))
+        self.user_burst = float(app.config.get('RATELIMIT_USER_BURST', self.user_burst))
+        self.trusted_proxies = app.config.get('RATELIMIT_TRUSTED_PROXIES', 0)
+        self.proxy_networks = tuple(
+            ipaddress.ip_network(red.strip(), strict=False)
+            for red in app.config.get('RATELIMIT_PROXY_IPS', '').split(',') if red.strip()
+        )
+        self.logger = app.logger
+        self._policies = {}
+        self._semaphores = {}
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def policy(self, endpoint, method):
+        """(costo, semáforo o None) del endpoint, o None si no tiene límite; se resuelve una vez"""
+        key = (endpoint, method)
+        policy = self._policies.get(key, False)
+        if policy is not False:
+            return policy
+        with self._lock:
+            if endpoint is None or any(fnmatchcase(endpoint, p) for p in EXEMPT):
+                policy = None
+            else:
+                cost = _match(COSTS, endpoint, READ_COST if method in ('GET', 'HEAD') else WRITE_COST)
+                limit = _match(CONCURRENCY, endpoint)
+                semaphore = None
+                if limit is not None:
+                    # Un semáforo por endpoint, compartido por todos sus métodos
+                    semaphore = self._semaphores.setdefault(endpoint, threading.BoundedSemaphore(limit))
+                policy = (cost, semaphore)
+            self._policies[key] = policy
+        return policy
+
+    def _from_proxy(self, addr):
+        # Solo las conexiones de RATELIMIT_PROXY_IPS pueden traer X-Forwarded-For: un cliente
+        # que llega directo al puerto del backend elegiría su propia cubeta
+        try:
+            addr = ipaddress.ip_address(addr)
+        except ValueError:
+            return False
+        return any(addr in red for red in self.proxy_networks)
+
+    def client_ip(self):
+        """IP del cliente; detrás de RATELIMIT_TRUSTED_PROXIES proxies se toma de X-Forwarded-For
+
+        El encabezado solo se usa si la conexión viene de RATELIMIT_PROXY_IPS.
+        """
+        if self.trusted_proxies and self._from_proxy(request.remote_addr or ''):
+            forwarded = request.headers.get('X-Forwarded-For')
+            if forwarded:
+                hops = [h.strip() for h in forwarded.split(',')]
+                return hops[-min(self.trusted_proxies, len(hops))]
+        return request.remote_addr or 'desconocida'
+
+    def _user_id(self):
+        if 'Authorization' not in request.headers:
+            return None
+        try:
+            return tokens.verify(_token_from_header()).get('user_id')
+        except jwt.InvalidTokenError:
+            return None
+
+    def _take(self, key, cost, rate, burst):
+        try:
+            return self.backend.take(key, min(cost, burst), rate, burst)
+        except Exception:
+            # Si el backend compartido falla se deja pasar: el límite no debe tumbar la API
+            now = time.monotonic()
+            if now - self._last_error > 60:
+                self._last_error = now
+                self.logger.exception('Límite de peticiones sin backend; se admiten las peticiones')
+            return 0.0
+
+    # --- Middleware ---
+
+    def _before_request(self):
+        policy = self.policy(request.endpoint, request.method)
+        if policy is None or ('X-Admin-Token' in request.headers and is_admin_request()):
+            return None
+        cost, semaphore = policy
+
+        wait = self._take('ip:' + self.client_ip(), cost, self.ip_rate, self.ip_burst)
+        if not wait:
+            user_id = self._user_id()
+            if user_id is not None:
+                wait = self._take(f'user:{user_id}', cost, self.user_rate, self.user_burst)
+        if wait:
+            return _too_many(wait)
+
+        if semaphore is not None:
+            if not semaphore.acquire(blocking=False):
+                return busy_response()
+            g._ratelimit_semaphore = semaphore
+        return None
+
+    def _after_request(self, response):
+        semaphore = g.pop('_ratelimit_semaphore', None)
+        if semaphore is not None:
+            # Las exportaciones siguen enviando el cuerpo después de after_request
+            response.call_on_close(semaphore.release)
+        return response
+
+    def _teardown_request(self, exc):
+        # Solo si after_request no llegó a correr (error sin manejar)
+        semaphore = g.pop('_ratelimit_semaphore', None)
+        if semaphore is not None:
+            semaphore.release()
+
+
+# Instancia compartida; se configura con ratelimit.init_app(app)
+ratelimit = RateLimiter()
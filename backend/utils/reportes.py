@@ -0,0 +1,130 @@
+# Vistas materializadas de reportes y su actualización en segundo plano
+#
+# Los conteos de inscripción (/reportes) se leen de reporte_alumnos, una vista
+# materializada con una fila por combinación de institución, carrera, periodo,
+# semestre y año (migración 0005), en lugar de recorrer alumnos. Cada worker
+# arranca un hilo que cada REPORTES_REFRESH_SECONDS ejecuta REFRESH
+# MATERIALIZED VIEW CONCURRENTLY: las escrituras y las lecturas del reporte no
+# se bloquean mientras se recalcula. Un advisory lock evita que dos procesos
+# actualicen a la vez, y la vista se salta si su tabla no cambió desde la
+# última actualización (contadores de pg_stat_user_tables).
+import os
+import random
+import threading
+import time
+
+from sqlalchemy import Integer, String, column, table, text
+
+import database
+from utils.cache import cache
+from utils.eventos import eventos
+
+# Vista de conteos de alumnos (las columnas que usan las rutas)
+REPORTE_ALUMNOS = table(
+    'reporte_alumnos',
+    column('institucion_id', Integer),
+    column('carrera', String),
+    column('periodo', String),
+    column('semestre', Integer),
+    column('anio', Integer),
+    column('total', Integer),
+)
+
+# Vista -> tabla de la que sale
+VISTAS = {'reporte_alumnos': 'alumnos'}
+
+# Llave del advisory lock compartida por todos los procesos
+_LOCK_KEY = 5_000_019
+
+_CAMBIOS = text('SELECT n_tup_ins + n_tup_upd + n_tup_del FROM pg_stat_user_tables WHERE relname = :tabla')
+_ESTADO = text('SELECT cambios FROM reportes_estado WHERE vista = :vista')
+_GUARDAR = text("""
+    INSERT INTO reportes_estado (vista, actualizado, cambios, duracion_ms)
+    VALUES (:vista, now() AT TIME ZONE 'utc', :cambios, :duracion_ms)
+    ON CONFLICT (vista) DO UPDATE
+    SET actualizado = EXCLUDED.actualizado, cambios = EXCLUDED.cambios, duracion_ms = EXCLUDED.duracion_ms
+""")
+
+
+class Reportes:
+    """Actualización periódica de las vistas de reportes"""
+
+    def __init__(self):
+        self.interval = 300
+        self.logger = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.interval = app.config.get('REPORTES_REFRESH_SECONDS', self.interval)
+        self.logger = app.logger
+        if self.interval > 0:
+            app.before_request(self._ensure_scheduler)
+
+    def _ensure_scheduler(self):
+        # Un hilo por proceso, creado después del fork de gunicorn (con preload_app
+        # el maestro nunca atiende peticiones)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='reportes', daemon=True).start()
+
+    def _run(self):
+        while True:
+            # Variación para que los workers no compitan por el lock en el mismo instante
+            time.sleep(self.interval * random.uniform(0.9, 1.1))
+            try:
+                self.refresh()
+            except Exception:
+                self.logger.exception('No se pudieron actualizar las vistas de reportes')
+
+    def refresh(self, force=False):
+        """REFRESH CONCURRENTLY de las vistas cuya tabla cambió; devuelve las que se actualizaron
+
+        Devuelve None si otro proceso ya está actualizando.
+        """
+        refreshed = []
+        with database.get_engine().connect() as conn:
+            conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+            if not conn.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': _LOCK_KEY}).scalar():
+                return None
+            try:
+                conn.execute(text('SET statement_timeout = 0'))
+                for vista, tabla in VISTAS.items():
+                    cambios = conn.execute(_CAMBIOS, {'tabla': tabla}).scalar() or 0
+                    if not force and conn.execute(_ESTADO, {'vista': vista}).scalar() == cambios:
+                        continue
+                    inicio = time.perf_counter()
+                    conn.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {vista}'))
+                    duracion_ms = int((time.perf_counter() - inicio) * 1000)
+                    conn.execute(_GUARDAR, {'vista': vista, 'cambios': cambios, 'duracion_ms': duracion_ms})
+                    refreshed.append({'vista': vista, 'duracion_ms': duracion_ms})
+                if refreshed:
+                    # Avisar a los demás procesos; la caché de este se invalida abajo
+                    eventos.invalidate_cache(conn, 'reportes')
+            finally:
+                conn.execute(text('RESET statement_timeout'))
+                conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': _LOCK_KEY})
+
+        if refreshed:
+            cache.invalidate('reportes')
+            self.logger.info('Reportes actualizados: %s', ', '.join(
+                f"{r['vista']} ({r['duracion_ms']}ms)" for r in refreshed))
+        return refreshed
+
+    def status(self, db):
+        """Última actualización de cada vista"""
+        rows = db.execute(text('SELECT vista, actualizado, duracion_ms FROM reportes_estado')).all()
+        estado = {vista: (actualizado, duracion_ms) for vista, actualizado, duracion_ms in rows}
+        return [{
+            'vista': vista,
+            'actualizado': estado[vista][0].isoformat() if vista in estado else None,
+            'duracion_ms': estado[vista][1] if vista in estado else None,
+        } for vista in VISTAS]
+
+
+# Instancia compartida; se configura con reportes.init_app(app)
+reportes = Reportes()
@@ -0,0 +1,158 @@
+# Serializadores declarativos por modelo
+#
+# Cada modelo declara una sola vez sus campos públicos. Para cada combinación
+# de campos se compila (y se guarda) la lista de conversiones necesarias, así
+# que convertir una fila es un zip sobre la tupla que devuelve la consulta,
+# sin instanciar objetos del ORM. Si orjson está instalado, jsonify lo usa y
+# las fechas se dejan tal cual porque orjson las codifica de forma nativa.
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, DateTime, Numeric, select
+
+from models import Alumno, Profesor, Institucion
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+# True cuando el proveedor JSON de la app codifica fechas por su cuenta
+_native_dates = False
+
+
+def _isoformat(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def _decimal(valor):
+    return str(valor) if valor is not None else None
+
+
+def _default(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f'Tipo no serializable: {type(valor).__name__}')
+
+
+class Serializer:
+    """Campos públicos de un modelo y su conversión de tuplas a diccionarios"""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self._converters = {}
+        for name in self.fields:
+            column_type = model.__table__.columns[name].type
+            if isinstance(column_type, (DateTime, Date)):
+                self._converters[name] = _isoformat
+            elif isinstance(column_type, Numeric):
+                self._converters[name] = _decimal
+        self._compiled = {}
+
+    def columns(self, fields=None):
+        """Columnas para db.query(*columnas) en el orden de los campos"""
+        return [getattr(self.model, f) for f in (fields or self.fields)]
+
+    def _compile(self, fields):
+        key = (fields, _native_dates)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            if _native_dates:
+                compiled = ()
+            else:
+                compiled = tuple((i, self._converters[f]) for i, f in enumerate(fields)
+                                 if f in self._converters)
+            self._compiled[key] = compiled
+        return compiled
+
+    def rows(self, rows, fields=None):
+        """Lista de diccionarios a partir de tuplas de columnas"""
+        fields = tuple(fields or self.fields)
+        conversions = self._compile(fields)
+        if not conversions:
+            return [dict(zip(fields, row)) for row in rows]
+
+        items = []
+        for row in rows:
+            values = list(row)
+            for i, convert in conversions:
+                values[i] = convert(values[i])
+            items.append(dict(zip(fields, values)))
+        return items
+
+    def row(self, row, fields=None):
+        """Diccionario a partir de una sola tupla (None si la fila no existe)"""
+        return self.rows((row,), fields)[0] if row is not None else None
+
+    def statement(self, record_id, fields=None):
+        """SELECT de un registro por id con las columnas del serializador"""
+        return select(*self.columns(fields)).where(self.model.id == record_id)
+
+    def get(self, db, record_id, fields=None):
+        """Leer un registro por id como diccionario, sin cargar el objeto del ORM"""
+        row = db.execute(self.statement(record_id, fields)).first()
+        return self.row(row, fields)
+
+
+_registry = {}
+
+
+def register(model, fields):
+    """Declarar el serializador de un modelo"""
+    _registry[model] = Serializer(model, fields)
+    return _registry[model]
+
+
+def serializer_for(model):
+    return _registry[model]
+
+
+def dumps(obj):
+    """JSON en bytes fuera de Flask (modo async): orjson si está instalado"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False).encode('utf-8')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify con orjson: codifica fechas de forma nativa y devuelve bytes directamente"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype,
+        )
+
+
+def init_app(app):
+    """Usar orjson en jsonify si está instalado y habilitado (JSON_FAST_ENCODER)"""
+    global _native_dates
+    if orjson is not None and app.config.get('JSON_FAST_ENCODER', True):
+        app.json = OrjsonProvider(app)
+        _native_dates = True
+    else:
+        app.json = DefaultJSONProvider(app)
+        _native_dates = False
+
+
+def init_async(config):
+    """Mismo criterio que init_app para la app ASGI, que responde con dumps()"""
+    global _native_dates
+    _native_dates = orjson is not None and config.get('JSON_FAST_ENCODER', True)
+
+
+# Definiciones por modelo (campos públicos, en el orden de la respuesta)
+register(Alumno, ('id', 'nombre', 'apellido', 'email', 'semestre', 'carrera', 'periodo', 'institucion_id',
+                  'fecha_creacion', 'version'))
+register(Profesor, ('id', 'nombre', 'apellido', 'email', 'especialidad', 'departamento', 'telefono',
+                    'institucion_id', 'fecha_creacion', 'version'))
+register(Institucion, ('id', 'nombre', 'direccion', 'telefono', 'email', 'fecha_creacion', 'version'))
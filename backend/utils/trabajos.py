@@ -0,0 +1,526 @@
+# Cola de trabajos en segundo plano sobre Postgres
+#
+# Las operaciones lentas (importaciones, exportaciones, reportes, rehash) se
+# encolan como filas de la tabla trabajos (migración 0007) y las ejecuta un
+# proceso aparte, "flask worker", en lugar de ocupar un hilo del servidor y
+# una conexión durante minutos. No hay broker: cada hilo del worker toma el
+# siguiente pendiente con UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP
+# LOCKED), así varios workers comparten la cola sin tomar dos veces el mismo
+# trabajo y sin esperarse entre sí. Encolar hace pg_notify para que el worker
+# despierte de inmediato (si la notificación se pierde, sondea cada
+# TRABAJOS_POLL_SECONDS).
+#
+# Un trabajo que falla vuelve a la cola con espera exponencial hasta
+# max_intentos; el worker actualiza el latido de los suyos y los que dejan de
+# latir (worker caído) se reencolan. Los archivos de entrada y de salida se
+# guardan en trabajos_datos en partes de 1 MB y se leen por partes.
+from datetime import datetime
+import io
+import json
+import os
+import random
+import select
+import signal
+import socket
+import threading
+import time
+
+from flask import jsonify
+from sqlalchemy import text
+
+import database
+
+ESTADOS = ('pendiente', 'en_curso', 'terminado', 'fallido', 'cancelado')
+
+# Canal de pg_notify que escucha el worker
+CANAL = 'trabajos'
+
+# Tamaño de cada parte de los archivos de entrada y salida
+PART_SIZE = 1024 * 1024
+
+# Segundos mínimos entre dos escrituras de progreso del mismo trabajo
+_PROGRESS_INTERVAL = 1.0
+
+_AHORA = "(now() AT TIME ZONE 'utc')"
+
+_ENCOLAR = text("""
+    INSERT INTO trabajos (tipo, parametros, max_intentos)
+    VALUES (:tipo, CAST(:parametros AS jsonb), :max_intentos)
+    RETURNING id
+""")
+_TOMAR = text(f"""
+    UPDATE trabajos
+    SET estado = 'en_curso', intentos = intentos + 1, worker = :worker,
+        iniciado = {_AHORA}, latido = {_AHORA}, progreso = NULL
+    WHERE id = (
+        SELECT id FROM trabajos
+        WHERE estado = 'pendiente' AND disponible_en <= {_AHORA} AND tipo = ANY(:tipos)
+        ORDER BY disponible_en, id
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING id, tipo, parametros, intentos, max_intentos
+""")
+_PROGRESO = text(f"""
+    UPDATE trabajos SET progreso = CAST(:progreso AS jsonb), latido = {_AHORA}
+    WHERE id = :id AND worker = :worker AND estado = 'en_curso'
+    RETURNING id
+""")
+_TERMINAR = text(f"""
+    UPDATE trabajos
+    SET estado = 'terminado', resultado = CAST(:resultado AS jsonb), error = NULL,
+        terminado = {_AHORA}, latido = {_AHORA}
+    WHERE id = :id AND worker = :worker AND estado = 'en_curso'
+""")
+_FALLAR = text(f"""
+    UPDATE trabajos
+    SET estado = CASE WHEN intentos < max_intentos THEN 'pendiente' ELSE 'fallido' END,
+        error = :error,
+        disponible_en = {_AHORA} + make_interval(secs => :espera),
+        terminado = CASE WHEN intentos < max_intentos THEN NULL ELSE {_AHORA} END
+    WHERE id = :id AND worker = :worker AND estado = 'en_curso'
+    RETURNING estado
+""")
+_LATIDO = text(f"""
+    UPDATE trabajos SET latido = {_AHORA}
+    WHERE id = ANY(:ids) AND estado = 'en_curso'
+""")
+_ABANDONADOS = text(f"""
+    UPDATE trabajos
+    SET estado = CASE WHEN intentos < max_intentos THEN 'pendiente' ELSE 'fallido' END,
+        error = 'El worker dejó de responder',
+        disponible_en = {_AHORA},
+        terminado = CASE WHEN intentos < max_intentos THEN NULL ELSE {_AHORA} END
+    WHERE estado = 'en_curso' AND latido < {_AHORA} - make_interval(secs => :segundos)
+    RETURNING id
+""")
+_LIMPIAR = text(f"""
+    DELETE FROM trabajos
+    WHERE estado IN ('terminado', 'fallido', 'cancelado')
+      AND terminado < {_AHORA} - make_interval(days => :dias)
+""")
+_CANCELAR = text(f"""
+    UPDATE trabajos SET estado = 'cancelado', terminado = {_AHORA}
+    WHERE id = :id AND estado IN ('pendiente', 'en_curso')
+    RETURNING id
+""")
+_COLUMNAS = ('id', 'tipo', 'estado', 'parametros', 'progreso', 'resultado', 'error', 'intentos',
+             'max_intentos', 'creado', 'disponible_en', 'iniciado', 'terminado')
+_CONSULTAR = text(f"SELECT {', '.join(_COLUMNAS)} FROM trabajos WHERE id = :id")
+_PARTE = text('SELECT datos FROM trabajos_datos WHERE trabajo_id = :id AND tipo = :tipo AND parte = :parte')
+_GUARDAR_PARTE = text('INSERT INTO trabajos_datos (trabajo_id, tipo, parte, datos) VALUES (:id, :tipo, :parte, :datos)')
+_BORRAR_PARTES = text('DELETE FROM trabajos_datos WHERE trabajo_id = :id AND tipo = :tipo')
+
+
+class TrabajoCancelado(Exception):
+    """El trabajo se canceló (o se reasignó) mientras corría"""
+
+
+def _json_default(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f'Tipo no serializable: {type(valor).__name__}')
+
+
+def _dumps(valor):
+    return json.dumps(valor, default=_json_default, ensure_ascii=False)
+
+
+def as_dict(row):
+    """Fila de trabajos como diccionario para la API"""
+    item = dict(zip(_COLUMNAS, row))
+    for campo in ('creado', 'disponible_en', 'iniciado', 'terminado'):
+        if item[campo] is not None:
+            item[campo] = item[campo].isoformat()
+    return item
+
+
+def accepted_response(trabajo):
+    """Respuesta 202 con la ubicación del trabajo encolado"""
+    response = jsonify(trabajo)
+    response.status_code = 202
+    response.headers['Location'] = f"/trabajos/{trabajo['id']}"
+    return response
+
+
+def store_parts(conn, trabajo_id, tipo, stream):
+    """Guardar un archivo por partes de PART_SIZE sin leerlo completo; devuelve los bytes guardados"""
+    total = 0
+    parte = 0
+    while True:
+        datos = stream.read(PART_SIZE)
+        if not datos:
+            return total
+        conn.execute(_GUARDAR_PARTE, {'id': trabajo_id, 'tipo': tipo, 'parte': parte, 'datos': datos})
+        total += len(datos)
+        parte += 1
+
+
+def iter_parts(trabajo_id, tipo):
+    """Partes de un archivo guardado, leídas una por una"""
+    parte = 0
+    with database.get_engine().connect() as conn:
+        while True:
+            datos = conn.execute(_PARTE, {'id': trabajo_id, 'tipo': tipo, 'parte': parte}).scalar()
+            if datos is None:
+                return
+            yield bytes(datos)
+            parte += 1
+
+
+class _PartsReader(io.RawIOBase):
+    """Archivo de solo lectura sobre las partes guardadas (para Importer.run)"""
+
+    def __init__(self, trabajo_id, tipo):
+        self._parts = iter_parts(trabajo_id, tipo)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            self._buffer = next(self._parts, None)
+            if self._buffer is None:
+                self._buffer = b''
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self):
+        self._parts.close()
+        super().close()
+
+
+class _PartsWriter:
+    """Escribe la salida de un trabajo en partes de PART_SIZE"""
+
+    def __init__(self, trabajo_id, tipo='salida'):
+        self.trabajo_id = trabajo_id
+        self.tipo = tipo
+        self.size = 0
+        self._parte = 0
+        self._buffer = bytearray()
+        # Un reintento empieza el archivo desde cero
+        with database.get_engine().begin() as conn:
+            conn.execute(_BORRAR_PARTES, {'id': trabajo_id, 'tipo': tipo})
+
+    def write(self, datos):
+        if isinstance(datos, str):
+            datos = datos.encode('utf-8')
+        self._buffer += datos
+        self.size += len(datos)
+        while len(self._buffer) >= PART_SIZE:
+            self._flush(bytes(self._buffer[:PART_SIZE]))
+            del self._buffer[:PART_SIZE]
+
+    def close(self):
+        if self._buffer:
+            self._flush(bytes(self._buffer))
+            self._buffer = bytearray()
+
+    def _flush(self, datos):
+        with database.get_engine().begin() as conn:
+            conn.execute(_GUARDAR_PARTE, {'id': self.trabajo_id, 'tipo': self.tipo,
+                                          'parte': self._parte, 'datos': datos})
+        self._parte += 1
+
+
+class Trabajo:
+    """Trabajo en curso tal como lo recibe su función"""
+
+    def __init__(self, trabajo_id, tipo, parametros, intento, worker):
+        self.id = trabajo_id
+        self.tipo = tipo
+        self.parametros = parametros
+        self.intento = intento
+        self.worker = worker
+        self._last_progress = 0.0
+
+    def progress(self, force=False, **contadores):
+        """Publicar el avance (como mucho una vez por segundo); lanza TrabajoCancelado si se canceló"""
+        now = time.monotonic()
+        if not force and now - self._last_progress < _PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        with database.get_engine().begin() as conn:
+            vigente = conn.execute(_PROGRESO, {'id': self.id, 'worker': self.worker,
+                                               'progreso': _dumps(contadores)}).scalar()
+        if vigente is None:
+            raise TrabajoCancelado()
+
+    def input(self):
+        """Archivo de entrada guardado al encolar (binario, se lee por partes)"""
+        return io.BufferedReader(_PartsReader(self.id, 'entrada'), buffer_size=PART_SIZE)
+
+    def output(self):
+        """Archivo de salida; se descarga con GET /trabajos/<id>/resultado"""
+        return _PartsWriter(self.id)
+
+
+class Trabajos:
+    """Registro de tipos de trabajo, cola en Postgres y el worker que la consume"""
+
+    def __init__(self):
+        self.handlers = {}
+        self.max_attempts = 3
+        self.backoff = 10
+        self.backoff_max = 600
+        self.poll = 5
+        self.heartbeat = 15
+        self.abandoned = 120
+        self.retention_days = 7
+        self.logger = None
+        self._wakeup = threading.Condition()
+        self._running = {}  # id -> worker, trabajos que corren en este proceso
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        self.max_attempts = app.config.get('TRABAJOS_MAX_INTENTOS', self.max_attempts)
+        self.backoff = app.config.get('TRABAJOS_BACKOFF_SEGUNDOS', self.backoff)
+        self.backoff_max = app.config.get('TRABAJOS_BACKOFF_MAX', self.backoff_max)
+        self.poll = app.config.get('TRABAJOS_POLL_SECONDS', self.poll)
+        self.heartbeat = app.config.get('TRABAJOS_LATIDO_SEGUNDOS', self.heartbeat)
+        self.abandoned = app.config.get('TRABAJOS_ABANDONO_SEGUNDOS', self.abandoned)
+        self.retention_days = app.config.get('TRABAJOS_RETENCION_DIAS', self.retention_days)
+        self.logger = app.logger
+
+    def register(self, tipo, validate=None, admin=False, max_attempts=None):
+        """Decorador: fn(trabajo) -> resultado (dict serializable a JSON)
+
+        validate(parametros) devuelve los parámetros limpios o lanza ValueError
+        (se llama al encolar); admin exige X-Admin-Token para encolarlo por la API.
+        """
+        def decorator(fn):
+            self.handlers[tipo] = {'fn': fn, 'validate': validate, 'admin': admin,
+                                   'max_attempts': max_attempts}
+            return fn
+        return decorator
+
+    # --- Encolar y consultar (servidor web) ---
+
+    def enqueue(self, tipo, parametros=None, max_attempts=None, input_stream=None):
+        """Encolar un trabajo (con su archivo de entrada) y avisar a los workers; devuelve su fila"""
+        handler = self.handlers[tipo]
+        parametros = parametros or {}
+        if handler['validate'] is not None:
+            parametros = handler['validate'](parametros)
+        attempts = max_attempts or handler['max_attempts'] or self.max_attempts
+
+        with database.get_engine().begin() as conn:
+            trabajo_id = conn.execute(_ENCOLAR, {'tipo': tipo, 'parametros': _dumps(parametros),
+                                                 'max_intentos': attempts}).scalar()
+            if input_stream is not None:
+                store_parts(conn, trabajo_id, 'entrada', input_stream)
+            # Se entrega al confirmar la transacción
+            conn.execute(text('SELECT pg_notify(:canal, :tipo)'), {'canal': CANAL, 'tipo': tipo})
+            return as_dict(conn.execute(_CONSULTAR, {'id': trabajo_id}).one())
+
+    def get(self, db, trabajo_id):
+        row = db.execute(_CONSULTAR, {'id': trabajo_id}).first()
+        return as_dict(row) if row is not None else None
+
+    def recent(self, db, estado=None, tipo=None, limit=50):
+        """Trabajos más recientes primero, opcionalmente por estado y tipo"""
+        sql = f"SELECT {', '.join(_COLUMNAS)} FROM trabajos WHERE true"
+        params = {'limit': limit}
+        if estado:
+            sql += ' AND estado = :estado'
+            params['estado'] = estado
+        if tipo:
+            sql += ' AND tipo = :tipo'
+            params['tipo'] = tipo
+        sql += ' ORDER BY id DESC LIMIT :limit'
+        return [as_dict(row) for row in db.execute(text(sql), params)]
+
+    def cancel(self, db, trabajo_id):
+        """Cancelar un trabajo pendiente o en curso (el que corre se detiene en su siguiente avance)"""
+        cancelled = db.execute(_CANCELAR, {'id': trabajo_id}).scalar()
+        db.commit()
+        return cancelled is not None
+
+    # --- Worker ---
+
+    def backoff_seconds(self, intento):
+        """Espera antes del siguiente intento: exponencial con variación, hasta backoff_max"""
+        espera = min(self.backoff_max, self.backoff * 2 ** (intento - 1))
+        return espera * random.uniform(0.5, 1.0)
+
+    def claim(self, worker, tipos):
+        """Tomar el siguiente trabajo pendiente (transacción corta) o None"""
+        with database.get_engine().begin() as conn:
+            row = conn.execute(_TOMAR, {'worker': worker, 'tipos': list(tipos)}).first()
+        if row is None:
+            return None
+        return Trabajo(row.id, row.tipo, row.parametros, row.intentos, worker)
+
+    def execute(self, trabajo):
+        """Correr un trabajo tomado y registrar su resultado, reintento o fallo"""
+        params = {'id': trabajo.id, 'worker': trabajo.worker}
+        self._running[trabajo.id] = trabajo.worker
+        inicio = time.perf_counter()
+        try:
+            resultado = self.handlers[trabajo.tipo]['fn'](trabajo)
+        except TrabajoCancelado:
+            self.logger.info('Trabajo %s (%s) cancelado', trabajo.id, trabajo.tipo)
+            return 'cancelado'
+        except Exception as e:
+            self.logger.exception('Trabajo %s (%s) falló en el intento %s', trabajo.id, trabajo.tipo, trabajo.intento)
+            with database.get_engine().begin() as conn:
+                estado = conn.execute(_FALLAR, dict(params, error=f'{type(e).__name__}: {e}',
+                                                    espera=self.backoff_seconds(trabajo.intento))).scalar()
+            return estado
+        finally:
+            self._running.pop(trabajo.id, None)
+
+        with database.get_engine().begin() as conn:
+            conn.execute(_TERMINAR, dict(params, resultado=_dumps(resultado)))
+        self.logger.info('Trabajo %s (%s) terminado en %.1fs', trabajo.id, trabajo.tipo,
+                         time.perf_counter() - inicio)
+        return 'terminado'
+
+    def run_worker(self, app, concurrency=2, tipos=None, once=False):
+        """Consumir la cola con `concurrency` hilos hasta SIGTERM/SIGINT (o hasta vaciarla si once)"""
+        tipos = tuple(tipos or self.handlers)
+        nombre = f'{socket.gethostname()}:{os.getpid()}'
+        self._stop.clear()
+
+        def parar(signum, frame):
+            self.logger.info('Worker %s: terminando los trabajos en curso', nombre)
+            self._stop.set()
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, parar)
+            signal.signal(signal.SIGINT, parar)
+
+        def consumir(n):
+            worker = f'{nombre}:{n}'
+            with app.app_context():
+                while not self._stop.is_set():
+                    try:
+                        trabajo = self.claim(worker, tipos)
+                    except Exception:
+                        self.logger.exception('Worker %s: no se pudo consultar la cola', worker)
+                        trabajo = None
+                    if trabajo is not None:
+                        self.execute(trabajo)
+                        continue
+                    if once:
+                        return
+                    with self._wakeup:
+                        self._wakeup.wait(self.poll)
+
+        hilos = [threading.Thread(target=consumir, args=(n,), name=f'trabajos-{n}') for n in range(concurrency)]
+        for hilo in hilos:
+            hilo.start()
+        self.logger.info('Worker %s: %d hilos para %s', nombre, concurrency, ', '.join(tipos))
+
+        if once:
+            for hilo in hilos:
+                hilo.join()
+            return
+        try:
+            self._supervise(hilos)
+        finally:
+            self._stop.set()
+            with self._wakeup:
+                self._wakeup.notify_all()
+            for hilo in hilos:
+                hilo.join()
+
+    def _supervise(self, hilos):
+        # Hilo principal: escucha pg_notify, late por los trabajos en curso,
+        # reencola los abandonados por otros workers y borra los viejos. Si la
+        # conexión con LISTEN se cae (reinicio de Postgres, failover) se reabre
+        # con espera creciente; mientras tanto los hilos siguen revisando la
+        # cola cada TRABAJOS_POLL_SECONDS y el latido sigue corriendo.
+        conn = None
+        espera = 1
+        reintento = 0.0
+        ultimo_latido = ultima_limpieza = 0.0
+        try:
+            while not self._stop.is_set() and any(h.is_alive() for h in hilos):
+                timeout = min(self.heartbeat, self.poll)
+                if conn is None and time.monotonic() >= reintento:
+                    try:
+                        conn = self._listen_connection()
+                        espera = 1
+                        # Lo encolado mientras no se escuchaba no avisó a nadie
+                        with self._wakeup:
+                            self._wakeup.notify_all()
+                    except Exception:
+                        self.logger.exception('No se pudo abrir la conexión LISTEN de trabajos')
+                        reintento = time.monotonic() + espera
+                        espera = min(espera * 2, 30)
+
+                if conn is None:
+                    self._stop.wait(min(timeout, max(reintento - time.monotonic(), 0.1)))
+                else:
+                    try:
+                        if select.select([conn], [], [], timeout)[0]:
+                            conn.poll()
+                            if conn.notifies:
+                                conn.notifies.clear()
+                                with self._wakeup:
+                                    self._wakeup.notify_all()
+                    except Exception:
+                        self.logger.exception('Se perdió la conexión LISTEN de trabajos; reconectando')
+                        self._close_listen(conn)
+                        conn = None
+                        reintento = time.monotonic() + espera
+                        espera = min(espera * 2, 30)
+
+                now = time.monotonic()
+                if now - ultimo_latido >= self.heartbeat:
+                    ultimo_latido = now
+                    limpiar = now - ultima_limpieza >= 3600
+                    if limpiar:
+                        ultima_limpieza = now
+                    self._maintenance(limpiar)
+        finally:
+            if conn is not None:
+                self._close_listen(conn)
+
+    def _listen_connection(self):
+        raw = database.get_engine().raw_connection()
+        conn = raw.driver_connection
+        # Fuera del pool: con autocommit y LISTEN activo no debe reutilizarla nadie más
+        raw.detach()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {CANAL}')
+        except Exception:
+            self._close_listen(conn)
+            raise
+        return conn
+
+    @staticmethod
+    def _close_listen(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _maintenance(self, cleanup):
+        try:
+            with database.get_engine().begin() as conn:
+                if self._running:
+                    conn.execute(_LATIDO, {'ids': list(self._running)})
+                requeued = conn.execute(_ABANDONADOS, {'segundos': self.abandoned}).scalars().all()
+                if cleanup:
+                    conn.execute(_LIMPIAR, {'dias': self.retention_days})
+            if requeued:
+                self.logger.warning('Trabajos abandonados por un worker caído: %s', requeued)
+                with self._wakeup:
+                    self._wakeup.notify_all()
+        except Exception:
+            self.logger.exception('No se pudo actualizar el latido de los trabajos')
+
+
+# Instancia compartida; se configura con trabajos.init_app(app)
+trabajos = Trabajos()
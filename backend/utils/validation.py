@@ -0,0 +1,50 @@
+# Validación de registros contra las restricciones de las columnas del modelo
+from sqlalchemy import Integer, String
+
+
+def validate_record(model, data, fields, partial=False):
+    """Validar un dict contra las columnas indicadas del modelo
+
+    Revisa obligatorios (nullable=False), tipo entero y longitud máxima de
+    texto. Con partial=True solo se validan los campos presentes (PATCH).
+    Devuelve (valores_limpios, errores).
+    """
+    if not isinstance(data, dict):
+        return {}, ['El registro debe ser un objeto JSON']
+
+    clean = {}
+    errors = []
+    columns = model.__table__.columns
+
+    for field in fields:
+        column = columns[field]
+        valor = data.get(field)
+
+        if valor is None or valor == '':
+            if field in data and partial and not column.nullable:
+                errors.append(f'{field} no puede estar vacío')
+            elif not partial and not column.nullable:
+                errors.append(f'{field} es requerido')
+            elif field in data:
+                clean[field] = None
+            continue
+
+        if isinstance(column.type, Integer):
+            if isinstance(valor, bool):
+                errors.append(f'{field} debe ser un número entero')
+                continue
+            try:
+                valor = int(valor)
+            except (TypeError, ValueError):
+                errors.append(f'{field} debe ser un número entero')
+                continue
+        elif isinstance(column.type, String):
+            if not isinstance(valor, str):
+                valor = str(valor)
+            if column.type.length and len(valor) > column.type.length:
+                errors.append(f'{field} excede {column.type.length} caracteres')
+                continue
+
+        clean[field] = valor
+
+    return clean, errors
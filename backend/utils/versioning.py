@@ -0,0 +1,104 @@
+# Concurrencia optimista: columna version, If-Match y escrituras en una sola sentencia
+#
+# Cada registro lleva un número de versión que sube en cada UPDATE. El detalle
+# lo publica en el ETag ("<versión>-<resumen del cuerpo>") y PUT/PATCH/DELETE
+# aceptan If-Match con ese ETag o solo con la versión. La escritura es un
+# UPDATE/DELETE ... WHERE id = :id [AND version = :v] RETURNING, sin leer la
+# fila antes; solo si no afectó filas se consulta la versión actual para
+# distinguir 404 (no existe) de 409 (la cambió otra petición). La escritura
+# publica su evento (utils/eventos.py) en la misma transacción.
+import hashlib
+
+from flask import jsonify
+from sqlalchemy import delete, select, update
+
+from utils.eventos import eventos
+
+
+def parse_if_match(header):
+    """Versión esperada según If-Match (None si no viene o es *); ValueError si no es una versión"""
+    if not header or header.strip() == '*':
+        return None
+    value = header.strip()
+    if ',' in value:
+        raise ValueError('If-Match admite una sola versión')
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"').split('-', 1)[0])
+    except ValueError:
+        raise ValueError('If-Match no corresponde a una versión del registro')
+
+
+def versioned_etag(version, body):
+    """ETag del detalle: la versión (para If-Match) y un resumen del cuerpo (para If-None-Match)"""
+    return f'{version}-{hashlib.sha1(body).hexdigest()[:16]}'
+
+
+# El detalle no pasa por la caché de respuestas ni por la de nginx: con la caché
+# por proceso, un worker que no hizo la escritura seguiría publicando la versión
+# anterior y un GET seguido de PATCH con If-Match recibiría 409 hasta el TTL.
+# Leerlo es un SELECT por llave primaria; el navegador revalida con el ETag.
+DETAIL_CACHE_CONTROL = 'no-cache'
+
+
+def versioned_response(item, request):
+    """Respuesta del detalle con ETag de versión, sin caché compartida y con 304 si no cambió"""
+    response = jsonify(item)
+    response.set_etag(versioned_etag(item['version'], response.get_data()))
+    response.headers['Cache-Control'] = DETAIL_CACHE_CONTROL
+    return response.make_conditional(request)
+
+
+def update_statement(model, record_id, values, expected_version=None):
+    """UPDATE solo de los campos dados que sube la versión y la devuelve"""
+    stmt = update(model).where(model.id == record_id).values(**values, version=model.version + 1)
+    if expected_version is not None:
+        stmt = stmt.where(model.version == expected_version)
+    return stmt.returning(model.version)
+
+
+def delete_statement(model, record_id, expected_version=None):
+    """DELETE por id (y versión esperada) que devuelve el id borrado"""
+    stmt = delete(model).where(model.id == record_id)
+    if expected_version is not None:
+        stmt = stmt.where(model.version == expected_version)
+    return stmt.returning(model.id)
+
+
+def version_statement(model, record_id):
+    """Versión actual de un registro (solo cuando la escritura no afectó filas)"""
+    return select(model.version).where(model.id == record_id)
+
+
+def write_failure(current_version, not_found):
+    """Cuerpo y código HTTP cuando el UPDATE/DELETE no afectó ninguna fila"""
+    if current_version is None:
+        return {'error': not_found}, 404
+    return {
+        'error': (f'El registro cambió desde que se leyó (versión actual {current_version}); '
+                  f'vuelve a leerlo antes de escribir'),
+        'version': current_version,
+    }, 409
+
+
+def apply_update(db, model, record_id, values, expected_version=None):
+    """Ejecutar update_statement y confirmar: (versión nueva, None) o (None, versión actual)"""
+    version = db.execute(update_statement(model, record_id, values, expected_version)).scalar()
+    if version is not None:
+        eventos.publish(db, model.__tablename__, 'actualizado', [record_id], version=version)
+        db.commit()
+        return version, None
+    db.rollback()
+    return None, db.execute(version_statement(model, record_id)).scalar()
+
+
+def apply_delete(db, model, record_id, expected_version=None):
+    """Ejecutar delete_statement y confirmar: (True, None) o (False, versión actual)"""
+    deleted = db.execute(delete_statement(model, record_id, expected_version)).scalar()
+    if deleted is not None:
+        eventos.publish(db, model.__tablename__, 'eliminado', [record_id])
+        db.commit()
+        return True, None
+    db.rollback()
+    return False, db.execute(version_statement(model, record_id)).scalar()
@@ -1,22 +1,48 @@
 // Gestión de Alumnos JavaScript
 let usersData = [];
 let editingUserId = null;
+let usersNextCursor = null;
+
+// Tamaño de página pedido al backend (el servidor aplica su propio máximo)
+const USERS_PAGE_SIZE = 100;
 
 document.addEventListener('DOMContentLoaded', async function() {
     await loadUsers();
     setupEventListeners();
 });
 
-async function loadUsers() {
+// cacheMode 'reload' salta la caché del navegador y la del proxy (después de escribir)
+async function loadUsers(cacheMode = 'default') {
+    // Reiniciar la lista y cargar la primera página
+    usersData = [];
+    usersNextCursor = null;
+    await loadUsersPage(null, cacheMode);
+}
+
+async function loadMoreUsers() {
+    if (usersNextCursor === null) return;
+    await loadUsersPage(usersNextCursor);
+}
+
+async function loadUsersPage(cursor = null, cacheMode = 'default') {
     try {
         showLoading(true);
         
-        // Cargar alumnos desde la API
-        const response = await fetch('http://localhost:5000/alumnos');
+        // Cargar una página de alumnos desde la API
+        let url = `${API_BASE_URL}/alumnos?limit=${USERS_PAGE_SIZE}`;
+        if (cursor !== null) {
+            url += `&cursor=${cursor}`;
+        }
+        const response = await fetch(url, { cache: cacheMode });
         if (response.ok) {
-            usersData = await response.json();
+            const page = await response.json();
+            usersData = usersData.concat(page.items);
+            usersNextCursor = page.next_cursor;
             renderUsersTable();
-            updateStats();
+            updateLoadMoreButton();
+            if (cursor === null) {
+                updateStats(cacheMode);
+            }
         } else {
             window.app.showNotification('Error cargando alumnos', 'danger');
         }
@@ -28,6 +54,12 @@ async function loadUsers() {
     }
 }
 
+function updateLoadMoreButton() {
+    const button = document.getElementById('loadMoreUsers');
+    if (!button) return;
+    button.classList.toggle('d-none', usersNextCursor === null);
+}
+
 function renderUsersTable() {
     const tbody = document.querySelector('#usersTable tbody');
     if (!tbody) return;
@@ -66,11 +98,18 @@ function renderUsersTable() {
     `).join('');
 }
 
-function updateStats() {
-    document.getElementById('total-users').textContent = usersData.length;
-    document.getElementById('active-users').textContent = usersData.length; // Todos activos por ahora
-    document.getElementById('total-careers').textContent = 
-        [...new Set(usersData.map(u => u.carrera))].length;
+async function updateStats(cacheMode = 'default') {
+    // Totales reales desde /stats (la tabla solo tiene las páginas cargadas)
+    try {
+        const response = await fetch(`${API_BASE_URL}/stats`, { cache: cacheMode });
+        if (!response.ok) return;
+        const stats = await response.json();
+        document.getElementById('total-users').textContent = stats.totales.alumnos;
+        document.getElementById('active-users').textContent = stats.totales.alumnos; // Todos activos por ahora
+        document.getElementById('total-careers').textContent = stats.alumnos_por_carrera.length;
+    } catch (error) {
+        console.error('Error cargando estadísticas:', error);
+    }
 }
 
 function formatDate(dateStr) {
@@ -161,7 +200,7 @@ async function handleUserSubmit(e) {
         let response;
         if (editingUserId) {
             // Actualizar alumno existente
-            response = await fetch(`http://localhost:5000/alumnos/${editingUserId}`, {
+            response = await fetch(`${API_BASE_URL}/alumnos/${editingUserId}`, {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -170,7 +209,7 @@ async function handleUserSubmit(e) {
             });
         } else {
             // Crear nuevo alumno
-            response = await fetch('http://localhost:5000/alumnos', {
+            response = await fetch(`${API_BASE_URL}/alumnos`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -184,7 +223,7 @@ async function handleUserSubmit(e) {
                 editingUserId ? 'Alumno actualizado' : 'Alumno creado',
                 'success'
             );
-            await loadUsers(); // Recargar tabla
+            await loadUsers('reload'); // Recargar tabla
             bootstrap.Modal.getInstance(document.getElementById('userModal')).hide();
         } else {
             const error = await response.json();
@@ -202,13 +241,13 @@ async function deleteUser(userId) {
     if (!confirm('¿Estás seguro de eliminar este alumno?')) return;
     
     try {
-        const response = await fetch(`http://localhost:5000/alumnos/${userId}`, {
+        const response = await fetch(`${API_BASE_URL}/alumnos/${userId}`, {
             method: 'DELETE'
         });
         
         if (response.ok) {
             window.app.showNotification('Alumno eliminado', 'success');
-            await loadUsers(); // Recargar tabla
+            await loadUsers('reload'); // Recargar tabla
         } else {
             const error = await response.json();
             window.app.showNotification(error.error || 'Error eliminando alumno', 'danger');
@@ -294,7 +333,7 @@ function showLoading(show) {
 }
 
 function refreshUsers() {
-    loadUsers();
+    loadUsers('reload');
 }
 
 // Funciones globales para usar desde HTML
@@ -302,3 +341,4 @@ window.editUser = editUser;
 window.deleteUser = deleteUser;
 window.openNewUserModal = openNewUserModal;
 window.refreshUsers = refreshUsers;
+window.loadMoreUsers = loadMoreUsers;
@@ -1,11 +1,38 @@
 // Configuración de la aplicación
-const API_BASE_URL = 'http://localhost:5000'; // Cambiar por tu URL del backend
+// Por defecto la API pasa por el proxy /api/ de nginx (mismo origen: sin preflight de CORS).
+// Para un backend en otro origen, definir window.API_BASE_URL antes de cargar app.js.
+const API_BASE_URL = (window.API_BASE_URL || '/api').replace(/\/$/, '');
 
 // Token de autenticación (se guardará después del login)
 let authToken = null;
+let refreshToken = null;
+
+// Renovar el token de acceso con el de refresco (evita repetir /login cada hora)
+async function refreshAccessToken() {
+    if (!refreshToken) {
+        return false;
+    }
+    const response = await fetch(`${API_BASE_URL}/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+    });
+    if (!response.ok) {
+        return false;
+    }
+    saveTokens(await response.json());
+    return true;
+}
+
+function saveTokens(data) {
+    authToken = data.token;
+    refreshToken = data.refresh_token;
+    localStorage.setItem('authToken', authToken);
+    localStorage.setItem('refreshToken', refreshToken);
+}
 
 // Función para hacer peticiones HTTP
-async function apiRequest(endpoint, options = {}) {
+async function apiRequest(endpoint, options = {}, retried = false) {
     const url = `${API_BASE_URL}${endpoint}`;
     const config = {
         headers: {
@@ -22,6 +49,12 @@ async function apiRequest(endpoint, options = {}) {
 
     try {
         const response = await fetch(url, config);
+
+        // Token vencido: renovar una sola vez y repetir la petición
+        if (response.status === 401 && authToken && !retried && await refreshAccessToken()) {
+            return apiRequest(endpoint, options, true);
+        }
+
         const data = await response.json();
         
         if (!response.ok) {
@@ -63,20 +96,13 @@ function showNotification(message, type = 'info') {
 // Función para cargar estadísticas del dashboard
 async function loadDashboardStats() {
     try {
-        // Cargar datos en paralelo
-        const [alumnosData, profesoresData, institucionesData] = await Promise.all([
-            apiRequest('/alumnos').catch(() => ({ count: 0 })),
-            apiRequest('/profesores').catch(() => ({ count: 0 })),
-            apiRequest('/instituciones').catch(() => ({ count: 0 }))
-        ]);
+        // Conteos agregados en el backend (no se descargan las tablas completas)
+        const stats = await apiRequest('/stats');
 
         // Mostrar conteos
-        document.getElementById('alumnos-count').textContent = 
-            Array.isArray(alumnosData) ? alumnosData.length : alumnosData.count || 0;
-        document.getElementById('profesores-count').textContent = 
-            Array.isArray(profesoresData) ? profesoresData.length : profesoresData.count || 0;
-        document.getElementById('instituciones-count').textContent = 
-            Array.isArray(institucionesData) ? institucionesData.length : institucionesData.count || 0;
+        document.getElementById('alumnos-count').textContent = stats.totales.alumnos;
+        document.getElementById('profesores-count').textContent = stats.totales.profesores;
+        document.getElementById('instituciones-count').textContent = stats.totales.instituciones;
             
     } catch (error) {
         console.error('Error cargando estadísticas:', error);
@@ -91,8 +117,7 @@ async function login(email, password) {
             body: JSON.stringify({ email, password })
         });
         
-        authToken = response.token;
-        localStorage.setItem('authToken', authToken);
+        saveTokens(response);
         
         showNotification('Login exitoso', 'success');
         return response;
@@ -121,7 +146,9 @@ async function register(userData) {
 // Función para logout
 function logout() {
     authToken = null;
+    refreshToken = null;
     localStorage.removeItem('authToken');
+    localStorage.removeItem('refreshToken');
     window.location.href = 'index.html';
 }
 
@@ -130,6 +157,7 @@ function checkAuth() {
     const savedToken = localStorage.getItem('authToken');
     if (savedToken) {
         authToken = savedToken;
+        refreshToken = localStorage.getItem('refreshToken');
     }
 }
 
@@ -1,6 +1,8 @@
 // Dashboard específico JavaScript - Versión Minimalista
 let chartInstances = {};
 let currentTimelineType = 'users';
+let recentActivities = [];
+let eventSource = null;
 
 document.addEventListener('DOMContentLoaded', async function() {
     await initializeDashboard();
@@ -23,6 +25,9 @@ async function initializeDashboard() {
         // Generar gráfico temporal inicial
         await showTimelineChart('users');
         
+        // Cambios en vivo: los contadores se actualizan con cada evento, sin volver a pedir /stats
+        connectEvents();
+        
     } catch (error) {
         console.error('Error inicializando dashboard:', error);
         showErrorMessage('Error cargando estadísticas del dashboard');
@@ -31,26 +36,20 @@ async function initializeDashboard() {
 
 async function loadDashboardStats() {
     try {
-        // Cargar datos en paralelo con timeout
-        const promises = [
-            fetch('http://localhost:5000/alumnos').then(r => r.json()).catch(() => []),
-            fetch('http://localhost:5000/profesores').then(r => r.json()).catch(() => []),
-            fetch('http://localhost:5000/instituciones').then(r => r.json()).catch(() => [])
-        ];
-        
-        const [alumnosData, profesoresData, institucionesData] = await Promise.all(promises);
+        // Una sola petición con los conteos y distribuciones ya agregados en el backend
+        const response = await fetch(`${API_BASE_URL}/stats`);
+        if (!response.ok) {
+            throw new Error('Error cargando /stats');
+        }
+        const stats = await response.json();
         
         // Actualizar contadores con animación
-        animateCounter('alumnos-count', Array.isArray(alumnosData) ? alumnosData.length : 0);
-        animateCounter('profesores-count', Array.isArray(profesoresData) ? profesoresData.length : 0);
-        animateCounter('instituciones-count', Array.isArray(institucionesData) ? institucionesData.length : 0);
+        animateCounter('alumnos-count', stats.totales.alumnos);
+        animateCounter('profesores-count', stats.totales.profesores);
+        animateCounter('instituciones-count', stats.totales.instituciones);
         
         // Guardar datos para usar en gráficos
-        window.dashboardData = {
-            users: alumnosData,
-            teachers: profesoresData,
-            institutions: institucionesData
-        };
+        window.dashboardData = stats;
         
     } catch (error) {
         console.error('Error cargando estadísticas:', error);
@@ -73,23 +72,51 @@ function animateCounter(elementId, targetValue) {
     }, 200);
 }
 
+// Convierte la actividad [{fecha, total}] del backend en una serie diaria continua
+function dailySeries(actividad, days) {
+    const porFecha = {};
+    (actividad || []).forEach(item => {
+        porFecha[item.fecha] = item.total;
+    });
+    
+    const labels = [];
+    const values = [];
+    const today = new Date();
+    for (let i = days - 1; i >= 0; i--) {
+        const date = new Date(today);
+        date.setDate(date.getDate() - i);
+        const key = date.toISOString().slice(0, 10);
+        labels.push(date.toLocaleDateString('es-ES', { month: 'short', day: 'numeric' }));
+        values.push(porFecha[key] || 0);
+    }
+    return { labels, values };
+}
+
 function generateMiniCharts() {
-    // Generar gráficos mini simulados basados en datos aleatorios
-    const charts = ['alumnos-chart', 'profesores-chart', 'instituciones-chart'];
+    // Registros creados por día en la última semana
+    const charts = {
+        'alumnos-chart': 'alumnos',
+        'profesores-chart': 'profesores',
+        'instituciones-chart': 'instituciones'
+    };
+    const actividad = window.dashboardData ? window.dashboardData.actividad : {};
     
-    charts.forEach(chartId => {
+    Object.entries(charts).forEach(([chartId, key]) => {
         const container = document.getElementById(chartId);
         if (!container) return;
         
         container.innerHTML = '';
         
+        const week = dailySeries(actividad[key], 7).values;
+        const max = Math.max(...week, 1);
+        
         // Generar 7 barras para la semana
         for (let i = 0; i < 7; i++) {
             const bar = document.createElement('div');
             bar.className = 'mini-bar';
             
-            // Altura aleatoria entre 50% y 100%
-            const height = Math.random() * 50 + 50;
+            // Altura proporcional al día con más registros (mínimo visible 10%)
+            const height = Math.max(10, (week[i] / max) * 100);
             bar.style.height = height + '%';
             
             // Delayed animation effect
@@ -117,7 +144,7 @@ async function generateCareerChart() {
         chartInstances.careerChart.destroy();
     }
     
-    // Simular datos de carreras (en la vida real vendrían de la API)
+    // Distribución por carrera calculada en el backend
     const careerData = generateCareerData();
     
     chartInstances.careerChart = new Chart(ctx, {
@@ -191,82 +218,158 @@ async function generateCareerChart() {
 }
 
 function generateCareerData() {
-    // Simular distribución realista de carreras
-    const careers = [
-        'Ingeniería en Sistemas',
-        'Administración',
-        'Contabilidad',
-        'Psicología',
-        'Medicina'
-    ];
-    
-    const data = careers.map(career => {
-        // Basar en datos reales si están disponibles
-        if (window.dashboardData && window.dashboardData.users) {
-            const careerCount = window.dashboardData.users.filter(user => 
-                user.carrera && user.carrera.toLowerCase().includes('ingeniería')
-            ).length;
-            return careerCount || Math.floor(Math.random() * 50) + 10;
-        }
-        
-        return Math.floor(Math.random() * 50) + 10;
-    });
+    const porCarrera = window.dashboardData ? window.dashboardData.alumnos_por_carrera : [];
     
     return {
-        labels: careers,
-        data: data
+        labels: porCarrera.map(item => item.valor),
+        data: porCarrera.map(item => item.total)
     };
 }
 
+function timeAgo(dateStr) {
+    // Las fechas del backend están en UTC sin zona horaria
+    const minutes = Math.floor((Date.now() - new Date(dateStr + 'Z').getTime()) / 60000);
+    if (minutes < 1) return 'Hace un momento';
+    if (minutes < 60) return `Hace ${minutes} minutos`;
+    const hours = Math.floor(minutes / 60);
+    if (hours < 24) return `Hace ${hours} ${hours === 1 ? 'hora' : 'horas'}`;
+    const days = Math.floor(hours / 24);
+    return `Hace ${days} ${days === 1 ? 'día' : 'días'}`;
+}
+
+const ACTIVITY_TYPES = {
+    alumnos: { type: 'users', icon: '👥', singular: 'Alumno', plural: 'alumnos', title: 'Nuevo alumno registrado', bgColor: '95, 116, 138, 0.1' },
+    profesores: { type: 'teachers', icon: '👨‍🏫', singular: 'Profesor', plural: 'profesores', title: 'Profesor agregado', bgColor: '115, 138, 162, 0.1' },
+    instituciones: { type: 'institutions', icon: '🏫', singular: 'Institución', plural: 'instituciones', title: 'Institución agregada', bgColor: '136, 154, 174, 0.1' }
+};
+
 function generateRecentActivity() {
+    const recientes = window.dashboardData ? window.dashboardData.recientes : null;
+    if (!recientes) return;
+    
+    // Mezclar los últimos registros de cada recurso y ordenar por fecha
+    recentActivities = Object.entries(recientes)
+        .flatMap(([key, items]) => items.map(item => ({
+            ...ACTIVITY_TYPES[key],
+            text: `${ACTIVITY_TYPES[key].title}: ${item.nombre}`,
+            fecha: item.fecha_creacion
+        })))
+        .filter(activity => activity.fecha)
+        .sort((a, b) => b.fecha.localeCompare(a.fecha))
+        .slice(0, 5);
+    
+    renderRecentActivity();
+}
+
+function renderRecentActivity() {
     const container = document.getElementById('recentActivity');
     if (!container) return;
     
-    // Actividad simulada basada en datos reales si están disponibles
-    const activities = [
-        {
-            type: 'users',
-            icon: '👥',
-            title: 'Nuevo alumno registrado',
-            meta: 'Hace 5 minutos',
-            bgColor: '95, 116, 138, 0.1'
-        },
-        {
-            type: 'teachers',
-            icon: '👨‍🏫',
-            title: 'Profesor agregado',
-            meta: 'Hace 15 minutos',
-            bgColor: '115, 138, 162, 0.1'
-        },
-        {
-            type: 'institutions',
-            icon: '🏫',
-            title: 'Institución actualizada',
-            meta: 'Hace 1 hora',
-            bgColor: '136, 154, 174, 0.1'
-        },
-        {
-            type: 'users',
-            icon: '📊',
-            title: 'Reporte generado',
-            meta: 'Hace 2 horas',
-            bgColor: '148, 163, 184, 0.1'
-        }
-    ];
+    if (recentActivities.length === 0) {
+        container.innerHTML = '<li class="activity-item text-muted">Sin actividad reciente</li>';
+        return;
+    }
     
-    container.innerHTML = activities.map(activity => `
+    container.innerHTML = recentActivities.map(activity => `
         <li class="activity-item">
             <div class="activity-icon ${activity.type}" style="background-color: rgba(${activity.bgColor});">
                 ${activity.icon}
             </div>
             <div class="activity-details">
-                <div class="activity-title">${activity.title}</div>
-                <div class="activity-meta">${activity.meta}</div>
+                <div class="activity-title">${activity.text}</div>
+                <div class="activity-meta">${timeAgo(activity.fecha)}</div>
             </div>
         </li>
     `).join('');
 }
 
+// Texto de la actividad para un evento del feed de cambios
+function activityText(evento) {
+    const tipo = ACTIVITY_TYPES[evento.recurso];
+    if (evento.total > 1) {
+        const verbos = { creado: 'creados', actualizado: 'actualizados', eliminado: 'eliminados' };
+        return `${evento.total} ${tipo.plural} ${verbos[evento.accion]}`;
+    }
+    if (evento.accion === 'creado') {
+        return evento.nombre ? `${tipo.title}: ${evento.nombre}` : tipo.title;
+    }
+    const verbo = evento.accion === 'actualizado' ? 'actualizado' : 'eliminado';
+    return `${tipo.singular} ${verbo} (id ${evento.ids[0]})`;
+}
+
+// Feed de cambios del backend (Server-Sent Events en /events)
+function connectEvents() {
+    if (!window.EventSource || eventSource) return;
+    
+    // Recibir justo lo que no incluyen los conteos de /stats (su instantánea); al
+    // reconectarse, EventSource envía Last-Event-ID y el backend reenvía lo que faltó
+    const instantanea = window.dashboardData && window.dashboardData.instantanea;
+    eventSource = new EventSource(`${API_BASE_URL}/events${instantanea ? `?instantanea=${encodeURIComponent(instantanea)}` : ''}`);
+    
+    eventSource.addEventListener('cambio', (message) => {
+        applyEvent(JSON.parse(message.data));
+    });
+    
+    // Se perdieron eventos (reconexión tardía o el backend perdió su conexión): recargar los
+    // conteos y volver a conectarse desde su instantánea
+    eventSource.addEventListener('reset', () => {
+        reloadDashboardStats();
+    });
+}
+
+function applyEvent(evento) {
+    const stats = window.dashboardData;
+    if (!stats || !ACTIVITY_TYPES[evento.recurso]) return;
+    
+    // Contadores: solo altas y bajas cambian los totales
+    const delta = evento.accion === 'creado' ? evento.total :
+                  evento.accion === 'eliminado' ? -evento.total : 0;
+    if (delta !== 0) {
+        stats.totales[evento.recurso] += delta;
+        animateCounter(`${evento.recurso}-count`, stats.totales[evento.recurso]);
+    }
+    
+    // Actividad diaria (mini gráficos y línea temporal): las altas cuentan en su día
+    if (evento.accion === 'creado') {
+        const fecha = evento.fecha.slice(0, 10);
+        const actividad = stats.actividad[evento.recurso];
+        const dia = actividad.find(item => item.fecha === fecha);
+        if (dia) {
+            dia.total += evento.total;
+        } else {
+            actividad.push({ fecha, total: evento.total });
+        }
+        generateMiniCharts();
+    }
+    if (delta !== 0) {
+        updateTimelineChart();
+    }
+    
+    recentActivities.unshift({ ...ACTIVITY_TYPES[evento.recurso], text: activityText(evento), fecha: evento.fecha });
+    recentActivities = recentActivities.slice(0, 5);
+    renderRecentActivity();
+}
+
+let reloadTimer = null;
+
+function reloadDashboardStats() {
+    // Varios reset seguidos (p. ej. al reiniciar el backend) se atienden con una sola recarga
+    clearTimeout(reloadTimer);
+    reloadTimer = setTimeout(async () => {
+        await loadDashboardStats();
+        generateMiniCharts();
+        generateCareerChart();
+        generateRecentActivity();
+        updateTimelineChart();
+        // Lo recibido hasta ahora ya está en los conteos nuevos o se reenvía desde su instantánea
+        if (eventSource) {
+            eventSource.close();
+            eventSource = null;
+        }
+        connectEvents();
+    }, 1000);
+}
+
 async function showTimelineChart(type) {
     currentTimelineType = type;
     
@@ -356,38 +459,37 @@ async function showTimelineChart(type) {
     ctx.style.height = '300px';
 }
 
+function updateTimelineChart() {
+    const chart = chartInstances.timelineChart;
+    if (!chart) return;
+    
+    const timelineData = generateTimelineData(currentTimelineType);
+    chart.data.labels = timelineData.labels;
+    chart.data.datasets[0].data = timelineData.data;
+    chart.update('none');
+}
+
 function generateTimelineData(type) {
-    // Generar últimos 30 días
-    const labels = [];
-    const data = [];
+    // Total acumulado de los últimos 30 días a partir de la actividad diaria
+    const dataKey = type === 'users' ? 'alumnos' :
+                    type === 'teachers' ? 'profesores' : 'instituciones';
+    const stats = window.dashboardData;
+    if (!stats) {
+        return { labels: [], data: [] };
+    }
     
-    const today = new Date();
-    let cumulative = 0;
+    const series = dailySeries(stats.actividad[dataKey], 30);
+    const total = stats.totales[dataKey];
+    const inWindow = series.values.reduce((sum, value) => sum + value, 0);
     
-    for (let i = 29; i >= 0; i--) {
-        const date = new Date(today);
-        date.setDate(date.getDate() - i);
-        
-        labels.push(date.toLocaleDateString('es-ES', { month: 'short', day: 'numeric' }));
-        
-        // Crear crecimiento realista
-        const dailyGrowth = Math.random() * 3 + 1; // 1-4 por día
-        cumulative += dailyGrowth;
-        data.push(Math.floor(cumulative));
-        
-        // Factor de corrección basado en datos reales si están disponibles
-        if (window.dashboardData) {
-            const dataKey = type === 'users' ? 'users' : 
-                           type === 'teachers' ? 'teachers' : 'institutions';
-            const realCount = window.dashboardData[dataKey] ? 
-                window.dashboardData[dataKey].length : 0;
-            if (realCount > 0 && i === 0) {
-                data[data.length - 1] = realCount;
-            }
-        }
-    }
+    // Partir de lo que ya existía antes de la ventana de 30 días
+    let cumulative = total - inWindow;
+    const data = series.values.map(value => {
+        cumulative += value;
+        return cumulative;
+    });
     
-    return { labels, data };
+    return { labels: series.labels, data };
 }
 
 function getLabelForType(type) {
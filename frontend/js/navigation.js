@@ -24,6 +24,7 @@ class NavigationManager {
                 // Token inválido o expirado
                 this.isAuthenticated = false;
                 localStorage.removeItem('authToken');
+                localStorage.removeItem('refreshToken');
             }
         }
     }
@@ -1,22 +1,48 @@
 // Gestión de Profesores JavaScript
 let profesoresData = [];
 let editingProfesorId = null;
+let profesoresNextCursor = null;
+
+// Tamaño de página pedido al backend (el servidor aplica su propio máximo)
+const PROFESORES_PAGE_SIZE = 100;
 
 document.addEventListener('DOMContentLoaded', async function() {
     await loadProfesores();
     setupEventListeners();
 });
 
-async function loadProfesores() {
+// cacheMode 'reload' salta la caché del navegador y la del proxy (después de escribir)
+async function loadProfesores(cacheMode = 'default') {
+    // Reiniciar la lista y cargar la primera página
+    profesoresData = [];
+    profesoresNextCursor = null;
+    await loadProfesoresPage(null, cacheMode);
+}
+
+async function loadMoreProfesores() {
+    if (profesoresNextCursor === null) return;
+    await loadProfesoresPage(profesoresNextCursor);
+}
+
+async function loadProfesoresPage(cursor = null, cacheMode = 'default') {
     try {
         showLoading(true);
         
-        // Cargar profesores desde la API
-        const response = await fetch('http://localhost:5000/profesores');
+        // Cargar una página de profesores desde la API
+        let url = `${API_BASE_URL}/profesores?limit=${PROFESORES_PAGE_SIZE}`;
+        if (cursor !== null) {
+            url += `&cursor=${cursor}`;
+        }
+        const response = await fetch(url, { cache: cacheMode });
         if (response.ok) {
-            profesoresData = await response.json();
+            const page = await response.json();
+            profesoresData = profesoresData.concat(page.items);
+            profesoresNextCursor = page.next_cursor;
             renderProfesoresTable();
-            updateStats();
+            updateLoadMoreButton();
+            if (cursor === null) {
+                updateStats(cacheMode);
+            }
         } else {
             window.app.showNotification('Error cargando profesores', 'danger');
         }
@@ -28,6 +54,12 @@ async function loadProfesores() {
     }
 }
 
+function updateLoadMoreButton() {
+    const button = document.getElementById('loadMoreProfesores');
+    if (!button) return;
+    button.classList.toggle('d-none', profesoresNextCursor === null);
+}
+
 function renderProfesoresTable() {
     const tbody = document.querySelector('#profesoresTable tbody');
     if (!tbody) return;
@@ -65,12 +97,18 @@ function renderProfesoresTable() {
     `).join('');
 }
 
-function updateStats() {
-    document.getElementById('total-profesores').textContent = profesoresData.length;
-    document.getElementById('total-departamentos').textContent = 
-        [...new Set(profesoresData.map(p => p.departamento))].length;
-    document.getElementById('total-especialidades').textContent = 
-        [...new Set(profesoresData.map(p => p.especialidad))].length;
+async function updateStats(cacheMode = 'default') {
+    // Totales reales desde /stats (la tabla solo tiene las páginas cargadas)
+    try {
+        const response = await fetch(`${API_BASE_URL}/stats`, { cache: cacheMode });
+        if (!response.ok) return;
+        const stats = await response.json();
+        document.getElementById('total-profesores').textContent = stats.totales.profesores;
+        document.getElementById('total-departamentos').textContent = stats.profesores_por_departamento.length;
+        document.getElementById('total-especialidades').textContent = stats.profesores_por_especialidad.length;
+    } catch (error) {
+        console.error('Error cargando estadísticas:', error);
+    }
 }
 
 function formatDate(dateStr) {
@@ -159,7 +197,7 @@ async function handleProfesorSubmit(e) {
         let response;
         if (editingProfesorId) {
             // Actualizar profesor existente
-            response = await fetch(`http://localhost:5000/profesores/${editingProfesorId}`, {
+            response = await fetch(`${API_BASE_URL}/profesores/${editingProfesorId}`, {
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json'
@@ -168,7 +206,7 @@ async function handleProfesorSubmit(e) {
             });
         } else {
             // Crear nuevo profesor
-            response = await fetch('http://localhost:5000/profesores', {
+            response = await fetch(`${API_BASE_URL}/profesores`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -185,7 +223,7 @@ async function handleProfesorSubmit(e) {
                 'success'
             );
             
-            await loadProfesores(); // Recargar tabla
+            await loadProfesores('reload'); // Recargar tabla
             
             // Cerrar modal
             bootstrap.Modal.getInstance(document.getElementById('profesorModal')).hide();
@@ -206,13 +244,13 @@ async function deleteProfesor(profesorId) {
     if (!confirm('¿Estás seguro de eliminar este profesor?')) return;
     
     try {
-        const response = await fetch(`http://localhost:5000/profesores/${profesorId}`, {
+        const response = await fetch(`${API_BASE_URL}/profesores/${profesorId}`, {
             method: 'DELETE'
         });
         
         if (response.ok) {
             window.app.showNotification('Profesor eliminado', 'success');
-            await loadProfesores(); // Recargar tabla
+            await loadProfesores('reload'); // Recargar tabla
         } else {
             const error = await response.json();
             window.app.showNotification(error.error || 'Error eliminando profesor', 'danger');
@@ -288,7 +326,7 @@ function showLoading(show) {
 }
 
 function refreshProfesores() {
-    loadProfesores();
+    loadProfesores('reload');
 }
 
 // Funciones globales para usar desde HTML
@@ -296,3 +334,4 @@ window.editProfesor = editProfesor;
 window.deleteProfesor = deleteProfesor;
 window.openNewProfesorModal = openNewProfesorModal;
 window.refreshProfesores = refreshProfesores;
+window.loadMoreProfesores = loadMoreProfesores;